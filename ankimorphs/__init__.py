@@ -84,6 +84,7 @@ def main() -> None:
     gui_hooks.overview_did_refresh.append(update_seen_morphs)
 
     gui_hooks.reviewer_did_answer_card.append(insert_seen_morphs)
+    gui_hooks.reviewer_did_show_question.append(reviewing_utils.prefetch_next_cards)
 
     gui_hooks.state_did_undo.append(rebuild_seen_morphs)
 
@@ -9,9 +9,9 @@ from collections.abc import Sequence
 from typing import Any
 
 import anki.utils
+from anki.collection import Collection
 from anki.models import ModelManager, NotetypeDict, NotetypeId
 from anki.tags import TagManager
-from aqt import mw
 
 from .ankimorphs_config import AnkiMorphsConfig, AnkiMorphsConfigFilter
 from .morpheme import Morpheme
@@ -129,25 +129,24 @@ class AnkiMorphsCardData:
 
 
 def create_card_data_dict(
+    col: Collection,
     am_config: AnkiMorphsConfig,
     config_filter: AnkiMorphsConfigFilter,
 ) -> dict[int, AnkiCardData]:
-    assert mw is not None
-
-    model_manager: ModelManager = mw.col.models
-    tag_manager = TagManager(mw.col)
+    model_manager: ModelManager = col.models
+    tag_manager = TagManager(col)
     tags: dict[str, str] = config_filter.tags
     card_data_dict: dict[int, AnkiCardData] = {}
 
     # we can assume everything exists and works at this point since we checked for that earlier
-    note_type_id: NotetypeId | None = mw.col.models.id_for_name(config_filter.note_type)
+    note_type_id: NotetypeId | None = model_manager.id_for_name(config_filter.note_type)
     assert note_type_id is not None
-    note_type_dict: NotetypeDict | None = mw.col.models.get(note_type_id)
+    note_type_dict: NotetypeDict | None = model_manager.get(note_type_id)
     assert note_type_dict is not None
     existing_field_names: list[str] = model_manager.field_names(note_type_dict)
     field_index: int = existing_field_names.index(config_filter.field)
 
-    for anki_row_data in _get_anki_data(am_config, note_type_id, tags).values():
+    for anki_row_data in _get_anki_data(col, am_config, note_type_id, tags).values():
         card_data = AnkiCardData(
             am_config=am_config,
             tag_manager=tag_manager,
@@ -161,7 +160,10 @@ def create_card_data_dict(
 
 
 def _get_anki_data(
-    am_config: AnkiMorphsConfig, model_id: NotetypeId, tags_object: dict[str, str]
+    col: Collection,
+    am_config: AnkiMorphsConfig,
+    model_id: NotetypeId,
+    tags_object: dict[str, str],
 ) -> dict[int, AnkiDBRowData]:
     ################################################################
     #                        SQL QUERY
@@ -180,8 +182,7 @@ def _get_anki_data(
     #   WHERE notes.mid = 1691076536776 AND (cards.queue != -1 OR notes.tags LIKE '% am-known-manually %') AND notes.tags LIKE '% movie %'
     ################################################################
 
-    assert mw is not None
-    assert mw.col.db is not None
+    assert col.db is not None
 
     ignore_suspended_cards = ""
     if am_config.preprocess_ignore_suspended_cards_content:
@@ -203,7 +204,7 @@ def _get_anki_data(
             [f" AND notes.tags LIKE '% {_tag} %'" for _tag in included_tags]
         )
 
-    result: list[Sequence[Any]] = mw.col.db.all(
+    result: list[Sequence[Any]] = col.db.all(
         """
         SELECT cards.id, cards.ivl, cards.type, cards.queue, notes.id, notes.flds, notes.tags
         FROM cards
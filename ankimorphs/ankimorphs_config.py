@@ -42,6 +42,11 @@ from . import ankimorphs_globals
 # 'Union' notation even though we use '__future__ import annotations'.
 FilterTypeAlias = dict[str, Union[str, bool, int, dict[str, str], None]]
 
+# Outside of anki, e.g. in the recalc cli, there is no add-on manager to get the
+# configs from, so they are read from a json file instead, see 'load_configs_from_file'.
+_configs_from_file: dict[str, Any] | None = None
+_DEFAULT_CONFIGS_PATH = Path(Path(__file__).parent, "config.json")
+
 
 class AnkiMorphsConfigFilter:  # pylint:disable=too-many-instance-attributes
     def __init__(self, _filter: FilterTypeAlias):
@@ -118,6 +123,18 @@ class AnkiMorphsConfig:  # pylint:disable=too-many-instance-attributes
             self.skip_show_num_of_skipped_cards: bool = _get_bool_config(
                 "skip_show_num_of_skipped_cards", is_default
             )
+            self.generators_corpus_index: bool = _get_bool_config(
+                "generators_corpus_index", is_default
+            )
+            self.generators_max_morphs_in_memory: int = _get_int_config(
+                "generators_max_morphs_in_memory", is_default
+            )
+            self.generators_sentences_unknown_morphs: int = _get_int_config(
+                "generators_sentences_unknown_morphs", is_default
+            )
+            self.morphemizer_cache_size_mb: int = _get_int_config(
+                "morphemizer_cache_size_mb", is_default
+            )
             self.preprocess_ignore_bracket_contents: bool = _get_bool_config(
                 "preprocess_ignore_bracket_contents", is_default
             )
@@ -201,10 +218,27 @@ def _get_config(
 
 
 def get_configs() -> dict[str, Any] | None:
+    if _configs_from_file is not None:
+        return _configs_from_file
     assert mw is not None
     return mw.addonManager.getConfig(__name__)
 
 
+def load_configs_from_file(path: Path) -> None:
+    """
+    Replaces the configs of the add-on manager, e.g. with the
+    'ankimorphs_profile_settings.json' of a profile. The configs
+    that are missing from the file get their default values.
+    """
+    global _configs_from_file
+
+    with open(_DEFAULT_CONFIGS_PATH, encoding="utf-8") as file:
+        configs: dict[str, Any] = json.load(file)
+    with open(path, encoding="utf-8") as file:
+        configs.update(json.load(file))
+    _configs_from_file = configs
+
+
 def get_default_config(key: str) -> Any:
     config = get_all_default_configs()
     assert config is not None
@@ -212,7 +246,10 @@ def get_default_config(key: str) -> Any:
 
 
 def get_all_default_configs() -> dict[str, Any] | None:
-    assert mw is not None
+    if mw is None:
+        with open(_DEFAULT_CONFIGS_PATH, encoding="utf-8") as file:
+            default_configs: dict[str, Any] = json.load(file)
+        return default_configs
     addon = mw.addonManager.addonFromModule(__name__)  # necessary to prevent anki bug
     return mw.addonManager.addonConfigDefaults(addon)
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 import functools
 import os
 import sqlite3
+import sys
 from collections import Counter
 from collections.abc import Sequence
 from typing import Any
@@ -14,7 +15,7 @@ from aqt.operations import QueryOp
 
 from .anki_data_utils import AnkiMorphsCardData
 from .ankimorphs_config import AnkiMorphsConfig
-from .morpheme import Morpheme
+from .morpheme import Morpheme, MorphOccurrence
 from .name_file_utils import get_names_from_file_as_morphs
 
 
@@ -23,10 +24,12 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
     # therefore, we need a many-to-many db structure:
     # Cards -> Card_Morph_Map <- Morphs
 
-    def __init__(self) -> None:
-        assert mw is not None
-        assert mw.pm is not None
-        path: str = os.path.join(mw.pm.profileFolder(), "ankimorphs.db")
+    def __init__(self, path: str | None = None) -> None:
+        # the path is only given outside of anki, e.g. by the generators cli
+        if path is None:
+            assert mw is not None
+            assert mw.pm is not None
+            path = os.path.join(mw.pm.profileFolder(), "ankimorphs.db")
         self.con: sqlite3.Connection = sqlite3.connect(path)
 
     def create_all_tables(self) -> None:
@@ -34,6 +37,10 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
         self.create_cards_table()
         self.create_card_morph_map_table()
         self.create_seen_morph_table()
+        self.create_stats_table()
+        self.create_highlight_fingerprint_table()
+        self.create_generator_files_table()
+        self.create_generator_file_morphs_table()
 
     def create_cards_table(self) -> None:
         with self.con:
@@ -94,6 +101,79 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
                     """
             )
 
+    def create_stats_table(self) -> None:
+        # One row per day, the toolbar reads the latest row instead of
+        # aggregating the entire 'Morphs'-table every time it is drawn.
+        with self.con:
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Stats
+                    (
+                        date TEXT PRIMARY KEY,
+                        interval_for_known INTEGER,
+                        unique_seen INTEGER,
+                        all_seen INTEGER,
+                        unique_known INTEGER,
+                        all_known INTEGER
+                    )
+                    """
+            )
+
+    def create_highlight_fingerprint_table(self) -> None:
+        # Used to skip re-highlighting notes that have not changed since the last recalc
+        with self.con:
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Highlight_Fingerprints
+                    (
+                        note_id INTEGER PRIMARY KEY,
+                        fingerprint TEXT
+                    )
+                    """
+            )
+
+    def create_generator_files_table(self) -> None:
+        # The generators cache the morph occurrences of every input file, that way
+        # only new or modified files have to be morphemized again.
+        with self.con:
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Generator_Files
+                    (
+                        file_id INTEGER PRIMARY KEY,
+                        path TEXT,
+                        morphemizer TEXT,
+                        preprocess_options TEXT,
+                        size INTEGER,
+                        modified_time INTEGER,
+                        UNIQUE (path, morphemizer, preprocess_options)
+                    )
+                    """
+            )
+
+    def create_generator_file_morphs_table(self) -> None:
+        # The rows are read in the order they were inserted (rowid), since the
+        # order of the morphs is used as a tie-breaker in the frequency files.
+        with self.con:
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Generator_File_Morphs
+                    (
+                        file_id INTEGER,
+                        lemma TEXT,
+                        inflection TEXT,
+                        occurrence INTEGER,
+                        FOREIGN KEY(file_id) REFERENCES Generator_Files(file_id)
+                    )
+                    """
+            )
+            self.con.execute(
+                """
+                    CREATE INDEX IF NOT EXISTS Generator_File_Morphs_file_id
+                    ON Generator_File_Morphs(file_id)
+                    """
+            )
+
     def insert_many_into_card_table(
         self, card_list: list[dict[str, int | str | bool]]
     ) -> None:
@@ -273,29 +353,227 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
 
         return card_ids
 
-    def get_highest_learning_interval(self, base: str, inflected: str) -> int | None:
+    def get_highest_learning_intervals(self) -> dict[tuple[str, str], int]:
+        # Getting all the intervals in one query is much faster than
+        # querying them for every single morph.
+        with self.con:
+            highest_learning_intervals_raw = self.con.execute(
+                """
+                    SELECT lemma, inflection, highest_learning_interval
+                    FROM Morphs
+                    """
+            ).fetchall()
+
+        return {(row[0], row[1]): row[2] for row in highest_learning_intervals_raw}
+
+    def update_stats(self, interval_for_known: int) -> None:
+        # The morph statuses only change when the 'Morphs'-table is rebuilt
+        # by recalc, so this is called at the end of every recalc.
+        stats = self.get_stats(interval_for_known)
+        with self.con:
+            self.con.execute(
+                """
+                    INSERT OR REPLACE INTO Stats
+                    VALUES (DATE('now', 'localtime'), ?, ?, ?, ?, ?)
+                    """,
+                stats,
+            )
+
+    def get_stats(self, interval_for_known: int) -> tuple[int, int, int, int, int]:
+        """
+        Aggregates the 'Morphs'-table without storing the result.
+        Returns (interval_for_known, unique_seen, all_seen, unique_known, all_known)
+        """
         with self.con:
-            highest_learning_interval = self.con.execute(
+            stats = self.con.execute(
                 """
-                    SELECT highest_learning_interval
+                    SELECT
+                        :interval_for_known,
+                        COUNT(DISTINCT CASE WHEN highest_learning_interval >= 1 THEN lemma END),
+                        COUNT(CASE WHEN highest_learning_interval >= 1 THEN 1 END),
+                        COUNT(DISTINCT CASE WHEN highest_learning_interval >= :interval_for_known THEN lemma END),
+                        COUNT(CASE WHEN highest_learning_interval >= :interval_for_known THEN 1 END)
                     FROM Morphs
-                    WHERE lemma = ? And inflection = ?
                     """,
-                (base, inflected),
+                {"interval_for_known": interval_for_known},
             ).fetchone()
 
-            if highest_learning_interval is None:
-                return None
+        return stats[0], stats[1], stats[2], stats[3], stats[4]
+
+    def get_latest_stats(self) -> tuple[int, int, int, int, int] | None:
+        """
+        Returns (interval_for_known, unique_seen, all_seen, unique_known, all_known)
+        """
+        with self.con:
+            latest_stats = self.con.execute(
+                """
+                    SELECT interval_for_known, unique_seen, all_seen, unique_known, all_known
+                    FROM Stats
+                    ORDER BY date DESC
+                    LIMIT 1
+                    """
+            ).fetchone()
 
-            # un-tuple the result
-            highest_learning_interval = highest_learning_interval[0]
+        if latest_stats is None:
+            return None
 
-            assert isinstance(highest_learning_interval, int)
-            return highest_learning_interval
+        return (
+            latest_stats[0],
+            latest_stats[1],
+            latest_stats[2],
+            latest_stats[3],
+            latest_stats[4],
+        )
+
+    def insert_many_into_highlight_fingerprint_table(
+        self, highlight_fingerprint_list: list[dict[str, int | str]]
+    ) -> None:
+        with self.con:
+            self.con.executemany(
+                """
+                    INSERT OR REPLACE INTO Highlight_Fingerprints VALUES
+                    (
+                       :note_id,
+                       :fingerprint
+                    )
+                    """,
+                highlight_fingerprint_list,
+            )
+
+    def delete_stale_highlight_fingerprints(self) -> None:
+        # The 'Cards'-table is rebuilt by every recalc, so the notes that are not
+        # in it anymore have either been deleted or no longer match a note filter.
+        with self.con:
+            self.con.execute(
+                """
+                    DELETE FROM Highlight_Fingerprints
+                    WHERE note_id NOT IN (SELECT note_id FROM Cards)
+                    """
+            )
+
+    def get_highlight_fingerprints(self) -> dict[int, str]:
+        with self.con:
+            highlight_fingerprints_raw = self.con.execute(
+                """
+                    SELECT note_id, fingerprint
+                    FROM Highlight_Fingerprints
+                    """
+            ).fetchall()
+
+        return {row[0]: row[1] for row in highlight_fingerprints_raw}
+
+    def get_generator_file_morph_occurrences(  # pylint:disable=too-many-arguments
+        self,
+        path: str,
+        morphemizer_description: str,
+        preprocess_options: str,
+        size: int,
+        modified_time: int,
+    ) -> dict[str, MorphOccurrence] | None:
+        """
+        Returns None if the file has not been cached or has been modified since.
+        """
+        file_id_raw = self.con.execute(
+            """
+                SELECT file_id
+                FROM Generator_Files
+                WHERE path = ? AND morphemizer = ? AND preprocess_options = ?
+                    AND size = ? AND modified_time = ?
+                """,
+            (path, morphemizer_description, preprocess_options, size, modified_time),
+        ).fetchone()
+
+        if file_id_raw is None:
+            return None
+
+        morph_occurrences: dict[str, MorphOccurrence] = {}
+        morph_occurrences_raw = self.con.execute(
+            """
+                SELECT lemma, inflection, occurrence
+                FROM Generator_File_Morphs
+                WHERE file_id = ?
+                ORDER BY rowid
+                """,
+            (file_id_raw[0],),
+        )
+
+        for row in morph_occurrences_raw:
+            morph_occurrence = MorphOccurrence(
+                Morpheme(lemma=row[0], inflection=row[1])
+            )
+            morph_occurrence.occurrence = row[2]
+            morph_occurrences[row[0] + row[1]] = morph_occurrence
+
+        return morph_occurrences
+
+    def update_generator_file_morph_occurrences(  # pylint:disable=too-many-arguments
+        self,
+        path: str,
+        morphemizer_description: str,
+        preprocess_options: str,
+        size: int,
+        modified_time: int,
+        morph_occurrences: dict[str, MorphOccurrence],
+    ) -> None:
+        with self.con:
+            old_file_id_raw = self.con.execute(
+                """
+                    SELECT file_id
+                    FROM Generator_Files
+                    WHERE path = ? AND morphemizer = ? AND preprocess_options = ?
+                    """,
+                (path, morphemizer_description, preprocess_options),
+            ).fetchone()
+
+            if old_file_id_raw is not None:
+                self.con.execute(
+                    "DELETE FROM Generator_File_Morphs WHERE file_id = ?",
+                    old_file_id_raw,
+                )
+                self.con.execute(
+                    "DELETE FROM Generator_Files WHERE file_id = ?",
+                    old_file_id_raw,
+                )
+
+            file_id = self.con.execute(
+                """
+                    INSERT INTO Generator_Files
+                    (path, morphemizer, preprocess_options, size, modified_time)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                (
+                    path,
+                    morphemizer_description,
+                    preprocess_options,
+                    size,
+                    modified_time,
+                ),
+            ).lastrowid
+
+            self.con.executemany(
+                """
+                    INSERT INTO Generator_File_Morphs VALUES (?, ?, ?, ?)
+                    """,
+                (
+                    (
+                        file_id,
+                        morph_occurrence.morph.lemma,
+                        morph_occurrence.morph.inflection,
+                        morph_occurrence.occurrence,
+                    )
+                    for morph_occurrence in morph_occurrences.values()
+                ),
+            )
 
     def get_card_morph_map_cache(self) -> dict[int, list[Morpheme]]:
         card_morph_map_cache: dict[int, list[Morpheme]] = {}
 
+        # A morph can be on thousands of cards, so instead of creating a new Morpheme
+        # object for every row, all the cards share the same (flyweight) Morpheme object.
+        # Since the rows are sorted by the morphs, all the rows of a morph come
+        # right after each other, and we only have to compare with the previous row.
+        morph: Morpheme | None = None
+
         # Sorting the morphs (ORDER BY) is crucial to avoid bugs
         card_morph_map_cache_raw = self.con.execute(
             """
@@ -305,13 +583,16 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
                 Card_Morph_Map.morph_lemma = Morphs.lemma AND Card_Morph_Map.morph_inflection = Morphs.inflection
             ORDER BY Morphs.lemma, Morphs.inflection
             """,
-        ).fetchall()
+        )
 
         for row in card_morph_map_cache_raw:
             card_id = row[0]
-            morph = Morpheme(
-                lemma=row[1], inflection=row[2], highest_learning_interval=row[3]
-            )
+            if morph is None or morph.lemma != row[1] or morph.inflection != row[2]:
+                morph = Morpheme(
+                    lemma=sys.intern(row[1]),
+                    inflection=sys.intern(row[2]),
+                    highest_learning_interval=row[3],
+                )
 
             if card_id not in card_morph_map_cache:
                 card_morph_map_cache[card_id] = [morph]
@@ -323,8 +604,6 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
     def get_am_cards_data_dict(
         self, note_type_id: NotetypeId | None
     ) -> dict[int, AnkiMorphsCardData]:
-        assert mw is not None
-        assert mw.col.db is not None
         assert note_type_id is not None
 
         result = self.con.execute(
@@ -382,6 +661,9 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
             print(f"PRAGMA {table}: {result.fetchall()}")
 
     def drop_all_tables(self) -> None:
+        # The 'Stats'-table is intentionally kept since it contains the history, and
+        # the 'Highlight_Fingerprints'-table has to survive between recalcs to be useful.
+        # The generator tables are not related to the collection, so they are kept too.
         with self.con:
             self.con.execute("DROP TABLE IF EXISTS Cards;")
             self.con.execute("DROP TABLE IF EXISTS Morphs;")
@@ -512,12 +794,19 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
 
     @staticmethod
     def get_morph_statuses() -> dict[str, str]:
-        morph_status_dict: dict[str, str] = {}
         am_db = AnkiMorphsDB()
         am_config = AnkiMorphsConfig()
+        return am_db.get_morph_statuses_with_interval(
+            am_config.recalc_interval_for_known
+        )
 
-        with am_db.con:
-            card_morphs_raw = am_db.con.execute(
+    def get_morph_statuses_with_interval(
+        self, interval_for_known: int
+    ) -> dict[str, str]:
+        morph_status_dict: dict[str, str] = {}
+
+        with self.con:
+            card_morphs_raw = self.con.execute(
                 """
                     SELECT lemma, inflection, highest_learning_interval
                     FROM Morphs
@@ -528,7 +817,7 @@ class AnkiMorphsDB:  # pylint:disable=too-many-public-methods
             for row in card_morphs_raw:
                 key = row[0] + row[1]
                 interval = row[2]
-                if interval >= am_config.recalc_interval_for_known:
+                if interval >= interval_for_known:
                     learning_status = "known"
                 elif interval > 0:
                     learning_status = "learning"
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Iterator, Sequence
+
+from aqt import mw
+
+from .morpheme import Morpheme, MorphOccurrence
+
+
+class CorpusDB:
+    # An index of the files the generators have processed, which makes it possible
+    # to answer questions about the corpus with sql instead of re-reading the files,
+    # e.g. which lines of the files have the fewest unknown morphs.
+    #
+    # Files -> Lines -> Line_Morphs <- Morphs
+    # Files -> File_Morphs <- Morphs
+    #
+    # The files and morphs are indexed per morphemizer and preprocess options, just
+    # like the generators cache in ankimorphs.db, since those decide the morphs.
+
+    def __init__(self, profile_folder: str | None = None) -> None:
+        # the profile folder is only given outside of anki, e.g. by the generators cli
+        if profile_folder is None:
+            assert mw is not None
+            assert mw.pm is not None
+            profile_folder = mw.pm.profileFolder()
+        self.profile_folder: str = profile_folder
+        path: str = os.path.join(self.profile_folder, "corpus.db")
+        # The files are indexed by multiple threads at the same time, each with its
+        # own connection, so the connections might have to wait for each other.
+        self.con: sqlite3.Connection = sqlite3.connect(path, timeout=60)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        # the morph ids never change, so they can be remembered between the batches
+        self._morph_ids: dict[tuple[int, str, str], int] = {}
+
+    def create_all_tables(self) -> None:
+        with self.con:
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Corpus_Files
+                    (
+                        file_id INTEGER PRIMARY KEY,
+                        path TEXT,
+                        morphemizer TEXT,
+                        preprocess_options TEXT,
+                        size INTEGER,
+                        modified_time INTEGER,
+                        UNIQUE (path, morphemizer, preprocess_options)
+                    )
+                    """
+            )
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Corpus_Morphs
+                    (
+                        morph_id INTEGER PRIMARY KEY,
+                        morphemizer TEXT,
+                        preprocess_options TEXT,
+                        lemma TEXT,
+                        inflection TEXT,
+                        document_frequency INTEGER,
+                        UNIQUE (morphemizer, preprocess_options, lemma, inflection)
+                    )
+                    """
+            )
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Corpus_Lines
+                    (
+                        file_id INTEGER,
+                        line_number INTEGER,
+                        text TEXT,
+                        FOREIGN KEY(file_id) REFERENCES Corpus_Files(file_id),
+                        PRIMARY KEY(file_id, line_number)
+                    )
+                    """
+            )
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Corpus_Line_Morphs
+                    (
+                        file_id INTEGER,
+                        line_number INTEGER,
+                        morph_id INTEGER,
+                        FOREIGN KEY(file_id, line_number) REFERENCES Corpus_Lines(file_id, line_number),
+                        FOREIGN KEY(morph_id) REFERENCES Corpus_Morphs(morph_id),
+                        PRIMARY KEY(file_id, line_number, morph_id)
+                    )
+                    """
+            )
+            self.con.execute(
+                """
+                    CREATE INDEX IF NOT EXISTS Corpus_Line_Morphs_morph_id
+                    ON Corpus_Line_Morphs(morph_id)
+                    """
+            )
+            self.con.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS Corpus_File_Morphs
+                    (
+                        file_id INTEGER,
+                        morph_id INTEGER,
+                        occurrence INTEGER,
+                        FOREIGN KEY(file_id) REFERENCES Corpus_Files(file_id),
+                        FOREIGN KEY(morph_id) REFERENCES Corpus_Morphs(morph_id),
+                        PRIMARY KEY(file_id, morph_id)
+                    )
+                    """
+            )
+            self.con.execute(
+                """
+                    CREATE INDEX IF NOT EXISTS Corpus_File_Morphs_morph_id
+                    ON Corpus_File_Morphs(morph_id)
+                    """
+            )
+
+    def has_file(  # pylint:disable=too-many-arguments
+        self,
+        path: str,
+        morphemizer_description: str,
+        preprocess_options: str,
+        size: int,
+        modified_time: int,
+    ) -> bool:
+        """
+        Returns False if the file has not been (completely) indexed or has been modified since.
+        """
+        file_id_raw = self.con.execute(
+            """
+                SELECT file_id
+                FROM Corpus_Files
+                WHERE path = ? AND morphemizer = ? AND preprocess_options = ?
+                    AND size = ? AND modified_time = ?
+                """,
+            (path, morphemizer_description, preprocess_options, size, modified_time),
+        ).fetchone()
+        return file_id_raw is not None
+
+    def start_indexing_file(
+        self, path: str, morphemizer_description: str, preprocess_options: str
+    ) -> int:
+        """
+        Removes the previous index of the file and returns the id of the new one.
+        The file is only complete once 'finish_indexing_file' has been called.
+        """
+        with self.con:
+            old_file_id_raw = self.con.execute(
+                """
+                    SELECT file_id
+                    FROM Corpus_Files
+                    WHERE path = ? AND morphemizer = ? AND preprocess_options = ?
+                    """,
+                (path, morphemizer_description, preprocess_options),
+            ).fetchone()
+
+            if old_file_id_raw is not None:
+                self._delete_file(old_file_id_raw[0])
+
+            # the size and modified time are set when the file is complete
+            file_id = self.con.execute(
+                """
+                    INSERT INTO Corpus_Files (path, morphemizer, preprocess_options)
+                    VALUES (?, ?, ?)
+                    """,
+                (path, morphemizer_description, preprocess_options),
+            ).lastrowid
+
+        assert file_id is not None
+        return file_id
+
+    def insert_lines(
+        self,
+        file_id: int,
+        first_line_number: int,
+        lines: list[str],
+        lines_morphs: list[Sequence[Morpheme]],
+    ) -> None:
+        # lines_morphs: the morphs of each line, in the same order as the lines
+        assert len(lines) == len(lines_morphs)
+
+        with self.con:
+            for line_number, (line, line_morphs) in enumerate(
+                zip(lines, lines_morphs), start=first_line_number
+            ):
+                # the lines without any morphs are not useful for any queries
+                if len(line_morphs) == 0:
+                    continue
+
+                self.con.execute(
+                    "INSERT INTO Corpus_Lines VALUES (?, ?, ?)",
+                    (file_id, line_number, line.strip()),
+                )
+                self.con.executemany(
+                    "INSERT OR IGNORE INTO Corpus_Line_Morphs VALUES (?, ?, ?)",
+                    [
+                        (file_id, line_number, self._get_morph_id(file_id, morph))
+                        for morph in line_morphs
+                    ],
+                )
+
+    def finish_indexing_file(
+        self,
+        file_id: int,
+        size: int,
+        modified_time: int,
+        morph_occurrences: dict[str, MorphOccurrence],
+    ) -> None:
+        with self.con:
+            self.con.executemany(
+                "INSERT INTO Corpus_File_Morphs VALUES (?, ?, ?)",
+                [
+                    (
+                        file_id,
+                        self._get_morph_id(file_id, morph_occurrence.morph),
+                        morph_occurrence.occurrence,
+                    )
+                    for morph_occurrence in morph_occurrences.values()
+                ],
+            )
+            self.con.execute(
+                """
+                    UPDATE Corpus_Morphs
+                    SET document_frequency = document_frequency + 1
+                    WHERE morph_id IN (
+                        SELECT morph_id FROM Corpus_File_Morphs WHERE file_id = ?
+                    )
+                    """,
+                (file_id,),
+            )
+            self.con.execute(
+                """
+                    UPDATE Corpus_Files
+                    SET size = ?, modified_time = ?
+                    WHERE file_id = ?
+                    """,
+                (size, modified_time, file_id),
+            )
+
+    def get_indexed_files(
+        self, morphemizer_description: str, preprocess_options: str
+    ) -> dict[str, tuple[int, int, int]]:
+        """
+        Returns path -> (file_id, size, modified time) of the completely indexed files.
+        """
+        return {
+            row[0]: (row[1], row[2], row[3])
+            for row in self.con.execute(
+                """
+                    SELECT path, file_id, size, modified_time
+                    FROM Corpus_Files
+                    WHERE morphemizer = ? AND preprocess_options = ?
+                        AND size IS NOT NULL
+                    """,
+                (morphemizer_description, preprocess_options),
+            )
+        }
+
+    def get_line_morph_ids(self, file_id: int) -> Iterator[tuple[int, int]]:
+        """
+        Returns (line number, morph id) of every line of the file, in line order.
+        The rows are read lazily, so the file never has to be in memory at once.
+        """
+        return self.con.execute(
+            """
+                SELECT line_number, morph_id
+                FROM Corpus_Line_Morphs
+                WHERE file_id = ?
+                ORDER BY line_number
+                """,
+            (file_id,),
+        )
+
+    def get_line_text(self, file_id: int, line_number: int) -> str:
+        line_text_raw = self.con.execute(
+            """
+                SELECT text
+                FROM Corpus_Lines
+                WHERE file_id = ? AND line_number = ?
+                """,
+            (file_id, line_number),
+        ).fetchone()
+        assert line_text_raw is not None
+        text: str = line_text_raw[0]
+        return text
+
+    def get_file_morphs(self, file_id: int) -> list[tuple[int, str, str, int]]:
+        """
+        Returns (morph id, lemma, inflection, occurrence) of every morph in the file.
+        """
+        return self.con.execute(
+            """
+                SELECT Corpus_Morphs.morph_id, lemma, inflection, occurrence
+                FROM Corpus_File_Morphs
+                INNER JOIN Corpus_Morphs
+                    ON Corpus_Morphs.morph_id = Corpus_File_Morphs.morph_id
+                WHERE file_id = ?
+                """,
+            (file_id,),
+        ).fetchall()
+
+    def _get_morph_id(self, file_id: int, morph: Morpheme) -> int:
+        # the morphs belong to the morphemizer and preprocess options of the file
+        morph_key: tuple[int, str, str] = (file_id, morph.lemma, morph.inflection)
+        morph_id: int | None = self._morph_ids.get(morph_key)
+
+        if morph_id is None:
+            self.con.execute(
+                """
+                    INSERT OR IGNORE INTO Corpus_Morphs
+                    (morphemizer, preprocess_options, lemma, inflection, document_frequency)
+                    SELECT morphemizer, preprocess_options, ?, ?, 0
+                    FROM Corpus_Files
+                    WHERE file_id = ?
+                    """,
+                (morph.lemma, morph.inflection, file_id),
+            )
+            morph_id = self.con.execute(
+                """
+                    SELECT morph_id
+                    FROM Corpus_Morphs
+                    INNER JOIN Corpus_Files
+                        ON Corpus_Files.morphemizer = Corpus_Morphs.morphemizer
+                        AND Corpus_Files.preprocess_options = Corpus_Morphs.preprocess_options
+                    WHERE Corpus_Files.file_id = ? AND lemma = ? AND inflection = ?
+                    """,
+                (file_id, morph.lemma, morph.inflection),
+            ).fetchone()[0]
+            assert morph_id is not None
+            self._morph_ids[morph_key] = morph_id
+
+        return morph_id
+
+    def _delete_file(self, file_id: int) -> None:
+        # the morphs are kept since other files probably have them too
+        self.con.execute(
+            """
+                UPDATE Corpus_Morphs
+                SET document_frequency = document_frequency - 1
+                WHERE morph_id IN (
+                    SELECT morph_id FROM Corpus_File_Morphs WHERE file_id = ?
+                )
+                """,
+            (file_id,),
+        )
+        self.con.execute("DELETE FROM Corpus_File_Morphs WHERE file_id = ?", (file_id,))
+        self.con.execute("DELETE FROM Corpus_Line_Morphs WHERE file_id = ?", (file_id,))
+        self.con.execute("DELETE FROM Corpus_Lines WHERE file_id = ?", (file_id,))
+        self.con.execute("DELETE FROM Corpus_Files WHERE file_id = ?", (file_id,))
+
+
+class CorpusFileIndexer:
+    """
+    Indexes a single file as it is being processed, 'add_lines' is meant to be used as
+    the 'on_lines_batch' callback of 'create_file_morph_occurrences'. The files are
+    processed in worker threads, so every indexer has its own db connection.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        morphemizer_description: str,
+        preprocess_options: str,
+        profile_folder: str | None = None,
+    ) -> None:
+        self._corpus_db = CorpusDB(profile_folder)
+        self._file_id: int = self._corpus_db.start_indexing_file(
+            path, morphemizer_description, preprocess_options
+        )
+        self._line_number: int = 0
+
+    def add_lines(
+        self, lines: list[str], lines_morphs: list[Sequence[Morpheme]]
+    ) -> None:
+        self._corpus_db.insert_lines(
+            self._file_id, self._line_number, lines, lines_morphs
+        )
+        self._line_number += len(lines)
+
+    def finish(
+        self,
+        size: int,
+        modified_time: int,
+        morph_occurrences: dict[str, MorphOccurrence],
+    ) -> None:
+        self._corpus_db.finish_indexing_file(
+            self._file_id, size, modified_time, morph_occurrences
+        )
+
+    def close(self) -> None:
+        self._corpus_db.con.close()
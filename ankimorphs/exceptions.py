@@ -34,3 +34,7 @@ class FrequencyFileNotFoundException(Exception):
 
     def __init__(self, path: str):
         self.path = path
+
+
+class MecabOutputException(Exception):
+    """The output of a mecab process did not match the expressions sent to it"""
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+
 from anki.models import FieldDict, ModelManager, NotetypeDict
 from anki.notes import Note
 from aqt import mw
@@ -8,6 +10,9 @@ from . import ankimorphs_config, ankimorphs_globals, text_highlighting
 from .ankimorphs_config import AnkiMorphsConfig, AnkiMorphsConfigFilter
 from .morpheme import Morpheme
 
+# the ascii unit separator never appears in card text
+_FINGERPRINT_SEPARATOR = "\x1f"
+
 
 def new_extra_fields_are_selected() -> bool:
     assert mw is not None
@@ -136,6 +141,7 @@ def update_highlighted_field(  # pylint:disable=too-many-arguments
     card_morph_map_cache: dict[int, list[Morpheme]],
     card_id: int,
     note: Note,
+    highlight_fingerprints: dict[int, str],
 ) -> None:
     try:
         card_morphs: list[Morpheme] = card_morph_map_cache[card_id]
@@ -146,13 +152,60 @@ def update_highlighted_field(  # pylint:disable=too-many-arguments
     expression_field_index: int = note_type_field_name_dict[config_filter.field][0]
     text_to_highlight = note.fields[expression_field_index]
 
+    extra_field_index: int = note_type_field_name_dict[
+        ankimorphs_globals.EXTRA_FIELD_HIGHLIGHTED
+    ][0]
+
+    # Generating the highlighted text is expensive, so we skip it if neither the
+    # inputs nor the highlighted field have changed since the last recalc.
+    fingerprint_input: str = _get_highlight_fingerprint_input(
+        am_config, card_morphs, text_to_highlight
+    )
+    if highlight_fingerprints.get(note.id) == _get_highlight_fingerprint(
+        fingerprint_input, note.fields[extra_field_index]
+    ):
+        return
+
     highlighted_text = text_highlighting.get_highlighted_text(
         am_config,
         card_morphs,
         text_to_highlight,
     )
 
-    extra_field_index: int = note_type_field_name_dict[
-        ankimorphs_globals.EXTRA_FIELD_HIGHLIGHTED
-    ][0]
     note.fields[extra_field_index] = highlighted_text
+    highlight_fingerprints[note.id] = _get_highlight_fingerprint(
+        fingerprint_input, highlighted_text
+    )
+
+
+def _get_highlight_fingerprint_input(
+    am_config: AnkiMorphsConfig, card_morphs: list[Morpheme], text_to_highlight: str
+) -> str:
+    # The card morphs are sorted by the db query, so the statuses are
+    # always in the same order. The add-on version is included so that
+    # changes to the highlighting are applied to all notes after updating.
+    morph_statuses: list[str] = [
+        morph.lemma
+        + _FINGERPRINT_SEPARATOR
+        + morph.inflection
+        + _FINGERPRINT_SEPARATOR
+        + text_highlighting.get_morph_status(am_config, morph)
+        for morph in card_morphs
+    ]
+    return _FINGERPRINT_SEPARATOR.join(
+        [
+            ankimorphs_globals.__version__,
+            str(am_config.recalc_interval_for_known),
+            str(am_config.preprocess_ignore_bracket_contents),
+            text_to_highlight,
+        ]
+        + morph_statuses
+    )
+
+
+def _get_highlight_fingerprint(fingerprint_input: str, highlighted_text: str) -> str:
+    # The highlighted text is included to make sure we don't skip notes where the
+    # highlighted field has been edited, or where the updated note never got saved.
+    return hashlib.sha256(
+        (fingerprint_input + _FINGERPRINT_SEPARATOR + highlighted_text).encode()
+    ).hexdigest()
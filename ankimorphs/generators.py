@@ -0,0 +1,204 @@
+"""
+Runs the frequency file and study plan generators without the anki gui, e.g. on
+a headless server over thousands of files:
+
+    python -m ankimorphs.generators frequency-file subs/ --morphemizer "AnkiMorphs: Japanese" --output freq.csv
+
+The anki and aqt packages still have to be installed, since the add-on imports them.
+Run with '--help' to see all the options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+from . import morphemizer, spacy_wrapper
+from .ankimorphs_db import AnkiMorphsDB
+from .generators_output_dialog import OutputOptions
+from .generators_processing import GeneratorsProcessor, gather_input_files
+from .generators_text_processing import PreprocessOptions
+from .morphemizer import SpacyMorphemizer
+
+# the cli uses the default config of the add-on, there is no anki profile to read it from
+_DEFAULT_CONFIG_PATH = Path(Path(__file__).parent, "config.json")
+
+_ALL_EXTENSIONS: tuple[str, ...] = (".txt", ".srt", ".vtt", ".ass", ".ssa", ".md")
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _get_argument_parser().parse_args(argv)
+
+    with open(_DEFAULT_CONFIG_PATH, encoding="utf-8") as file:
+        default_config: dict[str, Any] = json.load(file)
+
+    _morphemizer = morphemizer.get_morphemizer_by_description(args.morphemizer)
+    if _morphemizer is None:
+        available = [
+            mizer.get_description() for mizer in morphemizer.get_all_morphemizers()
+        ]
+        print(
+            f"Unknown morphemizer: '{args.morphemizer}', available: {available}",
+            file=sys.stderr,
+        )
+        return 2
+
+    _nlp = None  # spacy.Language
+    if isinstance(_morphemizer, SpacyMorphemizer):
+        _nlp = spacy_wrapper.get_nlp(_morphemizer.spacy_model)
+
+    # the generators cache and the corpus index are stored next to ankimorphs.db
+    profile_folder: str | None = None
+    if args.ankimorphs_db is not None:
+        profile_folder = str(Path(args.ankimorphs_db).parent)
+
+    input_dir = Path(args.input_dir)
+    input_files: list[Path] = gather_input_files(
+        input_dir, tuple(extension.lower() for extension in args.extensions)
+    )
+
+    processor = GeneratorsProcessor(
+        input_dir_root=input_dir,
+        _morphemizer=_morphemizer,
+        nlp=_nlp,
+        preprocess_options=PreprocessOptions(
+            filter_square_brackets=args.ignore_square_brackets,
+            filter_round_brackets=args.ignore_round_brackets,
+            filter_slim_round_brackets=args.ignore_slim_round_brackets,
+            filter_numbers=args.ignore_numbers,
+            filter_morphemizer_names=args.ignore_names_morphemizer,
+        ),
+        profile_folder=profile_folder,
+        morphemizer_cache_size_mb=default_config["morphemizer_cache_size_mb"],
+        index_in_corpus=default_config["generators_corpus_index"],
+        max_workers=args.jobs,
+        on_file_progress=lambda counter, file_amount, input_file: print(
+            f"Read file {counter} of {file_amount}: {input_file.relative_to(input_dir)}",
+            file=sys.stderr,
+        ),
+    )
+
+    output_options = OutputOptions(
+        output_path=Path(args.output),
+        min_occurrence=args.min_occurrence is not None,
+        comprehension=args.comprehension is not None,
+        min_occurrence_threshold=args.min_occurrence or 1,
+        comprehension_threshold=args.comprehension or 90,
+    )
+
+    if args.generator == "frequency-file":
+        processor.generate_frequency_file(
+            input_files,
+            output_options,
+            max_morphs_in_memory=default_config["generators_max_morphs_in_memory"],
+        )
+    else:
+        morphs_learning_status: dict[str, str] = {}
+        if args.ankimorphs_db is not None:
+            am_db = AnkiMorphsDB(args.ankimorphs_db)
+            try:
+                morphs_learning_status = am_db.get_morph_statuses_with_interval(
+                    args.interval_for_known
+                    or default_config["recalc_interval_for_known"]
+                )
+            finally:
+                am_db.con.close()
+
+        processor.generate_study_plan(
+            input_files, output_options, morphs_learning_status
+        )
+
+    print(f"Wrote {output_options.output_path}", file=sys.stderr)
+    return 0
+
+
+def _get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ankimorphs.generators",
+        description="Generates frequency files and study plans from the files in a folder.",
+    )
+    parser.add_argument(
+        "generator",
+        choices=["frequency-file", "study-plan"],
+    )
+    parser.add_argument(
+        "input_dir",
+        help="the files in this folder and its sub-folders are used",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        required=True,
+        help="the .csv file to write",
+    )
+    parser.add_argument(
+        "-m",
+        "--morphemizer",
+        default="AnkiMorphs: Language w/ Spaces",
+        help="e.g. 'AnkiMorphs: Japanese' or 'spaCy: de_core_news_md' (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--extensions",
+        nargs="+",
+        default=list(_ALL_EXTENSIONS),
+        help="the input file formats (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--ankimorphs-db",
+        help="the ankimorphs.db of an anki profile, which gives the study plan the "
+        "learning statuses of the morphs. The generators cache is also kept in it.",
+    )
+    parser.add_argument(
+        "--interval-for-known",
+        type=int,
+        help="the interval a morph needs to be known (default: the add-on's default)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="the number of files processed in parallel, only used by "
+        "'AnkiMorphs: Japanese' (default: %(default)s)",
+    )
+
+    preprocess_group = parser.add_argument_group("preprocess")
+    preprocess_group.add_argument(
+        "--ignore-square-brackets", action="store_true", help="ignore [...]"
+    )
+    preprocess_group.add_argument(
+        "--ignore-round-brackets", action="store_true", help="ignore (...)"
+    )
+    preprocess_group.add_argument(
+        "--ignore-slim-round-brackets", action="store_true", help="ignore （...）"
+    )
+    preprocess_group.add_argument(
+        "--ignore-numbers", action="store_true", help="ignore numbers"
+    )
+    preprocess_group.add_argument(
+        "--ignore-names-morphemizer",
+        action="store_true",
+        help="ignore the names found by the morphemizer",
+    )
+
+    cutoff_group = parser.add_mutually_exclusive_group()
+    cutoff_group.add_argument(
+        "--min-occurrence",
+        type=int,
+        help="only include the morphs that occur at least this many times",
+    )
+    cutoff_group.add_argument(
+        "--comprehension",
+        type=int,
+        help="only include the morphs needed to reach this comprehension percent",
+    )
+
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(main())
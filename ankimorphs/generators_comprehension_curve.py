@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import bisect
+from itertools import accumulate
+
+
+def get_comprehension_curve(
+    known_occurrences: int, unknown_occurrences: list[int]
+) -> list[float]:
+    """
+    Returns the comprehension percent of the text after learning the first N
+    unknown morphs, for every N from 0 to all of them. The unknown occurrences
+    have to be in the order the morphs would be learned, e.g. most frequent first.
+    """
+    total_occurrences: int = known_occurrences + sum(unknown_occurrences)
+
+    if total_occurrences == 0:
+        return [0.0] * (len(unknown_occurrences) + 1)
+
+    # NumPy is not bundled with Anki, it's usually only available if spaCy is
+    # installed, so the pure python version is used otherwise.
+    try:
+        import numpy  # pylint:disable=import-outside-toplevel
+    except ModuleNotFoundError:
+        return [
+            running_occurrences / total_occurrences * 100
+            for running_occurrences in accumulate(
+                unknown_occurrences, initial=known_occurrences
+            )
+        ]
+
+    running_occurrences = numpy.cumsum(
+        numpy.array([known_occurrences] + unknown_occurrences, dtype=numpy.int64)
+    )
+    curve: list[float] = (running_occurrences / total_occurrences * 100).tolist()
+    return curve
+
+
+def get_morphs_needed(curve: list[float], target_percent: float) -> int | None:
+    """
+    Returns how many of the unknown morphs have to be learned to reach the target
+    comprehension, or None if the target can't be reached.
+    """
+    # the curve never decreases, so it can be binary searched
+    morphs_needed: int = bisect.bisect_left(curve, target_percent)
+    if morphs_needed == len(curve):
+        return None
+    return morphs_needed
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import heapq
+import pickle
+import tempfile
+from collections.abc import Iterable, Iterator
+from itertools import groupby, islice
+from operator import itemgetter
+from types import TracebackType
+from typing import IO
+
+from .morpheme import Morpheme, MorphOccurrence
+
+# (key, first seen order, lemma, inflection, occurrence)
+_MorphRecord = tuple[str, int, str, str, int]
+
+# the records are written to the spill files in chunks of this size,
+# pickling them one by one would be very slow
+_SPILL_CHUNK_SIZE = 10_000
+
+# the positions of the morphs in their files are stored in the lower bits
+_FILE_INDEX_SHIFT = 32
+
+
+class _MorphTotal:
+    __slots__ = (
+        "morph",
+        "occurrence",
+        "order",
+    )
+
+    def __init__(self, morph: Morpheme, occurrence: int, order: int) -> None:
+        self.morph: Morpheme = morph
+        self.occurrence: int = occurrence
+        self.order: int = order
+
+
+class MorphOccurrencesMerger:
+    """
+    Adds up the morph occurrences of the input files for the frequency file.
+
+    The morphs are sorted by occurrence and then by where they were first found
+    (the input file order and the position in the file). That is the same order
+    merging the files one by one gives, but here the files can be added in any
+    order, e.g. as soon as they have been processed.
+
+    If there are more than 'max_morphs_in_memory' different morphs, the totals
+    are spilled to temporary files on disk, which are merged (and sorted) again
+    when the sorted morph occurrences are requested. This keeps huge corpora,
+    e.g. wikipedia dumps, from using up all the memory.
+    """
+
+    def __init__(self, max_morphs_in_memory: int) -> None:
+        self._max_morphs_in_memory: int = max(max_morphs_in_memory, 1)
+        self._morph_totals: dict[str, _MorphTotal] = {}
+        self._spill_files: list[IO[bytes]] = []
+        self.total_occurrences: int = 0
+
+    def __enter__(self) -> MorphOccurrencesMerger:
+        return self
+
+    def __exit__(
+        self,
+        _exc_type: type[BaseException] | None,
+        _exc_value: BaseException | None,
+        _traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # the temporary files are deleted when they are closed
+        for spill_file in self._spill_files:
+            spill_file.close()
+        self._spill_files.clear()
+
+    def add(
+        self, file_index: int, morph_occurrences: dict[str, MorphOccurrence]
+    ) -> None:
+        for position, (key, morph_occurrence) in enumerate(morph_occurrences.items()):
+            order: int = (file_index << _FILE_INDEX_SHIFT) | position
+            self.total_occurrences += morph_occurrence.occurrence
+
+            morph_total = self._morph_totals.get(key)
+            if morph_total is None:
+                self._morph_totals[key] = _MorphTotal(
+                    morph_occurrence.morph, morph_occurrence.occurrence, order
+                )
+                continue
+
+            morph_total.occurrence += morph_occurrence.occurrence
+            if order < morph_total.order:
+                morph_total.morph = morph_occurrence.morph
+                morph_total.order = order
+
+        if len(self._morph_totals) > self._max_morphs_in_memory:
+            self._spill_morph_totals()
+
+    def get_sorted_morph_occurrences(self) -> Iterator[MorphOccurrence]:
+        """
+        The morphs are sorted lazily, so it's cheap to only use the first ones,
+        e.g. when the frequency file has a min. occurrence cutoff.
+        """
+        if len(self._spill_files) == 0:
+            return self._get_sorted_morph_occurrences_from_memory()
+
+        self._spill_morph_totals()
+        return self._get_sorted_morph_occurrences_from_disk()
+
+    def _get_sorted_morph_occurrences_from_memory(self) -> Iterator[MorphOccurrence]:
+        # Building a heap is linear, and every morph that is used costs log(n),
+        # which is much cheaper than a full sort if only the top morphs are used.
+        heap: list[tuple[int, int, str]] = [
+            (-morph_total.occurrence, morph_total.order, key)
+            for key, morph_total in self._morph_totals.items()
+        ]
+        heapq.heapify(heap)
+
+        while len(heap) > 0:
+            _, _, key = heapq.heappop(heap)
+            morph_total = self._morph_totals[key]
+            morph_occurrence = MorphOccurrence(morph_total.morph)
+            morph_occurrence.occurrence = morph_total.occurrence
+            yield morph_occurrence
+
+    def _get_sorted_morph_occurrences_from_disk(self) -> Iterator[MorphOccurrence]:
+        # The spill files are sorted by key, so merging them puts the records of the
+        # same morph next to each other. Those are then added up and sorted by
+        # occurrence, which is done in chunks on disk as well.
+        records_sorted_by_key: Iterable[_MorphRecord] = heapq.merge(
+            *[_read_records(spill_file) for spill_file in self._spill_files],
+            key=itemgetter(0),
+        )
+        morph_records: Iterator[_MorphRecord] = (
+            _add_up_records(list(records))
+            for _, records in groupby(records_sorted_by_key, key=itemgetter(0))
+        )
+
+        sorted_runs: list[IO[bytes]] = []
+
+        while True:
+            run: list[_MorphRecord] = list(
+                islice(morph_records, self._max_morphs_in_memory)
+            )
+            if len(run) == 0:
+                break
+            run.sort(key=_get_occurrence_sort_key)
+            sorted_runs.append(_write_records(run))
+
+        self.close()
+        self._spill_files = sorted_runs
+
+        for _, _, lemma, inflection, occurrence in heapq.merge(
+            *[_read_records(sorted_run) for sorted_run in sorted_runs],
+            key=_get_occurrence_sort_key,
+        ):
+            morph_occurrence = MorphOccurrence(Morpheme(lemma, inflection))
+            morph_occurrence.occurrence = occurrence
+            yield morph_occurrence
+
+    def _spill_morph_totals(self) -> None:
+        records: list[_MorphRecord] = [
+            (
+                key,
+                morph_total.order,
+                morph_total.morph.lemma,
+                morph_total.morph.inflection,
+                morph_total.occurrence,
+            )
+            for key, morph_total in sorted(self._morph_totals.items())
+        ]
+        self._morph_totals.clear()
+        self._spill_files.append(_write_records(records))
+
+
+def _get_occurrence_sort_key(record: _MorphRecord) -> tuple[int, int]:
+    return -record[4], record[1]
+
+
+def _add_up_records(records: list[_MorphRecord]) -> _MorphRecord:
+    # the first seen record decides the morph, just like when the files are merged
+    key, order, lemma, inflection, _ = min(records, key=itemgetter(1))
+    return key, order, lemma, inflection, sum(record[4] for record in records)
+
+
+def _write_records(records: Iterable[_MorphRecord]) -> IO[bytes]:
+    spill_file: IO[bytes] = tempfile.TemporaryFile()
+    records_iterator: Iterator[_MorphRecord] = iter(records)
+
+    while True:
+        chunk: list[_MorphRecord] = list(islice(records_iterator, _SPILL_CHUNK_SIZE))
+        if len(chunk) == 0:
+            break
+        pickle.dump(chunk, spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    spill_file.seek(0)
+    return spill_file
+
+
+def _read_records(spill_file: IO[bytes]) -> Iterator[_MorphRecord]:
+    while True:
+        try:
+            chunk: list[_MorphRecord] = pickle.load(spill_file)
+        except EOFError:
+            return
+        yield from chunk
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tarfile
+import zipfile
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import IO, Callable, TextIO, cast
+
+# The generators can read the input files directly from archives and compressed
+# files, without extracting them first. The members of an archive are represented
+# by "virtual" paths that continue from the path of the archive, e.g.:
+#   subs/season-1.zip/episode_1.srt
+# which makes them show up in the file table like normal files in a sub-dir.
+
+_ARCHIVE_EXTENSIONS: tuple[str, ...] = (
+    ".zip",
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.xz",
+    ".txz",
+    ".tar.bz2",
+    ".tbz2",
+)
+
+_COMPRESSION_OPENERS: dict[str, Callable[..., IO[str]]] = {
+    ".gz": gzip.open,
+    ".xz": lzma.open,
+    ".bz2": bz2.open,
+}
+
+
+def get_input_files(file_path: Path, extensions: tuple[str, ...]) -> list[Path]:
+    """
+    Returns the files with the given extensions found at the file path,
+    i.e. the file itself or the matching members of an archive.
+    """
+    file_name: str = file_path.name.lower()
+
+    if file_name.endswith(extensions):
+        return [file_path]
+
+    if file_name.endswith(_ARCHIVE_EXTENSIONS):
+        return [
+            Path(file_path, member_name)
+            for member_name in _get_archive_member_names(file_path)
+            if member_name.lower().endswith(extensions)
+        ]
+
+    # compressed single files, e.g. "episode_1.srt.gz"
+    if file_path.suffix.lower() in _COMPRESSION_OPENERS:
+        if file_name.removesuffix(file_path.suffix.lower()).endswith(extensions):
+            return [file_path]
+
+    return []
+
+
+def get_file_extension(input_file: Path) -> str:
+    """
+    Returns the extension of the content, e.g. ".srt" for "episode_1.srt.gz"
+    """
+    if input_file.suffix.lower() in _COMPRESSION_OPENERS:
+        return Path(input_file.stem).suffix
+    return input_file.suffix
+
+
+def get_input_file_stat(input_file: Path) -> os.stat_result:
+    # the archive members don't exist on disk, so they use the stat of the archive
+    archive_path: Path | None = _get_archive_path(input_file)
+    if archive_path is not None:
+        return archive_path.stat()
+    return input_file.stat()
+
+
+@contextmanager
+def open_input_file(input_file: Path) -> Iterator[TextIO]:
+    # the files are streamed, so only a small part of them is in memory at a time
+    archive_path: Path | None = _get_archive_path(input_file)
+
+    with ExitStack() as exit_stack:
+        file: TextIO
+
+        if archive_path is not None:
+            member_name: str = input_file.relative_to(archive_path).as_posix()
+            member_file: IO[bytes] = exit_stack.enter_context(
+                _open_archive_member(archive_path, member_name)
+            )
+            file = exit_stack.enter_context(
+                io.TextIOWrapper(member_file, encoding="utf-8")
+            )
+        elif input_file.suffix.lower() in _COMPRESSION_OPENERS:
+            compression_opener = _COMPRESSION_OPENERS[input_file.suffix.lower()]
+            # the openers only return text files in the "rt" mode
+            file = cast(
+                TextIO,
+                exit_stack.enter_context(
+                    compression_opener(input_file, "rt", encoding="utf-8")
+                ),
+            )
+        else:
+            file = exit_stack.enter_context(open(input_file, encoding="utf-8"))
+
+        yield file
+
+
+def _get_archive_path(input_file: Path) -> Path | None:
+    # the first parent that is a file is the archive the input file is a member of
+    if input_file.is_file():
+        return None
+
+    for parent in input_file.parents:
+        if parent.is_file():
+            return parent
+
+    return None
+
+
+def _get_archive_member_names(archive_path: Path) -> list[str]:
+    if archive_path.name.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as zip_file:
+            return [
+                zip_info.filename
+                for zip_info in zip_file.infolist()
+                if not zip_info.is_dir()
+            ]
+
+    # "r:*" detects the compression of the tar file automatically
+    with tarfile.open(archive_path, "r:*") as tar_file:
+        return [tar_info.name for tar_info in tar_file if tar_info.isfile()]
+
+
+@contextmanager
+def _open_archive_member(archive_path: Path, member_name: str) -> Iterator[IO[bytes]]:
+    if archive_path.name.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as zip_file:
+            with zip_file.open(member_name) as member_file:
+                yield member_file
+        return
+
+    with tarfile.open(archive_path, "r:*") as tar_file:
+        # the tar member names can contain redundant parts like "./" that
+        # are removed when they are converted to paths
+        for tar_info in tar_file:
+            if Path(tar_info.name).as_posix() != member_name:
+                continue
+            tar_member_file = tar_file.extractfile(tar_info)
+            assert tar_member_file is not None
+            with tar_member_file:
+                yield tar_member_file
+            return
+
+    raise FileNotFoundError(f"{member_name} not found in {archive_path}")
@@ -9,13 +9,20 @@ from .ui.generator_output_dialog_ui import Ui_GeneratorOutputDialog
 
 
 class OutputOptions:
-    def __init__(self, ui: Ui_GeneratorOutputDialog):
-        self.output_path: Path = Path(ui.outputLineEdit.text())
-        self.min_occurrence: bool = ui.minOccurrenceRadioButton.isChecked()
-        self.comprehension: bool = ui.comprehensionRadioButton.isChecked()
-
-        self.min_occurrence_threshold = ui.minOccurrenceSpinBox.value()
-        self.comprehension_threshold = ui.comprehensionSpinBox.value()
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        output_path: Path,
+        min_occurrence: bool = False,
+        comprehension: bool = False,
+        min_occurrence_threshold: int = 1,
+        comprehension_threshold: int = 90,
+    ):
+        self.output_path: Path = output_path
+        self.min_occurrence: bool = min_occurrence
+        self.comprehension: bool = comprehension
+
+        self.min_occurrence_threshold: int = min_occurrence_threshold
+        self.comprehension_threshold: int = comprehension_threshold
 
 
 class GeneratorOutputDialog(QDialog):
@@ -67,4 +74,10 @@ class GeneratorOutputDialog(QDialog):
             tooltip(msg="Output needs to be a .csv file", parent=self)
 
     def get_selected_options(self) -> OutputOptions:
-        return OutputOptions(self.ui)
+        return OutputOptions(
+            output_path=Path(self.ui.outputLineEdit.text()),
+            min_occurrence=self.ui.minOccurrenceRadioButton.isChecked(),
+            comprehension=self.ui.comprehensionRadioButton.isChecked(),
+            min_occurrence_threshold=self.ui.minOccurrenceSpinBox.value(),
+            comprehension_threshold=self.ui.comprehensionSpinBox.value(),
+        )
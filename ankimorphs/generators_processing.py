@@ -0,0 +1,498 @@
+from __future__ import annotations
+
+import csv
+import os
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable
+
+from . import generators_input_files, generators_text_processing, morphemizer
+from .ankimorphs_db import AnkiMorphsDB
+from .corpus_db import CorpusDB, CorpusFileIndexer
+from .exceptions import CancelledOperationException
+from .generators_frequency_file import MorphOccurrencesMerger
+from .generators_output_dialog import OutputOptions
+from .generators_text_processing import PreprocessOptions
+from .morpheme import MorphOccurrence
+from .morphemizer import Morphemizer, MorphemizerCache
+
+# The ui-free core of the generators, used by both the generators window and the
+# command-line interface (generators.py). Nothing in here is allowed to use 'mw',
+# everything it needs from anki is passed in instead.
+
+
+def gather_input_files(
+    input_dir: Path,
+    extensions: tuple[str, ...],
+    want_cancel: Callable[[], bool] = lambda: False,
+) -> list[Path]:
+    input_files: list[Path] = []
+
+    # os.walk goes through all the sub-dirs recursively
+    for dir_path, _, file_names in os.walk(input_dir):
+        for file_name in file_names:
+            if want_cancel():
+                raise CancelledOperationException
+            # archives can contain multiple input files
+            input_files.extend(
+                generators_input_files.get_input_files(
+                    Path(dir_path, file_name), extensions
+                )
+            )
+
+    # without this sorting, the initial order will be (seemingly) random
+    input_files.sort()
+    return input_files
+
+
+class GeneratorsProcessor:  # pylint:disable=too-many-instance-attributes
+    """
+    Turns the input files into morph occurrences with the given morphemizer and
+    preprocess options.
+
+    If there is a profile folder, the morph occurrences of the files are cached
+    in its ankimorphs.db, and the files can be indexed in its corpus.db. Without
+    one (e.g. in the cli), every file is simply morphemized.
+    """
+
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        input_dir_root: Path,
+        _morphemizer: Morphemizer,
+        nlp: Any,
+        preprocess_options: PreprocessOptions,
+        profile_folder: str | None,
+        morphemizer_cache_size_mb: int,
+        index_in_corpus: bool = False,
+        max_workers: int | None = None,
+        want_cancel: Callable[[], bool] = lambda: False,
+        on_file_progress: Callable[[int, int, Path], None] | None = None,
+    ) -> None:
+        # nlp: spacy.Language
+        #
+        # on_file_progress: called with (counter, number of files, input file)
+        # every time a file has been morphemized.
+        self.input_dir_root: Path = input_dir_root
+        self._morphemizer: Morphemizer = _morphemizer
+        self._nlp: Any = nlp
+        self._preprocess_options: PreprocessOptions = preprocess_options
+        self._profile_folder: str | None = profile_folder
+        self._morphemizer_cache_size_mb: int = morphemizer_cache_size_mb
+        self._index_in_corpus: bool = index_in_corpus and profile_folder is not None
+        self._want_cancel: Callable[[], bool] = want_cancel
+        self._on_file_progress: Callable[[int, int, Path], None] | None = (
+            on_file_progress
+        )
+
+        # The files are processed in parallel threads, but that is only faster when the
+        # morphemizer runs in separate processes (mecab). The other morphemizers would
+        # just compete for the GIL, and spaCy models are not guaranteed to be thread-safe.
+        self._max_workers: int = (
+            (max_workers or os.cpu_count() or 1)
+            if _morphemizer.runs_in_subprocess
+            else 1
+        )
+
+    def process_input_files(  # pylint:disable=too-many-locals
+        self,
+        input_files: list[Path],
+        on_file_processed: Callable[[Path, dict[str, MorphOccurrence]], None],
+    ) -> None:
+        """
+        'on_file_processed' is called with the morph occurrences of each file as
+        soon as they are available, in the order the files finish. The callers
+        decide which of the morph occurrences they have to keep in memory.
+        """
+        morphemizer.update_cache_max_size(self._morphemizer_cache_size_mb)
+
+        # shared by all the files, see 'create_file_morph_occurrences'
+        spacy_lines_cache: MorphemizerCache | None = None
+        if self._nlp is not None:
+            spacy_lines_cache = MorphemizerCache(
+                max_size_bytes=self._morphemizer_cache_size_mb * 1024 * 1024
+            )
+
+        # Only new or modified files have to be morphemized, the morph occurrences
+        # of the others are read from the cache in ankimorphs.db.
+        am_db: AnkiMorphsDB | None = None
+        if self._profile_folder is not None:
+            am_db = AnkiMorphsDB(os.path.join(self._profile_folder, "ankimorphs.db"))
+            am_db.create_generator_files_table()
+            am_db.create_generator_file_morphs_table()
+
+        morphemizer_description: str = self._morphemizer.get_description()
+        preprocess_options_key: str = self._preprocess_options.get_cache_key()
+
+        try:
+            file_stats: dict[Path, os.stat_result] = self._get_uncached_file_stats(
+                am_db, input_files, on_file_processed
+            )
+            file_amount = len(file_stats)
+
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                futures: dict[Future[dict[str, MorphOccurrence]], Path] = {
+                    executor.submit(
+                        self._get_file_morph_occurrences,
+                        preprocess_options_key,
+                        input_file,
+                        file_stat,
+                        spacy_lines_cache,
+                    ): input_file
+                    for input_file, file_stat in file_stats.items()
+                }
+
+                for counter, future in enumerate(as_completed(futures), start=1):
+                    if self._want_cancel():  # user clicked 'x' button
+                        for pending_future in futures:
+                            pending_future.cancel()
+                        raise CancelledOperationException
+
+                    input_file = futures[future]
+                    morph_occurrences: dict[str, MorphOccurrence] = future.result()
+
+                    # the db connection can only be used by the thread that created it
+                    if am_db is not None:
+                        am_db.update_generator_file_morph_occurrences(
+                            path=str(input_file.absolute()),
+                            morphemizer_description=morphemizer_description,
+                            preprocess_options=preprocess_options_key,
+                            size=file_stats[input_file].st_size,
+                            modified_time=file_stats[input_file].st_mtime_ns,
+                            morph_occurrences=morph_occurrences,
+                        )
+
+                    on_file_processed(input_file, morph_occurrences)
+
+                    if self._on_file_progress is not None:
+                        self._on_file_progress(counter, file_amount, input_file)
+        finally:
+            if am_db is not None:
+                am_db.con.close()
+
+    def _get_uncached_file_stats(
+        self,
+        am_db: AnkiMorphsDB | None,
+        input_files: list[Path],
+        on_file_processed: Callable[[Path, dict[str, MorphOccurrence]], None],
+    ) -> dict[Path, os.stat_result]:
+        """
+        Passes the cached morph occurrences on to 'on_file_processed' and returns
+        the stats of the files that still have to be morphemized, in input order.
+        """
+        file_stats: dict[Path, os.stat_result] = {}
+
+        # The generators also keep an index of the files in corpus.db, which can
+        # be queried later without having to process the files again.
+        corpus_db: CorpusDB | None = None
+        if self._index_in_corpus:
+            corpus_db = CorpusDB(self._profile_folder)
+            corpus_db.create_all_tables()
+
+        try:
+            for input_file in input_files:
+                file_stat = generators_input_files.get_input_file_stat(input_file)
+                file_key: dict[str, Any] = {
+                    "path": str(input_file.absolute()),
+                    "morphemizer_description": self._morphemizer.get_description(),
+                    "preprocess_options": self._preprocess_options.get_cache_key(),
+                    "size": file_stat.st_size,
+                    "modified_time": file_stat.st_mtime_ns,
+                }
+                cached_morph_occurrences = (
+                    None
+                    if am_db is None
+                    else am_db.get_generator_file_morph_occurrences(**file_key)
+                )
+                if cached_morph_occurrences is None or (
+                    corpus_db is not None and not corpus_db.has_file(**file_key)
+                ):
+                    file_stats[input_file] = file_stat
+                else:
+                    on_file_processed(input_file, cached_morph_occurrences)
+        finally:
+            if corpus_db is not None:
+                corpus_db.con.close()
+
+        return file_stats
+
+    def _get_file_morph_occurrences(
+        self,
+        preprocess_options_key: str,
+        input_file: Path,
+        file_stat: os.stat_result,
+        spacy_lines_cache: MorphemizerCache | None,
+    ) -> dict[str, MorphOccurrence]:
+        # this is run in a worker thread, so it must not touch the ui
+        corpus_file_indexer: CorpusFileIndexer | None = None
+        if self._index_in_corpus:
+            corpus_file_indexer = CorpusFileIndexer(
+                path=str(input_file.absolute()),
+                morphemizer_description=self._morphemizer.get_description(),
+                preprocess_options=preprocess_options_key,
+                profile_folder=self._profile_folder,
+            )
+
+        try:
+            with generators_input_files.open_input_file(input_file) as file:
+                morph_occurrences = (
+                    generators_text_processing.create_file_morph_occurrences(
+                        preprocess_options=self._preprocess_options,
+                        file=file,
+                        morphemizer=self._morphemizer,
+                        nlp=self._nlp,
+                        spacy_lines_cache=spacy_lines_cache,
+                        file_extension=generators_input_files.get_file_extension(
+                            input_file
+                        ),
+                        on_lines_batch=(
+                            None
+                            if corpus_file_indexer is None
+                            else corpus_file_indexer.add_lines
+                        ),
+                    )
+                )
+
+            if corpus_file_indexer is not None:
+                corpus_file_indexer.finish(
+                    size=file_stat.st_size,
+                    modified_time=file_stat.st_mtime_ns,
+                    morph_occurrences=morph_occurrences,
+                )
+        finally:
+            if corpus_file_indexer is not None:
+                corpus_file_indexer.close()
+
+        return morph_occurrences
+
+    def get_morph_occurrences_by_file(
+        self, input_files: list[Path]
+    ) -> dict[Path, dict[str, MorphOccurrence]]:
+        morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]] = {}
+
+        self.process_input_files(
+            input_files, on_file_processed=morph_occurrences_by_file.__setitem__
+        )
+
+        # the files finish in an arbitrary order, but the callers depend on the
+        # order of the input files, e.g. the study plans.
+        return {
+            input_file: morph_occurrences_by_file[input_file]
+            for input_file in input_files
+        }
+
+    def generate_frequency_file(
+        self,
+        input_files: list[Path],
+        output_options: OutputOptions,
+        max_morphs_in_memory: int,
+        on_sorting: Callable[[], None] = lambda: None,
+    ) -> None:
+        file_indices: dict[Path, int] = {
+            input_file: index for index, input_file in enumerate(input_files)
+        }
+
+        # The files are added up as soon as they are processed instead of keeping
+        # all of them in memory, see 'MorphOccurrencesMerger' for huge corpora.
+        with MorphOccurrencesMerger(max_morphs_in_memory) as merger:
+            self.process_input_files(
+                input_files,
+                on_file_processed=lambda input_file, morph_occurrences: merger.add(
+                    file_indices[input_file], morph_occurrences
+                ),
+            )
+
+            on_sorting()
+
+            write_frequency_file(
+                output_options,
+                merger.get_sorted_morph_occurrences(),
+                merger.total_occurrences,
+            )
+
+    def generate_study_plan(
+        self,
+        input_files: list[Path],
+        output_options: OutputOptions,
+        morphs_learning_status: dict[str, str],
+        on_sorting: Callable[[], None] = lambda: None,
+    ) -> None:
+        """
+        The study plan follows the order of the input files.
+        """
+        morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]] = (
+            self.get_morph_occurrences_by_file(input_files)
+        )
+
+        on_sorting()
+
+        # for every file, sort the morph occurrence dicts
+        for file, morph_dict in morph_occurrences_by_file.items():
+            sorted_morph_frequency = dict(
+                sorted(
+                    morph_dict.items(),
+                    key=lambda item: item[1].occurrence,
+                    reverse=True,
+                )
+            )
+            morph_occurrences_by_file[file] = sorted_morph_frequency
+
+        write_study_plan(
+            output_options,
+            morph_occurrences_by_file,
+            morphs_learning_status,
+            self.input_dir_root,
+        )
+
+
+def write_frequency_file(
+    output_options: OutputOptions,
+    sorted_morph_occurrences: Iterable[MorphOccurrence],
+    total_occurrences: int,
+) -> None:
+    output_file = output_options.output_path
+
+    # make sure the parent dirs exist before creating the file
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+
+    selected_min_occurrence: bool = output_options.min_occurrence
+    selected_comprehension: bool = output_options.comprehension
+
+    min_occurrence_threshold: int = output_options.min_occurrence_threshold
+    comprehension_threshold: int = output_options.comprehension_threshold
+
+    # _comprehension_threshold is between 100 and 1
+    target_number = (comprehension_threshold / 100) * total_occurrences
+    running_number = 0
+
+    with open(output_file, mode="w+", encoding="utf-8", newline="") as csvfile:
+        morph_writer = csv.writer(csvfile)
+        morph_writer.writerow(["Morph-lemma", "Morph-inflection", "Occurrence"])
+
+        # The morphs are sorted lazily, so stopping at the cutoff means
+        # the morphs below it never have to be sorted.
+        for morph_occurrence in sorted_morph_occurrences:
+            morph = morph_occurrence.morph
+            occurrence = morph_occurrence.occurrence
+
+            if selected_comprehension:
+                running_number += occurrence
+                if running_number > target_number:
+                    break
+            elif selected_min_occurrence:
+                if occurrence < min_occurrence_threshold:
+                    break
+
+            morph_writer.writerow(
+                [
+                    morph.lemma,
+                    morph.inflection,
+                    occurrence,
+                ]
+            )
+
+
+def write_study_plan(  # pylint:disable=too-many-locals
+    output_options: OutputOptions,
+    morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]],
+    morphs_learning_status: dict[str, str],
+    input_dir_root: Path,
+) -> None:
+    output_file = output_options.output_path
+
+    # make sure the parent dirs exist before creating the file
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+
+    selected_min_occurrence: bool = output_options.min_occurrence
+    selected_comprehension: bool = output_options.comprehension
+
+    min_occurrence_threshold: int = output_options.min_occurrence_threshold
+    comprehension_threshold: int = output_options.comprehension_threshold
+
+    morph_in_study_plan: dict[str, None] = {}  # only care about lookup not value
+
+    with open(output_file, mode="w+", encoding="utf-8", newline="") as csvfile:
+        morph_writer = csv.writer(csvfile)
+        morph_writer.writerow(
+            [
+                "Morph-lemma",
+                "Morph-inflection",
+                "Learning-status",
+                "Occurrence",
+                "File",
+            ]
+        )
+
+        for file_path, sorted_morph_occurrence in morph_occurrences_by_file.items():
+            morph_key_cutoff: str | None = None
+
+            if selected_comprehension:
+                morph_key_cutoff = get_comprehension_cutoff(
+                    sorted_morph_occurrence, comprehension_threshold
+                )
+            elif selected_min_occurrence:
+                morph_key_cutoff = get_min_occurrence_cutoff(
+                    sorted_morph_occurrence, min_occurrence_threshold
+                )
+
+            for key, morph_occurrence in sorted_morph_occurrence.items():
+                if key == morph_key_cutoff:
+                    break
+
+                morph = morph_occurrence.morph
+                occurrence = morph_occurrence.occurrence
+
+                if key in morph_in_study_plan:
+                    continue
+
+                learning_status: str
+
+                if key not in morphs_learning_status:
+                    learning_status = "unknown"
+                else:
+                    learning_status = morphs_learning_status[key]
+
+                morph_writer.writerow(
+                    [
+                        morph.lemma,
+                        morph.inflection,
+                        learning_status,
+                        occurrence,
+                        file_path.relative_to(input_dir_root),
+                    ]
+                )
+
+                morph_in_study_plan[key] = None  # inserts the key
+
+
+def get_comprehension_cutoff(
+    sorted_morph_occurrence: dict[str, MorphOccurrence],
+    comprehension_threshold: int,
+) -> str | None:
+    total_occurrences = 0
+
+    for morph_occurrence in sorted_morph_occurrence.values():
+        total_occurrences += morph_occurrence.occurrence
+
+    # _comprehension_threshold is between 100 and 1
+    target_percent = comprehension_threshold / 100
+    target_number = target_percent * total_occurrences
+
+    running_number = 0
+
+    for key, morph_occurrence in sorted_morph_occurrence.items():
+        running_number += morph_occurrence.occurrence
+        if running_number > target_number:
+            return key
+
+    return None
+
+
+def get_min_occurrence_cutoff(
+    sorted_morph_occurrence: dict[str, MorphOccurrence],
+    min_occurrence_threshold: int,
+) -> str | None:
+    for morph_key in sorted_morph_occurrence:
+        if sorted_morph_occurrence[morph_key].occurrence < min_occurrence_threshold:
+            return morph_key
+    return None
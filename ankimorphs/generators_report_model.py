@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+from aqt.qt import (  # pylint:disable=no-name-in-module
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    QSortFilterProxyModel,
+    Qt,
+)
+
+from .readability_report_utils import FileMorphsStats
+
+FILE_NAME_COLUMN = 0
+UNIQUE_MORPHS_COLUMN = 1
+UNIQUE_KNOWN_COLUMN = 2
+UNIQUE_LEARNING_COLUMN = 3
+UNIQUE_UNKNOWNS_COLUMN = 4
+TOTAL_MORPHS_COLUMN = 5
+TOTAL_KNOWN_COLUMN = 6
+TOTAL_LEARNING_COLUMN = 7
+TOTAL_UNKNOWNS_COLUMN = 8
+NUMBER_OF_COLUMNS = 9
+
+TOTAL_ROW_FILE_NAME = "Total"
+
+_HEADERS: list[str] = [
+    "File",
+    "Unique\nMorphs",
+    "Unique\nKnown",
+    "Unique\nLearning",
+    "Unique\nUnknown",
+    "Total\nMorphs",
+    "Total\nKnown",
+    "Total\nLearning",
+    "Total\nUnknown",
+]
+
+# every column except the file name column has a number
+_NUMBERS_PER_ROW = NUMBER_OF_COLUMNS - 1
+
+# placeholder for the rows that have not been processed yet
+_NO_NUMBER = -1
+
+
+def get_report_numbers(file_morphs_stats: FileMorphsStats) -> tuple[int, ...]:
+    """
+    Returns the numbers of a report row in the order of the columns.
+    """
+    unique_known = len(file_morphs_stats.unique_known)
+    unique_learning = len(file_morphs_stats.unique_learning)
+    unique_unknowns = len(file_morphs_stats.unique_unknowns)
+
+    return (
+        unique_known + unique_learning + unique_unknowns,
+        unique_known,
+        unique_learning,
+        unique_unknowns,
+        file_morphs_stats.total_known
+        + file_morphs_stats.total_learning
+        + file_morphs_stats.total_unknowns,
+        file_morphs_stats.total_known,
+        file_morphs_stats.total_learning,
+        file_morphs_stats.total_unknowns,
+    )
+
+
+class ReadabilityReportModel(QAbstractTableModel):
+    """
+    Holds the numbers of the readability report in a single flat array instead of
+    creating a table item for every cell. The views only ask for the cells that are
+    visible, which keeps the ui responsive even with thousands of files.
+
+    The numerical and the percentage tables share this model, each through their
+    own ReadabilityReportProxyModel that handles the sorting and the formatting.
+    """
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._file_names: list[str] = []
+        self._numbers: array[int] = array("q")
+
+    def set_file_names(self, file_names: list[str]) -> None:
+        # used when the files are loaded, before any report has been generated
+        self.beginResetModel()
+        self._file_names = file_names
+        self._numbers = array("q")
+        self.endResetModel()
+
+    def start_report(self, file_names: list[str]) -> None:
+        """
+        Adds the "Total" row and clears the numbers of all the rows, the numbers
+        are then filled in with update_rows as the files are processed.
+        """
+        self.beginResetModel()
+        self._file_names = file_names + [TOTAL_ROW_FILE_NAME]
+        self._numbers = array("q", [_NO_NUMBER]) * (
+            len(self._file_names) * _NUMBERS_PER_ROW
+        )
+        self.endResetModel()
+
+    def update_rows(self, rows_numbers: list[tuple[int, tuple[int, ...]]]) -> None:
+        if len(rows_numbers) == 0:
+            return
+
+        for row, numbers in rows_numbers:
+            assert len(numbers) == _NUMBERS_PER_ROW
+            start_index = row * _NUMBERS_PER_ROW
+            self._numbers[start_index : start_index + _NUMBERS_PER_ROW] = array(
+                "q", numbers
+            )
+
+        # the proxy models re-sort the rows when they get this signal
+        rows = [row for row, _ in rows_numbers]
+        self.dataChanged.emit(
+            self.index(min(rows), UNIQUE_MORPHS_COLUMN),
+            self.index(max(rows), NUMBER_OF_COLUMNS - 1),
+        )
+
+    def get_file_name(self, row: int) -> str:
+        return self._file_names[row]
+
+    def get_number(self, row: int, column: int) -> int | None:
+        """
+        Returns None if no report has been generated yet,
+        or if the file has not been processed yet.
+        """
+        assert column != FILE_NAME_COLUMN
+        if len(self._numbers) == 0:
+            return None
+        number = self._numbers[row * _NUMBERS_PER_ROW + column - 1]
+        return None if number == _NO_NUMBER else number
+
+    def get_percent(self, row: int, column: int) -> float | None:
+        """
+        Returns None for the columns that are not shown as percentages
+        (file name, unique morphs and total morphs).
+        """
+        if column in (
+            UNIQUE_KNOWN_COLUMN,
+            UNIQUE_LEARNING_COLUMN,
+            UNIQUE_UNKNOWNS_COLUMN,
+        ):
+            all_morphs_column = UNIQUE_MORPHS_COLUMN
+        elif column in (
+            TOTAL_KNOWN_COLUMN,
+            TOTAL_LEARNING_COLUMN,
+            TOTAL_UNKNOWNS_COLUMN,
+        ):
+            all_morphs_column = TOTAL_MORPHS_COLUMN
+        else:
+            return None
+
+        number = self.get_number(row, column)
+        all_morphs = self.get_number(row, all_morphs_column)
+
+        if number is None or all_morphs is None:
+            return None
+        if all_morphs == 0:
+            return 0
+
+        return round((number / all_morphs) * 100, 1)
+
+    def rowCount(  # pylint:disable=invalid-name
+        self, parent: QModelIndex = QModelIndex()
+    ) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._file_names)
+
+    def columnCount(  # pylint:disable=invalid-name
+        self, parent: QModelIndex = QModelIndex()
+    ) -> int:
+        if parent.isValid():
+            return 0
+        return NUMBER_OF_COLUMNS
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        row: int = index.row()
+        column: int = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == FILE_NAME_COLUMN:
+                return self._file_names[row]
+            number = self.get_number(row, column)
+            return None if number is None else str(number)
+
+        if role == Qt.ItemDataRole.TextAlignmentRole and column != FILE_NAME_COLUMN:
+            return Qt.AlignmentFlag.AlignCenter
+
+        return None
+
+    def headerData(  # pylint:disable=invalid-name
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return _HEADERS[section]
+        # the vertical header shows the row numbers
+        return super().headerData(section, orientation, role)
+
+
+class ReadabilityReportProxyModel(QSortFilterProxyModel):
+    """
+    Sorts the rows of the ReadabilityReportModel by their values instead of by
+    the displayed text, and shows the numbers as percentages if specified.
+    """
+
+    def __init__(
+        self,
+        source_model: ReadabilityReportModel,
+        show_percentages: bool,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._source_model: ReadabilityReportModel = source_model
+        self._show_percentages: bool = show_percentages
+        self.setSourceModel(source_model)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if self._show_percentages and role == Qt.ItemDataRole.DisplayRole:
+            source_index = self.mapToSource(index)
+            percent = self._source_model.get_percent(
+                source_index.row(), source_index.column()
+            )
+            if percent is not None:
+                return f"{percent} %"
+        return super().data(index, role)
+
+    def lessThan(  # pylint:disable=invalid-name
+        self, source_left: QModelIndex, source_right: QModelIndex
+    ) -> bool:
+        if source_left.column() == FILE_NAME_COLUMN:
+            return self._source_model.get_file_name(
+                source_left.row()
+            ) < self._source_model.get_file_name(source_right.row())
+
+        return self._get_sort_value(source_left) < self._get_sort_value(source_right)
+
+    def _get_sort_value(self, source_index: QModelIndex) -> float:
+        value: float | None = None
+
+        if self._show_percentages:
+            value = self._source_model.get_percent(
+                source_index.row(), source_index.column()
+            )
+
+        if value is None:
+            value = self._source_model.get_number(
+                source_index.row(), source_index.column()
+            )
+
+        # the rows don't have any numbers before they have been processed
+        return -1 if value is None else value
+
+    def get_source_row(self, row: int) -> int:
+        return self.mapToSource(self.index(row, FILE_NAME_COLUMN)).row()
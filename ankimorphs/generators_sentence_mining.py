@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from itertools import groupby
+from operator import itemgetter
+
+from .corpus_db import CorpusDB
+
+# (file_id, line_number)
+LineLocation = tuple[int, int]
+
+
+class UnknownMorphsLineIndex:
+    """
+    Keeps track of how many unknown morphs every line of the corpus has, which
+    makes it possible to find all the lines with exactly N unknown morphs, e.g.
+    the i+1 sentences (N=1) where the unknown morph is the one to learn.
+
+    The morphs have an inverted index to the lines they are found in, so when
+    the learning statuses change, only the counters of the affected lines have
+    to be updated instead of checking every line of the corpus again.
+    """
+
+    def __init__(self) -> None:
+        self.line_locations: list[LineLocation] = []
+        self._line_morph_ids: list[tuple[int, ...]] = []
+        self._morph_lines: dict[int, list[int]] = {}
+        self._unknown_counts: list[int] = []
+        self._lines_by_unknown_count: dict[int, set[int]] = {}
+        self._known_morph_ids: set[int] = set()
+
+    def add_line(self, line_location: LineLocation, morph_ids: Iterable[int]) -> None:
+        line_index: int = len(self.line_locations)
+        line_morph_ids: tuple[int, ...] = tuple(set(morph_ids))
+
+        self.line_locations.append(line_location)
+        self._line_morph_ids.append(line_morph_ids)
+
+        for morph_id in line_morph_ids:
+            self._morph_lines.setdefault(morph_id, []).append(line_index)
+
+        unknown_count: int = sum(
+            1 for morph_id in line_morph_ids if morph_id not in self._known_morph_ids
+        )
+        self._unknown_counts.append(unknown_count)
+        self._lines_by_unknown_count.setdefault(unknown_count, set()).add(line_index)
+
+    def set_known_morphs(self, known_morph_ids: set[int]) -> None:
+        """
+        Only the lines of the morphs whose status changed are updated.
+        """
+        for morph_id in known_morph_ids - self._known_morph_ids:
+            for line_index in self._morph_lines.get(morph_id, []):
+                self._change_unknown_count(line_index, -1)
+
+        for morph_id in self._known_morph_ids - known_morph_ids:
+            for line_index in self._morph_lines.get(morph_id, []):
+                self._change_unknown_count(line_index, 1)
+
+        self._known_morph_ids = set(known_morph_ids)
+
+    def get_lines_with_unknowns(self, number_of_unknowns: int) -> list[int]:
+        # sorted to keep the lines in corpus order
+        return sorted(self._lines_by_unknown_count.get(number_of_unknowns, set()))
+
+    def get_unknown_morph_ids(self, line_index: int) -> tuple[int, ...]:
+        return tuple(
+            sorted(
+                morph_id
+                for morph_id in self._line_morph_ids[line_index]
+                if morph_id not in self._known_morph_ids
+            )
+        )
+
+    def _change_unknown_count(self, line_index: int, difference: int) -> None:
+        unknown_count: int = self._unknown_counts[line_index]
+        self._lines_by_unknown_count[unknown_count].discard(line_index)
+
+        unknown_count += difference
+        self._unknown_counts[line_index] = unknown_count
+        self._lines_by_unknown_count.setdefault(unknown_count, set()).add(line_index)
+
+
+def create_line_index(
+    corpus_db: CorpusDB, file_ids: list[int]
+) -> UnknownMorphsLineIndex:
+    """
+    Reads the lines of the files from the corpus index, all the morphs start as unknown.
+    """
+    line_index = UnknownMorphsLineIndex()
+
+    for file_id in file_ids:
+        line_morph_ids = corpus_db.get_line_morph_ids(file_id)
+        for line_number, rows in groupby(line_morph_ids, key=itemgetter(0)):
+            line_index.add_line(
+                (file_id, line_number), (morph_id for _, morph_id in rows)
+            )
+
+    return line_index
+
+
+def get_lines_by_unknown_morphs(
+    line_index: UnknownMorphsLineIndex,
+    number_of_unknowns: int,
+    morph_priorities: dict[int, int],
+) -> dict[tuple[int, ...], list[int]]:
+    """
+    Groups the lines with the given number of unknown morphs by those unknown
+    morphs. The groups are sorted by the priority of their least frequent
+    morph (lower is better), i.e. the morphs that unlock the most lines first.
+    """
+    lines_by_unknown_morphs: dict[tuple[int, ...], list[int]] = {}
+
+    for line in line_index.get_lines_with_unknowns(number_of_unknowns):
+        unknown_morph_ids = line_index.get_unknown_morph_ids(line)
+        lines_by_unknown_morphs.setdefault(unknown_morph_ids, []).append(line)
+
+    # the sort is stable, so the ties keep the corpus order
+    return dict(
+        sorted(
+            lines_by_unknown_morphs.items(),
+            key=lambda item: max(
+                (morph_priorities[morph_id] for morph_id in item[0]), default=0
+            ),
+        )
+    )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import html
+import re
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+# The subtitle files contain a lot of lines that are not dialogue, e.g. sequence
+# numbers, timestamps and styling. These parsers go through the files line by line
+# and only yield the dialogue, that way the rest never reaches the morphemizers.
+
+# <i>, </font>, <c.yellow>, <v Speaker>, <00:00:01.000>, etc.
+_html_tags_regex = re.compile(r"<[^>]*>")
+
+# the ruby text (furigana) would be counted as separate morphs
+_vtt_ruby_text_regex = re.compile(r"<rt>.*?</rt>")
+
+# ass/ssa override blocks, e.g. {\an8} or {\pos(400,570)\c&H00FFFF&}
+_ass_override_blocks_regex = re.compile(r"\{[^}]*\}")
+
+# \N and \n are the ass/ssa line breaks
+_ass_line_breaks_regex = re.compile(r"\\[Nn]")
+
+_TIMING_SEPARATOR = "-->"
+
+# 'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text'
+_DEFAULT_ASS_EVENT_FIELDS = 10
+
+
+def get_dialogue_lines(file: TextIO, file_extension: str) -> Iterable[str]:
+    file_extension = file_extension.lower()
+
+    if file_extension == ".srt":
+        return get_srt_dialogue_lines(file)
+    if file_extension == ".vtt":
+        return get_vtt_dialogue_lines(file)
+    if file_extension in (".ass", ".ssa"):
+        return get_ass_dialogue_lines(file)
+
+    # .txt, .md, etc. are used as they are
+    return file
+
+
+def get_srt_dialogue_lines(lines: Iterable[str]) -> Iterator[str]:
+    # 1
+    # 00:00:12,727 --> 00:00:17,815
+    # <i>dialogue</i>
+    # more dialogue
+    #
+    # 2
+    # ...
+    for line in _get_cue_text_lines(lines):
+        if "<" in line or "{" in line:
+            line = _html_tags_regex.sub("", line)
+            # some srt files use the ass positioning tags, e.g. {\an8}
+            line = _ass_override_blocks_regex.sub("", line)
+        yield line
+
+
+def get_vtt_dialogue_lines(lines: Iterable[str]) -> Iterator[str]:
+    # WEBVTT
+    #
+    # NOTE comments, STYLE and REGION blocks don't have any timings
+    #
+    # optional-cue-identifier
+    # 00:01.000 --> 00:04.000 position:10%,line-left align:left
+    # <v Speaker>dialogue with <c.yellow>styling</c> &amp; entities
+    for line in _get_cue_text_lines(lines):
+        if "<" in line:
+            line = _vtt_ruby_text_regex.sub("", line)
+            line = _html_tags_regex.sub("", line)
+        if "&" in line:
+            line = html.unescape(line)
+        yield line
+
+
+def _get_cue_text_lines(lines: Iterable[str]) -> Iterator[str]:
+    # Both srt and vtt files consist of blocks separated by blank lines, where the cue
+    # text comes after the timing line. Everything before the timing line (sequence
+    # numbers, cue identifiers) and the blocks without any timings are skipped.
+    is_cue_text: bool = False
+
+    for line in lines:
+        if line.strip() == "":
+            is_cue_text = False
+        elif is_cue_text:
+            yield line
+        elif _TIMING_SEPARATOR in line:
+            is_cue_text = True
+
+
+def get_ass_dialogue_lines(lines: Iterable[str]) -> Iterator[str]:
+    # [Script Info]
+    # ...
+    # [Events]
+    # Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+    # Dialogue: 0,0:00:12.72,0:00:17.81,Default,,0,0,0,,{\i1}dialogue{\i0}\Nmore dialogue
+    # Comment: 0,0:00:18.56,0:00:20.27,Default,,0,0,0,,not shown on screen
+    is_events_section: bool = False
+    number_of_fields: int = _DEFAULT_ASS_EVENT_FIELDS
+
+    for line in lines:
+        line = line.strip()
+
+        if line.startswith("["):
+            is_events_section = line.lower() == "[events]"
+            continue
+
+        if not is_events_section:
+            continue
+
+        if line.startswith("Format:"):
+            number_of_fields = len(line.split(","))
+        elif line.startswith("Dialogue:"):
+            # the text is the last field and is the only one that can contain commas
+            fields: list[str] = line.split(",", maxsplit=number_of_fields - 1)
+            if len(fields) < number_of_fields:
+                continue
+
+            text: str = fields[-1]
+            if "{" in text:
+                text = _ass_override_blocks_regex.sub("", text)
+
+            # \h is a non-breaking space
+            text = text.replace("\\h", " ")
+            yield from _ass_line_breaks_regex.split(text)
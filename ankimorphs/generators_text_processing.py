@@ -4,12 +4,17 @@
 # over-abstraction--the uses cases are sufficiently different that they
 # should be kept separate.
 
+from __future__ import annotations
+
+import hashlib
 import re
-from typing import Any, TextIO
+from collections.abc import Iterator, Sequence
+from itertools import islice
+from typing import Any, Callable, TextIO
 
-from . import text_preprocessing
+from . import generators_subtitle_parsing, name_file_utils, text_preprocessing
 from .morpheme import Morpheme, MorphOccurrence
-from .morphemizer import Morphemizer
+from .morphemizer import Morphemizer, MorphemizerCache
 from .text_preprocessing import (
     remove_names_textfile,
     round_brackets_regex,
@@ -18,43 +23,152 @@ from .text_preprocessing import (
 )
 from .ui.generators_window_ui import Ui_GeneratorsWindow
 
+# The files are read line by line and processed in batches of this many lines, that
+# way the memory usage depends on the number of unique morphs instead of the file size.
+LINE_BATCH_SIZE: int = 1000
+
+# Part of the generators cache key, this has to be incremented whenever the morph occurrences
+# of a file change without the file itself changing, e.g. when the subtitle parsing is changed.
+GENERATORS_CACHE_VERSION: int = 1
+
 
 class PreprocessOptions:
-    def __init__(self, ui: Ui_GeneratorsWindow):
-        self.filter_square_brackets: bool = ui.squareBracketsCheckBox.isChecked()
-        self.filter_round_brackets: bool = ui.roundBracketsCheckBox.isChecked()
-        self.filter_slim_round_brackets: bool = ui.slimRoundBracketsCheckBox.isChecked()
-        self.filter_numbers: bool = ui.numbersCheckBox.isChecked()
-        self.filter_morphemizer_names: bool = ui.namesMorphemizerCheckBox.isChecked()
-        self.filter_names_from_file: bool = ui.namesFileCheckBox.isChecked()
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        filter_square_brackets: bool = False,
+        filter_round_brackets: bool = False,
+        filter_slim_round_brackets: bool = False,
+        filter_numbers: bool = False,
+        filter_morphemizer_names: bool = False,
+        filter_names_from_file: bool = False,
+    ):
+        self.filter_square_brackets: bool = filter_square_brackets
+        self.filter_round_brackets: bool = filter_round_brackets
+        self.filter_slim_round_brackets: bool = filter_slim_round_brackets
+        self.filter_numbers: bool = filter_numbers
+        self.filter_morphemizer_names: bool = filter_morphemizer_names
+        self.filter_names_from_file: bool = filter_names_from_file
+
+    @staticmethod
+    def from_ui(ui: Ui_GeneratorsWindow) -> PreprocessOptions:
+        return PreprocessOptions(
+            filter_square_brackets=ui.squareBracketsCheckBox.isChecked(),
+            filter_round_brackets=ui.roundBracketsCheckBox.isChecked(),
+            filter_slim_round_brackets=ui.slimRoundBracketsCheckBox.isChecked(),
+            filter_numbers=ui.numbersCheckBox.isChecked(),
+            filter_morphemizer_names=ui.namesMorphemizerCheckBox.isChecked(),
+            filter_names_from_file=ui.namesFileCheckBox.isChecked(),
+        )
+
+    def get_cache_key(self) -> str:
+        # Identifies the options in the generators cache (see 'Generator_Files' in ankimorphs_db.py)
+        options: list[str] = [f"version={GENERATORS_CACHE_VERSION}"]
+        options += [f"{name}={value}" for name, value in vars(self).items()]
 
+        if self.filter_names_from_file:
+            # the names file can be changed between runs
+            names = "\n".join(sorted(name_file_utils.get_names_from_file()))
+            options.append(hashlib.sha256(names.encode()).hexdigest())
 
-def create_file_morph_occurrences(
+        return ",".join(options)
+
+
+def create_file_morph_occurrences(  # pylint:disable=too-many-arguments
     preprocess_options: PreprocessOptions,
     file: TextIO,
     morphemizer: Morphemizer,
     nlp: Any,
+    batch_size: int = LINE_BATCH_SIZE,
+    spacy_lines_cache: MorphemizerCache | None = None,
+    file_extension: str = ".txt",
+    on_lines_batch: Callable[[list[str], list[Sequence[Morpheme]]], None] | None = None,
 ) -> dict[str, MorphOccurrence]:
     # nlp: spacy.Language
+    #
+    # spacy_lines_cache: the morphemizers have their own caches, but spaCy doesn't,
+    # so the generators can share this cache between the files to only process
+    # lines that are repeated across the files once.
+    #
+    # on_lines_batch: called with every batch of lines (as found in the file)
+    # and the morphs of each of those lines, used for the corpus index.
+    morph_occurrences: dict[str, MorphOccurrence] = {}
 
-    all_lines: list[str] = []
-    morph_occurrences: dict[str, MorphOccurrence]
+    # only the dialogue of subtitle files is used, see 'get_dialogue_lines'
+    lines_iterator: Iterator[str] = iter(
+        generators_subtitle_parsing.get_dialogue_lines(file, file_extension)
+    )
+
+    while True:
+        lines_batch: list[str] = list(islice(lines_iterator, batch_size))
+        if len(lines_batch) == 0:
+            break
 
-    for line in file:
         # lower-case to avoid proper noun false-positives
-        filtered_lines = filter_line(preprocess_options, line=line.lower())
-        all_lines.append(filtered_lines)
+        filtered_lines: list[str] = [
+            filter_line(preprocess_options, line=line.lower()) for line in lines_batch
+        ]
+
+        counted_morphs_by_line: dict[str, tuple[Sequence[Morpheme], int]] = (
+            _get_counted_morphs_by_line(
+                preprocess_options,
+                morphemizer,
+                nlp,
+                filtered_lines,
+                batch_size,
+                spacy_lines_cache,
+            )
+        )
+
+        for line_morphs, line_count in counted_morphs_by_line.values():
+            _add_morph_occurrences(morph_occurrences, line_morphs, line_count)
+
+        if on_lines_batch is not None:
+            on_lines_batch(
+                lines_batch,
+                [counted_morphs_by_line[line][0] for line in filtered_lines],
+            )
+
+    return morph_occurrences
+
 
+def _get_counted_morphs_by_line(  # pylint:disable=too-many-arguments
+    preprocess_options: PreprocessOptions,
+    morphemizer: Morphemizer,
+    nlp: Any,
+    filtered_lines: list[str],
+    batch_size: int,
+    spacy_lines_cache: MorphemizerCache | None,
+) -> dict[str, tuple[Sequence[Morpheme], int]]:
+    # Subtitles repeat a lot of lines ("はい", the opening song lyrics, etc.), so the
+    # identical lines in a batch are counted and only morphemized once. The dict keeps
+    # the order the lines were first found in, which means the morphs are also added
+    # in the order they are found in the file.
+    line_counts: dict[str, int] = {}
+    for line in filtered_lines:
+        line_counts[line] = line_counts.get(line, 0) + 1
+
+    morphs_by_line: dict[str, Sequence[Morpheme]]
     if nlp is not None:
-        morph_occurrences = get_morph_occurrences_by_spacy(
-            preprocess_options, nlp, all_lines
+        morphs_by_line = get_morphs_by_line_spacy(
+            preprocess_options,
+            nlp,
+            list(line_counts),
+            batch_size,
+            spacy_lines_cache,
         )
     else:
-        morph_occurrences = get_morph_occurrences_by_morphemizer(
-            preprocess_options, morphemizer, all_lines
+        # the lines repeated in earlier batches or other files are
+        # found in the morphemizer cache, see 'MorphemizerCache'
+        morphs_by_line = dict(
+            zip(
+                line_counts,
+                get_morphs_from_lines_morphemizer(
+                    preprocess_options, morphemizer, list(line_counts)
+                ),
+            )
         )
 
-    return morph_occurrences
+    return {line: (morphs_by_line[line], count) for line, count in line_counts.items()}
 
 
 def filter_line(preprocess: PreprocessOptions, line: str) -> str:
@@ -77,21 +191,32 @@ def filter_line(preprocess: PreprocessOptions, line: str) -> str:
     return line
 
 
-def get_morph_occurrences_by_spacy(
-    preprocess_options: PreprocessOptions, nlp: Any, all_lines: list[str]
-) -> dict[str, MorphOccurrence]:
-    morph_occurrences: dict[str, MorphOccurrence] = {}
-
-    for doc in nlp.pipe(all_lines):
+def get_morphs_by_line_spacy(
+    preprocess_options: PreprocessOptions,
+    nlp: Any,
+    lines: list[str],
+    batch_size: int = LINE_BATCH_SIZE,
+    lines_cache: MorphemizerCache | None = None,
+) -> dict[str, Sequence[Morpheme]]:
+    morphs_by_line: dict[str, Sequence[Morpheme]] = {}
+    uncached_lines: list[str] = []
+
+    for line in lines:
+        cached_morphs = None if lines_cache is None else lines_cache.get(line)
+        if cached_morphs is None:
+            uncached_lines.append(line)
+        else:
+            morphs_by_line[line] = cached_morphs
+
+    for line, doc in zip(
+        uncached_lines, nlp.pipe(uncached_lines, batch_size=batch_size)
+    ):
         morphs: list[Morpheme] = get_morphs_from_line_spacy(preprocess_options, doc=doc)
-        for morph in morphs:
-            key = morph.lemma + morph.inflection
-            if key in morph_occurrences:
-                morph_occurrences[key].occurrence += 1
-            else:
-                morph_occurrences[key] = MorphOccurrence(morph)
+        morphs_by_line[line] = morphs
+        if lines_cache is not None:
+            lines_cache.put(line, morphs)
 
-    return morph_occurrences
+    return morphs_by_line
 
 
 def get_morphs_from_line_spacy(
@@ -122,35 +247,34 @@ def get_morphs_from_line_spacy(
     return morphs
 
 
-def get_morph_occurrences_by_morphemizer(
-    preprocess_options: PreprocessOptions,
-    morphemizer: Morphemizer,
-    all_lines: list[str],
-) -> dict[str, MorphOccurrence]:
-    morph_occurrences: dict[str, MorphOccurrence] = {}
-
-    for line in all_lines:
-        morphs: list[Morpheme] = get_morphs_from_line_morphemizer(
-            preprocess_options=preprocess_options,
-            morphemizer=morphemizer,
-            line=line,
-        )
-        for morph in morphs:
-            key = morph.lemma + morph.inflection
-            if key in morph_occurrences:
-                morph_occurrences[key].occurrence += 1
-            else:
-                morph_occurrences[key] = MorphOccurrence(morph)
-
-    return morph_occurrences
-
-
-def get_morphs_from_line_morphemizer(
-    preprocess_options: PreprocessOptions, morphemizer: Morphemizer, line: str
-) -> list[Morpheme]:
-    morphs: list[Morpheme] = morphemizer.get_morphemes_from_expr(line)
+def _add_morph_occurrences(
+    morph_occurrences: dict[str, MorphOccurrence],
+    morphs: Sequence[Morpheme],
+    line_count: int,
+) -> None:
+    for morph in morphs:
+        key = morph.lemma + morph.inflection
+        if key in morph_occurrences:
+            morph_occurrences[key].occurrence += line_count
+        else:
+            morph_occurrence = MorphOccurrence(morph)
+            morph_occurrence.occurrence = line_count
+            morph_occurrences[key] = morph_occurrence
+
+
+def get_morphs_from_lines_morphemizer(
+    preprocess_options: PreprocessOptions, morphemizer: Morphemizer, lines: list[str]
+) -> list[list[Morpheme]]:
+    morphs_batch: list[list[Morpheme]] = morphemizer.get_morphemes_from_expr_batch(
+        lines
+    )
     if preprocess_options.filter_morphemizer_names:
-        morphs = text_preprocessing.remove_names_morphemizer(morphs)
+        morphs_batch = [
+            text_preprocessing.remove_names_morphemizer(morphs)
+            for morphs in morphs_batch
+        ]
     if preprocess_options.filter_names_from_file:
-        morphs = text_preprocessing.remove_names_textfile(morphs)
-    return morphs
+        morphs_batch = [
+            text_preprocessing.remove_names_textfile(morphs) for morphs in morphs_batch
+        ]
+    return morphs_batch
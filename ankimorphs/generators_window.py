@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import csv
-import os
+import time
 from functools import partial
 from pathlib import Path
 from typing import Any, Callable
@@ -11,36 +11,52 @@ from anki.collection import Collection
 from aqt import mw
 from aqt.operations import QueryOp
 from aqt.qt import (  # pylint:disable=no-name-in-module
-    QAbstractItemView,
     QDialog,
     QDir,
     QFileDialog,
     QHeaderView,
     QMainWindow,
-    Qt,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
 )
 from aqt.utils import tooltip
 
 from . import (
     ankimorphs_globals,
-    generators_text_processing,
+    generators_processing,
     morphemizer,
     readability_report_utils,
     spacy_wrapper,
 )
 from .ankimorphs_config import AnkiMorphsConfig
 from .ankimorphs_db import AnkiMorphsDB
+from .corpus_db import CorpusDB
 from .exceptions import CancelledOperationException, EmptyFileSelectionException
+from .generators_comprehension_curve import get_comprehension_curve, get_morphs_needed
 from .generators_output_dialog import GeneratorOutputDialog, OutputOptions
+from .generators_processing import GeneratorsProcessor
+from .generators_report_model import (
+    FILE_NAME_COLUMN,
+    NUMBER_OF_COLUMNS,
+    TOTAL_ROW_FILE_NAME,
+    UNIQUE_MORPHS_COLUMN,
+    ReadabilityReportModel,
+    ReadabilityReportProxyModel,
+    get_report_numbers,
+)
+from .generators_sentence_mining import (
+    UnknownMorphsLineIndex,
+    create_line_index,
+    get_lines_by_unknown_morphs,
+)
 from .generators_text_processing import PreprocessOptions
-from .morpheme import MorphOccurrence
+from .morpheme import Morpheme, MorphOccurrence
 from .morphemizer import Morphemizer, SpacyMorphemizer
 from .readability_report_utils import FileMorphsStats
-from .table_utils import QTableWidgetIntegerItem, QTableWidgetPercentItem
 from .ui.generators_window_ui import Ui_GeneratorsWindow
 
+# how often the report table is updated while the files are being processed
+_REPORT_UPDATE_INTERVAL_SECONDS = 0.5
+
 
 class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attributes
     ##############################################################################
@@ -57,51 +73,46 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
 
         self._input_files: list[Path] = []
 
-        self._file_name_column = 0
-        self._unique_morphs_column = 1
-        self._unique_known_column = 2
-        self._unique_learning_column = 3
-        self._unique_unknowns_column = 4
-        self._total_morphs_column = 5
-        self._total_known_column = 6
-        self._total_learning_column = 7
-        self._total_unknowns_column = 8
-        self._number_of_columns = 9
+        # both tables share the same model, but sort and format it differently
+        self._report_model = ReadabilityReportModel(parent=self)
+        self._numerical_proxy_model = ReadabilityReportProxyModel(
+            self._report_model, show_percentages=False, parent=self
+        )
+        self._percent_proxy_model = ReadabilityReportProxyModel(
+            self._report_model, show_percentages=True, parent=self
+        )
 
         self._morphemizers: list[Morphemizer] = morphemizer.get_all_morphemizers()
         self._populate_morphemizers()
         self._setup_checkboxes()
         self._input_dir_root: Path
 
-        self._setup_table(self.ui.numericalTableWidget)
-        self._setup_table(self.ui.percentTableWidget)
+        # The line index of the i+1 sentences is kept between the runs, if the
+        # files are unchanged only the learning statuses have to be updated.
+        self._sentences_line_index: UnknownMorphsLineIndex | None = None
+        self._sentences_line_index_files: list[tuple[int, int, int]] = []
+
+        self._setup_table(self.ui.numericalTableView, self._numerical_proxy_model)
+        self._setup_table(self.ui.percentTableView, self._percent_proxy_model)
         self._setup_buttons()
 
         self.show()
 
-    def _setup_table(self, table: QTableWidget) -> None:
+    def _setup_table(
+        self, table: QTableView, proxy_model: ReadabilityReportProxyModel
+    ) -> None:
+        table.setModel(proxy_model)
+        table.setSortingEnabled(True)
         table.setAlternatingRowColors(True)
-        table.setColumnCount(self._number_of_columns)
-
-        table.setColumnWidth(self._file_name_column, 200)
-        table.setColumnWidth(self._unique_morphs_column, 90)
-        table.setColumnWidth(self._unique_known_column, 90)
-        table.setColumnWidth(self._unique_learning_column, 90)
-        table.setColumnWidth(self._unique_unknowns_column, 90)
-        table.setColumnWidth(self._total_morphs_column, 90)
-        table.setColumnWidth(self._total_known_column, 90)
-        table.setColumnWidth(self._total_learning_column, 90)
-        table.setColumnWidth(self._total_unknowns_column, 90)
+
+        table.setColumnWidth(FILE_NAME_COLUMN, 200)
+        for column in range(UNIQUE_MORPHS_COLUMN, NUMBER_OF_COLUMNS):
+            table.setColumnWidth(column, 90)
 
         table_horizontal_headers: QHeaderView | None = table.horizontalHeader()
         assert table_horizontal_headers is not None
         table_horizontal_headers.setSectionsMovable(True)
 
-        # disables manual editing of the table
-        self.ui.numericalTableWidget.setEditTriggers(
-            QAbstractItemView.EditTrigger.NoEditTriggers
-        )
-
     def _setup_buttons(self) -> None:
         self.ui.selectFolderPushButton.clicked.connect(self._on_select_folder_clicked)
         self.ui.loadFilesPushButton.clicked.connect(self._on_load_files_button_clicked)
@@ -112,11 +123,17 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
             self._generate_frequency_file
         )
         self.ui.generateStudyPlanPushButton.clicked.connect(self._generate_study_plan)
+        self.ui.generateSentencesPushButton.clicked.connect(self._generate_sentences)
+        self.ui.generateComprehensionCurvePushButton.clicked.connect(
+            self._generate_comprehension_curve
+        )
 
         # disable generator buttons until files have been loaded
         self.ui.generateReportPushButton.setDisabled(True)
         self.ui.generateFrequencyFilePushButton.setDisabled(True)
         self.ui.generateStudyPlanPushButton.setDisabled(True)
+        self.ui.generateSentencesPushButton.setDisabled(True)
+        self.ui.generateComprehensionCurvePushButton.setDisabled(True)
 
     def _populate_morphemizers(self) -> None:
         morphemizer_names = [mizer.get_description() for mizer in self._morphemizers]
@@ -126,6 +143,7 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
         self.ui.txtFilesCheckBox.setChecked(True)
         self.ui.srtFilesCheckBox.setChecked(True)
         self.ui.vttFilesCheckBox.setChecked(True)
+        self.ui.assFilesCheckBox.setChecked(True)
         self.ui.mdFilesCheckBox.setChecked(True)
 
     def _on_select_folder_clicked(self) -> None:
@@ -156,6 +174,8 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
         self.ui.generateReportPushButton.setEnabled(True)
         self.ui.generateFrequencyFilePushButton.setEnabled(True)
         self.ui.generateStudyPlanPushButton.setEnabled(True)
+        self.ui.generateSentencesPushButton.setEnabled(True)
+        self.ui.generateComprehensionCurvePushButton.setEnabled(True)
 
     def _background_gather_files_and_populate_files_column(
         self, col: Collection
@@ -163,54 +183,26 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
         del col  # unused
         assert mw is not None
 
-        # clearing the list prevents duplicate when
-        # the load button is clicked more than once
-        self._input_files.clear()
-
         input_dir = self.ui.inputDirLineEdit.text()
         self._input_dir_root = Path(input_dir)
-        extensions = self._get_checked_extensions()
-
-        # os.walk goes through all the sub-dirs recursively
-        for dir_path, _, file_names in os.walk(input_dir):
-            for file_name in file_names:
-                if mw.progress.want_cancel():  # user clicked 'x'
-                    raise CancelledOperationException
-                if file_name.lower().endswith(extensions):
-                    file_path = Path(dir_path, file_name)
-                    self._input_files.append(file_path)
-
-        # without this sorting, the initial order will be (seemingly) random
-        self._input_files.sort()
+
+        # the files are replaced, which prevents duplicates when
+        # the load button is clicked more than once
+        self._input_files = generators_processing.gather_input_files(
+            self._input_dir_root,
+            self._get_checked_extensions(),
+            want_cancel=mw.progress.want_cancel,  # user clicked 'x'
+        )
         self._populate_files_column()
 
     def _populate_files_column(self) -> None:
-        # sorting has to be disabled before populating because bugs can occur
-        self.ui.numericalTableWidget.setSortingEnabled(False)
-        self.ui.percentTableWidget.setSortingEnabled(False)
-
-        # clear previous results
-        self.ui.numericalTableWidget.clearContents()
-        self.ui.percentTableWidget.clearContents()
-
-        self.ui.numericalTableWidget.setRowCount(len(self._input_files))
-        self.ui.percentTableWidget.setRowCount(len(self._input_files))
-
-        for _row, _file_name in enumerate(self._input_files):
-            relative_file_name = str(_file_name.relative_to(self._input_dir_root))
-
-            file_name_item_numerical = QTableWidgetItem(relative_file_name)
-            file_name_item_percentage = QTableWidgetItem(relative_file_name)
-
-            self.ui.numericalTableWidget.setItem(
-                _row, self._file_name_column, file_name_item_numerical
-            )
-            self.ui.percentTableWidget.setItem(
-                _row, self._file_name_column, file_name_item_percentage
-            )
-
-        self.ui.numericalTableWidget.setSortingEnabled(True)
-        self.ui.percentTableWidget.setSortingEnabled(True)
+        # this also clears the results of any previous reports
+        self._report_model.set_file_names(
+            [
+                str(_file_name.relative_to(self._input_dir_root))
+                for _file_name in self._input_files
+            ]
+        )
 
     def _get_checked_extensions(self) -> tuple[str, ...]:
         extensions = []
@@ -221,6 +213,8 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
             extensions.append(".srt")
         if self.ui.vttFilesCheckBox.isChecked():
             extensions.append(".vtt")
+        if self.ui.assFilesCheckBox.isChecked():
+            extensions.extend([".ass", ".ssa"])
         if self.ui.mdFilesCheckBox.isChecked():
             extensions.append(".md")
 
@@ -292,29 +286,70 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
         if len(self._input_files) == 0:
             raise EmptyFileSelectionException
 
-        morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]] = (
-            self._generate_morph_occurrences_by_file()
+        am_config = AnkiMorphsConfig()
+        am_db = AnkiMorphsDB()
+        highest_learning_intervals: dict[tuple[str, str], int] = (
+            am_db.get_highest_learning_intervals()
         )
+        am_db.con.close()
+
+        row_by_file: dict[Path, int] = {
+            input_file: row for row, input_file in enumerate(self._input_files)
+        }
+        total_row: int = len(self._input_files)
+
+        # the global report will be presented as a "Total" file in the table
+        global_report_morph_stats = FileMorphsStats()
+
+        # The rows are sent to the ui in batches as the files finish, that way the
+        # user can see the report fill out and cancel once they have seen enough.
+        # The model is only touched on the main thread, where the batches are
+        # applied in the order they were sent.
+        pending_rows: list[tuple[int, tuple[int, ...]]] = []
+        last_update_time: float = time.monotonic()
+
+        def send_pending_rows() -> None:
+            nonlocal last_update_time
+            pending_rows.append(
+                (total_row, get_report_numbers(global_report_morph_stats))
+            )
+            mw.taskman.run_on_main(
+                partial(self._report_model.update_rows, pending_rows.copy())
+            )
+            pending_rows.clear()
+            last_update_time = time.monotonic()
+
+        def on_file_processed(
+            input_file: Path, file_morphs: dict[str, MorphOccurrence]
+        ) -> None:
+            nonlocal global_report_morph_stats
+            file_morphs_stats = readability_report_utils.get_morph_stats_from_file(
+                am_config, highest_learning_intervals, file_morphs
+            )
+            global_report_morph_stats += file_morphs_stats
+            pending_rows.append(
+                (row_by_file[input_file], get_report_numbers(file_morphs_stats))
+            )
+            if time.monotonic() - last_update_time > _REPORT_UPDATE_INTERVAL_SECONDS:
+                send_pending_rows()
 
         mw.taskman.run_on_main(
             partial(
-                mw.progress.update,
-                label="Filling out report",
+                self._report_model.start_report,
+                [
+                    str(input_file.relative_to(self._input_dir_root))
+                    for input_file in self._input_files
+                ],
             )
         )
 
-        # sorting has to be disabled before populating because bugs can occur
-        self.ui.numericalTableWidget.setSortingEnabled(False)
-        self.ui.percentTableWidget.setSortingEnabled(False)
-
-        # clear previous results
-        self.ui.numericalTableWidget.clearContents()
-        self.ui.percentTableWidget.clearContents()
-
-        self._populate_tables_with_report(morph_occurrences_by_file)
-
-        self.ui.numericalTableWidget.setSortingEnabled(True)
-        self.ui.percentTableWidget.setSortingEnabled(True)
+        try:
+            self._get_processor().process_input_files(
+                self._input_files, on_file_processed=on_file_processed
+            )
+        finally:
+            # the files that finished before a cancellation are still shown
+            send_pending_rows()
 
     def _get_selected_morphemizer_and_nlp(self) -> tuple[Morphemizer, Any]:
         _morphemizer = self._morphemizers[self.ui.morphemizerComboBox.currentIndex()]
@@ -329,18 +364,57 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
 
         return _morphemizer, _nlp
 
-    def _generate_morph_occurrences_by_file(
-        self, sorted_by_table: int = False
-    ) -> dict[Path, dict[str, MorphOccurrence]]:
+    def _get_processor(self, require_corpus_index: bool = False) -> GeneratorsProcessor:
         """
-        'sorted_by_table=True' is used for study plans where the order matters.
+        'require_corpus_index=True' indexes the files in corpus.db even if the
+        'generators_corpus_index' option is turned off.
         """
         assert mw is not None
 
+        am_config = AnkiMorphsConfig()
         _morphemizer, _nlp = self._get_selected_morphemizer_and_nlp()
-        preprocess_options = PreprocessOptions(self.ui)
-        morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]] = {}
 
+        return GeneratorsProcessor(
+            input_dir_root=self._input_dir_root,
+            _morphemizer=_morphemizer,
+            nlp=_nlp,
+            preprocess_options=PreprocessOptions.from_ui(self.ui),
+            profile_folder=mw.pm.profileFolder(),
+            morphemizer_cache_size_mb=am_config.morphemizer_cache_size_mb,
+            index_in_corpus=am_config.generators_corpus_index or require_corpus_index,
+            want_cancel=mw.progress.want_cancel,  # user clicked 'x' button
+            on_file_progress=self._on_file_progress,
+        )
+
+    def _on_file_progress(
+        self, counter: int, file_amount: int, input_file: Path
+    ) -> None:
+        assert mw is not None
+        mw.taskman.run_on_main(
+            partial(
+                mw.progress.update,
+                label=f"Read file {counter} of {file_amount}:<br>{input_file.relative_to(self._input_dir_root)}",
+                value=counter,
+                max=file_amount,
+            )
+        )
+
+    @staticmethod
+    def _on_sorting_morphs() -> None:
+        assert mw is not None
+        mw.taskman.run_on_main(
+            partial(
+                mw.progress.update,
+                label="Sorting morphs",
+            )
+        )
+
+    def _generate_morph_occurrences_by_file(
+        self, sorted_by_table: int = False
+    ) -> dict[Path, dict[str, MorphOccurrence]]:
+        """
+        'sorted_by_table=True' is used for study plans where the order matters.
+        """
         sorted_input_files: list[Path]
 
         if sorted_by_table:
@@ -348,49 +422,25 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
         else:
             sorted_input_files = self._input_files
 
-        for input_file in sorted_input_files:
-            if mw.progress.want_cancel():  # user clicked 'x' button
-                raise CancelledOperationException
-
-            mw.taskman.run_on_main(
-                partial(
-                    mw.progress.update,
-                    label=f"Reading file:<br>{input_file.relative_to(self._input_dir_root)}",
-                )
-            )
-
-            with open(input_file, encoding="utf-8") as file:
-                file_morph_occurrences: dict[str, MorphOccurrence] = (
-                    generators_text_processing.create_file_morph_occurrences(
-                        preprocess_options=preprocess_options,
-                        file=file,
-                        morphemizer=_morphemizer,
-                        nlp=_nlp,
-                    )
-                )
-                morph_occurrences_by_file[input_file] = file_morph_occurrences
-
-        return morph_occurrences_by_file
+        return self._get_processor().get_morph_occurrences_by_file(sorted_input_files)
 
     def _get_input_files_table_sorted(self) -> list[Path]:
         sorted_input_files: list[Path] = []
-        current_table: QTableWidget | None = None
+        current_proxy_model: ReadabilityReportProxyModel | None = None
 
         if self.ui.tablesTabWidget.currentIndex() == 0:
-            current_table = self.ui.numericalTableWidget
+            current_proxy_model = self._numerical_proxy_model
         elif self.ui.tablesTabWidget.currentIndex() == 1:
-            current_table = self.ui.percentTableWidget
+            current_proxy_model = self._percent_proxy_model
 
-        assert current_table is not None
+        assert current_proxy_model is not None
 
-        for row in range(current_table.rowCount()):
-            file_name_item: QTableWidgetItem | None = current_table.item(
-                row, self._file_name_column
+        for row in range(current_proxy_model.rowCount()):
+            file_name_text: str = self._report_model.get_file_name(
+                current_proxy_model.get_source_row(row)
             )
-            assert file_name_item is not None
-            file_name_text: str = file_name_item.text()
 
-            if file_name_text == "Total":
+            if file_name_text == TOTAL_ROW_FILE_NAME:
                 continue
 
             # the root dir is stripped when loading the files, so we have to add it back
@@ -398,233 +448,103 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
 
         return sorted_input_files
 
-    def _populate_tables_with_report(
-        self, morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]]
-    ) -> None:
-        am_config = AnkiMorphsConfig()
-        am_db = AnkiMorphsDB()
-
-        self.ui.numericalTableWidget.setRowCount(len(self._input_files) + 1)
-        self.ui.percentTableWidget.setRowCount(len(self._input_files) + 1)
-
-        # the global report will be presented as a "Total" file in the table
-        global_report_morph_stats = FileMorphsStats()
-
-        for row, input_file in enumerate(self._input_files):
-            file_morphs = morph_occurrences_by_file[input_file]
-
-            file_morphs_stats = readability_report_utils.get_morph_stats_from_file(
-                am_config, am_db, file_morphs
-            )
-            global_report_morph_stats += file_morphs_stats
-
-            self._populate_numerical_table(input_file, row, file_morphs_stats)
-            self._populate_percentage_table(input_file, row, file_morphs_stats)
-
-        self._add_total_row_to_tables(global_report_morph_stats)
-
-        am_db.con.close()
-
-    def _populate_numerical_table(  # pylint:disable=too-many-locals
-        self,
-        input_file: Path,
-        row: int,
-        file_morphs_stats: FileMorphsStats,
-    ) -> None:
-        assert isinstance(self.ui, Ui_GeneratorsWindow)
-
-        file_name = str(input_file.relative_to(self._input_dir_root))
-
-        unique_morphs: int = (
-            len(file_morphs_stats.unique_known)
-            + len(file_morphs_stats.unique_learning)
-            + len(file_morphs_stats.unique_unknowns)
-        )
+    ##############################################################################
+    #                              FREQUENCY FILE
+    ##############################################################################
 
-        total_morphs: int = (
-            file_morphs_stats.total_known
-            + file_morphs_stats.total_learning
-            + file_morphs_stats.total_unknowns
-        )
+    def _generate_frequency_file(self) -> None:
+        assert mw is not None
 
-        file_name_item = QTableWidgetItem(file_name)
+        if len(self._input_files) == 0:
+            self._on_failure(error=EmptyFileSelectionException())
+            return
 
-        unique_morphs_item = QTableWidgetIntegerItem(unique_morphs)
-        unique_known_item = QTableWidgetIntegerItem(len(file_morphs_stats.unique_known))
-        unique_learning_item = QTableWidgetIntegerItem(
-            len(file_morphs_stats.unique_learning)
-        )
-        unique_unknowns_item = QTableWidgetIntegerItem(
-            len(file_morphs_stats.unique_unknowns)
+        default_output_file = Path(
+            mw.pm.profileFolder(),
+            ankimorphs_globals.FREQUENCY_FILES_DIR_NAME,
+            "frequency-file.csv",
         )
 
-        total_morphs_item = QTableWidgetIntegerItem(total_morphs)
-        total_known_item = QTableWidgetIntegerItem(file_morphs_stats.total_known)
-        total_learning_item = QTableWidgetIntegerItem(file_morphs_stats.total_learning)
-        total_unknown_item = QTableWidgetIntegerItem(file_morphs_stats.total_unknowns)
+        selected_output = GeneratorOutputDialog(default_output_file)
+        result_code: int = selected_output.exec()
 
-        unique_morphs_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        unique_known_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        unique_learning_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        unique_unknowns_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        if result_code != QDialog.DialogCode.Accepted:
+            return
 
-        total_morphs_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        total_known_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        total_learning_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        total_unknown_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        selected_output_options: OutputOptions = selected_output.get_selected_options()
 
-        self.ui.numericalTableWidget.setItem(
-            row, self._file_name_column, file_name_item
-        )
-        self.ui.numericalTableWidget.setItem(
-            row, self._unique_morphs_column, unique_morphs_item
-        )
-        self.ui.numericalTableWidget.setItem(
-            row, self._unique_known_column, unique_known_item
-        )
-        self.ui.numericalTableWidget.setItem(
-            row, self._unique_learning_column, unique_learning_item
-        )
-        self.ui.numericalTableWidget.setItem(
-            row, self._unique_unknowns_column, unique_unknowns_item
-        )
-        self.ui.numericalTableWidget.setItem(
-            row, self._total_morphs_column, total_morphs_item
-        )
-        self.ui.numericalTableWidget.setItem(
-            row, self._total_known_column, total_known_item
-        )
-        self.ui.numericalTableWidget.setItem(
-            row, self._total_learning_column, total_learning_item
-        )
-        self.ui.numericalTableWidget.setItem(
-            row, self._total_unknowns_column, total_unknown_item
+        mw.progress.start(label="Generating frequency file")
+        operation = QueryOp(
+            parent=self,
+            op=lambda _: self._background_generate_frequency_file(
+                selected_output_options
+            ),
+            success=self._on_success,
         )
+        operation.failure(self._on_failure)
+        operation.with_progress().run_in_background()
 
-    def _populate_percentage_table(  # pylint:disable=too-many-locals
-        self,
-        input_file: Path,
-        row: int,
-        file_morphs_stats: FileMorphsStats,
+    def _background_generate_frequency_file(
+        self, selected_output_options: OutputOptions
     ) -> None:
-        assert isinstance(self.ui, Ui_GeneratorsWindow)
-
-        file_name = str(input_file.relative_to(self._input_dir_root))
-
-        unique_morphs: int = (
-            len(file_morphs_stats.unique_known)
-            + len(file_morphs_stats.unique_learning)
-            + len(file_morphs_stats.unique_unknowns)
-        )
+        am_config = AnkiMorphsConfig()
 
-        total_morphs: int = (
-            file_morphs_stats.total_known
-            + file_morphs_stats.total_learning
-            + file_morphs_stats.total_unknowns
+        self._get_processor().generate_frequency_file(
+            self._input_files,
+            selected_output_options,
+            max_morphs_in_memory=am_config.generators_max_morphs_in_memory,
+            on_sorting=self._on_sorting_morphs,
         )
 
-        unique_known_percent: float = 0
-        unique_learning_percent: float = 0
-        unique_unknown_percent: float = 0
-
-        total_known_percent: float = 0
-        total_learning_percent: float = 0
-        total_unknown_percent: float = 0
-
-        if unique_morphs != 0:
-            unique_known_percent = (
-                len(file_morphs_stats.unique_known) / unique_morphs
-            ) * 100
+    ##############################################################################
+    #                              STUDY PLAN
+    ##############################################################################
 
-            unique_learning_percent = (
-                len(file_morphs_stats.unique_learning) / unique_morphs
-            ) * 100
+    def _generate_study_plan(self) -> None:
+        assert mw is not None
 
-            unique_unknown_percent = (
-                len(file_morphs_stats.unique_unknowns) / unique_morphs
-            ) * 100
+        if len(self._input_files) == 0:
+            self._on_failure(error=EmptyFileSelectionException())
+            return
 
-        if total_morphs != 0:
-            total_known_percent = (file_morphs_stats.total_known / total_morphs) * 100
+        default_output_file = Path(
+            mw.pm.profileFolder(),
+            ankimorphs_globals.FREQUENCY_FILES_DIR_NAME,
+            "study-plan-frequency-file.csv",
+        )
 
-            total_learning_percent = (
-                file_morphs_stats.total_learning / total_morphs
-            ) * 100
+        selected_output = GeneratorOutputDialog(default_output_file)
+        result_code: int = selected_output.exec()
 
-            total_unknown_percent = (
-                file_morphs_stats.total_unknowns / total_morphs
-            ) * 100
+        if result_code != QDialog.DialogCode.Accepted:
+            return
 
-        file_name_item = QTableWidgetItem(file_name)
+        selected_output_options: OutputOptions = selected_output.get_selected_options()
 
-        unique_morphs_item = QTableWidgetIntegerItem(unique_morphs)
-        unique_known_item = QTableWidgetPercentItem(round(unique_known_percent, 1))
-        unique_learning_item = QTableWidgetPercentItem(
-            round(unique_learning_percent, 1)
-        )
-        unique_unknowns_item = QTableWidgetPercentItem(round(unique_unknown_percent, 1))
-
-        total_morphs_item = QTableWidgetIntegerItem(total_morphs)
-        total_known_item = QTableWidgetPercentItem(round(total_known_percent, 1))
-        total_learning_item = QTableWidgetPercentItem(round(total_learning_percent, 1))
-        total_unknown_item = QTableWidgetPercentItem(round(total_unknown_percent, 1))
-
-        unique_morphs_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        unique_known_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        unique_learning_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        unique_unknowns_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        total_morphs_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        total_known_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        total_learning_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        total_unknown_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        self.ui.percentTableWidget.setItem(row, self._file_name_column, file_name_item)
-        self.ui.percentTableWidget.setItem(
-            row, self._unique_morphs_column, unique_morphs_item
-        )
-        self.ui.percentTableWidget.setItem(
-            row, self._unique_known_column, unique_known_item
-        )
-        self.ui.percentTableWidget.setItem(
-            row, self._unique_learning_column, unique_learning_item
-        )
-        self.ui.percentTableWidget.setItem(
-            row, self._unique_unknowns_column, unique_unknowns_item
-        )
-        self.ui.percentTableWidget.setItem(
-            row, self._total_morphs_column, total_morphs_item
-        )
-        self.ui.percentTableWidget.setItem(
-            row, self._total_known_column, total_known_item
-        )
-        self.ui.percentTableWidget.setItem(
-            row, self._total_learning_column, total_learning_item
-        )
-        self.ui.percentTableWidget.setItem(
-            row, self._total_unknowns_column, total_unknown_item
+        mw.progress.start(label="Generating study plan")
+        operation = QueryOp(
+            parent=self,
+            op=lambda _: self._background_generate_study_plan(selected_output_options),
+            success=self._on_success,
         )
+        operation.failure(self._on_failure)
+        operation.with_progress().run_in_background()
 
-    def _add_total_row_to_tables(
-        self, global_report_morph_stats: FileMorphsStats
+    def _background_generate_study_plan(
+        self, selected_output_options: OutputOptions
     ) -> None:
-        fake_input_file = Path(self._input_dir_root, "Total")
-
-        self._populate_numerical_table(
-            input_file=fake_input_file,
-            row=len(self._input_files),
-            file_morphs_stats=global_report_morph_stats,
-        )
-        self._populate_percentage_table(
-            input_file=fake_input_file,
-            row=len(self._input_files),
-            file_morphs_stats=global_report_morph_stats,
+        self._get_processor().generate_study_plan(
+            self._get_input_files_table_sorted(),
+            selected_output_options,
+            morphs_learning_status=AnkiMorphsDB.get_morph_statuses(),
+            on_sorting=self._on_sorting_morphs,
         )
 
     ##############################################################################
-    #                              FREQUENCY FILE
+    #                              I+1 SENTENCES
     ##############################################################################
 
-    def _generate_frequency_file(self) -> None:
+    def _generate_sentences(self) -> None:
         assert mw is not None
 
         if len(self._input_files) == 0:
@@ -634,7 +554,7 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
         default_output_file = Path(
             mw.pm.profileFolder(),
             ankimorphs_globals.FREQUENCY_FILES_DIR_NAME,
-            "frequency-file.csv",
+            "i+1-sentences.csv",
         )
 
         selected_output = GeneratorOutputDialog(default_output_file)
@@ -645,115 +565,245 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
 
         selected_output_options: OutputOptions = selected_output.get_selected_options()
 
-        mw.progress.start(label="Generating frequency file")
+        mw.progress.start(label="Generating i+1 sentences")
         operation = QueryOp(
             parent=self,
-            op=lambda _: self._background_generate_frequency_file(
-                selected_output_options
-            ),
+            op=lambda _: self._background_generate_sentences(selected_output_options),
             success=self._on_success,
         )
         operation.failure(self._on_failure)
         operation.with_progress().run_in_background()
 
-    def _background_generate_frequency_file(
+    def _background_generate_sentences(  # pylint:disable=too-many-locals
         self, selected_output_options: OutputOptions
     ) -> None:
         assert mw is not None
         assert mw.progress is not None
 
-        morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]] = (
-            self._generate_morph_occurrences_by_file()
+        am_config = AnkiMorphsConfig()
+        sorted_input_files: list[Path] = self._get_input_files_table_sorted()
+
+        # the sentences are read from the corpus index, so the morph
+        # occurrences themselves are not needed here
+        self._get_processor(require_corpus_index=True).process_input_files(
+            sorted_input_files,
+            on_file_processed=lambda input_file, morph_occurrences: None,
         )
 
         mw.taskman.run_on_main(
             partial(
                 mw.progress.update,
-                label="Sorting morphs",
+                label="Finding sentences",
             )
         )
 
-        total_morph_occurrences: dict[str, MorphOccurrence] = {}
+        _morphemizer = self._morphemizers[self.ui.morphemizerComboBox.currentIndex()]
+        preprocess_options = PreprocessOptions.from_ui(self.ui)
+
+        corpus_db = CorpusDB()
+        try:
+            indexed_files: dict[str, tuple[int, int, int]] = (
+                corpus_db.get_indexed_files(
+                    morphemizer_description=_morphemizer.get_description(),
+                    preprocess_options=preprocess_options.get_cache_key(),
+                )
+            )
+            # (file_id, size, modified time) of the input files
+            input_files_index: list[tuple[int, int, int]] = [
+                indexed_files[str(input_file.absolute())]
+                for input_file in sorted_input_files
+            ]
+            input_files_by_id: dict[int, Path] = {
+                file_index[0]: input_file
+                for file_index, input_file in zip(input_files_index, sorted_input_files)
+            }
+
+            # The line index only has to be rebuilt when other files are selected or
+            # when the files have been indexed again, e.g. after they were modified.
+            if (
+                self._sentences_line_index is None
+                or self._sentences_line_index_files != input_files_index
+            ):
+                self._sentences_line_index = create_line_index(
+                    corpus_db, [file_index[0] for file_index in input_files_index]
+                )
+                self._sentences_line_index_files = input_files_index
+
+            sorted_morph_occurrences: dict[int, MorphOccurrence] = (
+                self._get_corpus_morph_occurrences(corpus_db, list(input_files_by_id))
+            )
+
+            morphs_learning_status: dict[str, str] = AnkiMorphsDB.get_morph_statuses()
+            self._sentences_line_index.set_known_morphs(
+                {
+                    morph_id
+                    for morph_id, morph_occurrence in sorted_morph_occurrences.items()
+                    if morphs_learning_status.get(
+                        morph_occurrence.morph.lemma
+                        + morph_occurrence.morph.inflection,
+                        "unknown",
+                    )
+                    != "unknown"
+                }
+            )
+
+            self._write_out_sentences(
+                selected_output_options,
+                am_config.generators_sentences_unknown_morphs,
+                corpus_db,
+                sorted_morph_occurrences,
+                input_files_by_id,
+            )
+        finally:
+            corpus_db.con.close()
 
-        for file_morph_dict in morph_occurrences_by_file.values():
-            for key in file_morph_dict:
-                if key not in total_morph_occurrences:
-                    total_morph_occurrences[key] = file_morph_dict[key]
+    @staticmethod
+    def _get_corpus_morph_occurrences(
+        corpus_db: CorpusDB, file_ids: list[int]
+    ) -> dict[int, MorphOccurrence]:
+        """
+        Returns morph id -> morph occurrence in the files, the most frequent first.
+        """
+        morph_occurrences: dict[int, MorphOccurrence] = {}
+
+        for file_id in file_ids:
+            for morph_id, lemma, inflection, occurrence in corpus_db.get_file_morphs(
+                file_id
+            ):
+                if morph_id in morph_occurrences:
+                    morph_occurrences[morph_id].occurrence += occurrence
                 else:
-                    total_morph_occurrences[key] += file_morph_dict[key]
+                    morph_occurrence = MorphOccurrence(Morpheme(lemma, inflection))
+                    morph_occurrence.occurrence = occurrence
+                    morph_occurrences[morph_id] = morph_occurrence
 
-        sorted_morph_frequency = dict(
+        return dict(
             sorted(
-                total_morph_occurrences.items(),
+                morph_occurrences.items(),
                 key=lambda item: item[1].occurrence,
                 reverse=True,
             )
         )
 
-        self._write_out_frequency_file(selected_output_options, sorted_morph_frequency)
-
-    def _write_out_frequency_file(
+    def _write_out_sentences(  # pylint:disable=too-many-arguments, too-many-locals
         self,
         selected_output_options: OutputOptions,
-        sorted_morph_occurrences: dict[str, MorphOccurrence],
+        number_of_unknowns: int,
+        corpus_db: CorpusDB,
+        sorted_morph_occurrences: dict[int, MorphOccurrence],
+        input_files_by_id: dict[int, Path],
     ) -> None:
+        assert self._sentences_line_index is not None
+
         output_file = selected_output_options.output_path
 
         # make sure the parent dirs exist before creating the file
         Path(output_file).parent.mkdir(parents=True, exist_ok=True)
 
-        selected_min_occurrence: bool = selected_output_options.min_occurrence
-        selected_comprehension: bool = selected_output_options.comprehension
-
-        min_occurrence_threshold: int = selected_output_options.min_occurrence_threshold
-        comprehension_threshold: int = selected_output_options.comprehension_threshold
-
+        # The frequency priority of the morphs, the cutoffs are applied to the
+        # whole corpus and only the morphs above them are used as targets.
+        morph_priorities: dict[int, int] = {
+            morph_id: priority
+            for priority, morph_id in enumerate(sorted_morph_occurrences)
+        }
+        sorted_morph_occurrence_by_key: dict[str, MorphOccurrence] = {
+            str(morph_id): morph_occurrence
+            for morph_id, morph_occurrence in sorted_morph_occurrences.items()
+        }
         morph_key_cutoff: str | None = None
 
-        if selected_comprehension:
-            morph_key_cutoff = self._get_comprehension_cutoff(
-                sorted_morph_occurrences, comprehension_threshold
+        if selected_output_options.comprehension:
+            morph_key_cutoff = generators_processing.get_comprehension_cutoff(
+                sorted_morph_occurrence_by_key,
+                selected_output_options.comprehension_threshold,
             )
-        elif selected_min_occurrence:
-            morph_key_cutoff = self._get_min_occurrence_cutoff(
-                sorted_morph_occurrences, min_occurrence_threshold
+        elif selected_output_options.min_occurrence:
+            morph_key_cutoff = generators_processing.get_min_occurrence_cutoff(
+                sorted_morph_occurrence_by_key,
+                selected_output_options.min_occurrence_threshold,
             )
 
-        with open(output_file, mode="w+", encoding="utf-8", newline="") as csvfile:
-            morph_writer = csv.writer(csvfile)
-            morph_writer.writerow(["Morph-lemma", "Morph-inflection", "Occurrence"])
+        priority_cutoff: int = (
+            len(morph_priorities)
+            if morph_key_cutoff is None
+            else morph_priorities[int(morph_key_cutoff)]
+        )
 
-            for key, morph_occurrence in sorted_morph_occurrences.items():
-                if key == morph_key_cutoff:
-                    break
+        with open(output_file, mode="w+", encoding="utf-8", newline="") as csvfile:
+            sentence_writer = csv.writer(csvfile)
+            sentence_writer.writerow(
+                [
+                    "Morph-lemma",
+                    "Morph-inflection",
+                    "Occurrence",
+                    "Sentence",
+                    "File",
+                ]
+            )
 
-                morph = morph_occurrence.morph
-                occurrence = morph_occurrence.occurrence
+            for unknown_morph_ids, lines in get_lines_by_unknown_morphs(
+                self._sentences_line_index, number_of_unknowns, morph_priorities
+            ).items():
+                if any(
+                    morph_priorities[morph_id] >= priority_cutoff
+                    for morph_id in unknown_morph_ids
+                ):
+                    continue
+
+                unknown_morphs: list[MorphOccurrence] = [
+                    sorted_morph_occurrences[morph_id] for morph_id in unknown_morph_ids
+                ]
+                # the same line is often found in multiple files, e.g. the
+                # opening song of every episode
+                written_sentences: set[str] = set()
 
-                morph_writer.writerow(
-                    [
-                        morph.lemma,
-                        morph.inflection,
-                        occurrence,
+                for line in lines:
+                    file_id, line_number = self._sentences_line_index.line_locations[
+                        line
                     ]
-                )
+                    sentence: str = corpus_db.get_line_text(file_id, line_number)
+
+                    if sentence in written_sentences:
+                        continue
+
+                    sentence_writer.writerow(
+                        [
+                            ", ".join(
+                                morph_occurrence.morph.lemma
+                                for morph_occurrence in unknown_morphs
+                            ),
+                            ", ".join(
+                                morph_occurrence.morph.inflection
+                                for morph_occurrence in unknown_morphs
+                            ),
+                            min(
+                                (
+                                    morph_occurrence.occurrence
+                                    for morph_occurrence in unknown_morphs
+                                ),
+                                default=0,
+                            ),
+                            sentence,
+                            input_files_by_id[file_id].relative_to(
+                                self._input_dir_root
+                            ),
+                        ]
+                    )
+                    written_sentences.add(sentence)
 
     ##############################################################################
-    #                              STUDY PLAN
+    #                           COMPREHENSION CURVE
     ##############################################################################
 
-    def _generate_study_plan(self) -> None:
+    def _generate_comprehension_curve(self) -> None:
         assert mw is not None
 
         if len(self._input_files) == 0:
             self._on_failure(error=EmptyFileSelectionException())
             return
 
-        default_output_file = Path(
-            mw.pm.profileFolder(),
-            ankimorphs_globals.FREQUENCY_FILES_DIR_NAME,
-            "study-plan-frequency-file.csv",
-        )
+        # this is not a frequency file, so it's not placed in that folder
+        default_output_file = Path(mw.pm.profileFolder(), "comprehension-curve.csv")
 
         selected_output = GeneratorOutputDialog(default_output_file)
         result_code: int = selected_output.exec()
@@ -763,16 +813,18 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
 
         selected_output_options: OutputOptions = selected_output.get_selected_options()
 
-        mw.progress.start(label="Generating study plan")
+        mw.progress.start(label="Generating comprehension curve")
         operation = QueryOp(
             parent=self,
-            op=lambda _: self._background_generate_study_plan(selected_output_options),
+            op=lambda _: self._background_generate_comprehension_curve(
+                selected_output_options
+            ),
             success=self._on_success,
         )
         operation.failure(self._on_failure)
         operation.with_progress().run_in_background()
 
-    def _background_generate_study_plan(
+    def _background_generate_comprehension_curve(
         self, selected_output_options: OutputOptions
     ) -> None:
         assert mw is not None
@@ -785,124 +837,109 @@ class GeneratorWindow(QMainWindow):  # pylint:disable=too-many-instance-attribut
         mw.taskman.run_on_main(
             partial(
                 mw.progress.update,
-                label="Sorting morphs",
+                label="Computing comprehension curves",
             )
         )
 
-        # for every file, sort the morph occurrence dicts
-        for file, morph_dict in morph_occurrences_by_file.items():
-            sorted_morph_frequency = dict(
-                sorted(
-                    morph_dict.items(),
-                    key=lambda item: item[1].occurrence,
-                    reverse=True,
-                )
-            )
-            morph_occurrences_by_file[file] = sorted_morph_frequency
+        # the whole corpus gets a curve too, just like the 'Total' row in the report
+        total_morph_occurrences: dict[str, MorphOccurrence] = {}
+        for morph_occurrences in morph_occurrences_by_file.values():
+            for key, morph_occurrence in morph_occurrences.items():
+                if key in total_morph_occurrences:
+                    total_morph_occurrences[
+                        key
+                    ].occurrence += morph_occurrence.occurrence
+                else:
+                    total_morph_occurrence = MorphOccurrence(morph_occurrence.morph)
+                    total_morph_occurrence.occurrence = morph_occurrence.occurrence
+                    total_morph_occurrences[key] = total_morph_occurrence
 
-        self._write_out_study_plan(selected_output_options, morph_occurrences_by_file)
+        morph_occurrences_by_name: dict[str, dict[str, MorphOccurrence]] = {
+            TOTAL_ROW_FILE_NAME: total_morph_occurrences
+        }
+        for file_path, morph_occurrences in morph_occurrences_by_file.items():
+            file_name = str(file_path.relative_to(self._input_dir_root))
+            morph_occurrences_by_name[file_name] = morph_occurrences
 
-    def _write_out_study_plan(  # pylint:disable=too-many-locals
-        self,
+        self._write_out_comprehension_curves(
+            selected_output_options, morph_occurrences_by_name
+        )
+
+    @staticmethod
+    def _write_out_comprehension_curves(  # pylint:disable=too-many-locals
         selected_output_options: OutputOptions,
-        morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]],
+        morph_occurrences_by_name: dict[str, dict[str, MorphOccurrence]],
     ) -> None:
         output_file = selected_output_options.output_path
 
         # make sure the parent dirs exist before creating the file
         Path(output_file).parent.mkdir(parents=True, exist_ok=True)
 
-        selected_min_occurrence: bool = selected_output_options.min_occurrence
-        selected_comprehension: bool = selected_output_options.comprehension
-
-        min_occurrence_threshold: int = selected_output_options.min_occurrence_threshold
-        comprehension_threshold: int = selected_output_options.comprehension_threshold
-
-        morph_in_study_plan: dict[str, None] = {}  # only care about lookup not value
         morphs_learning_status: dict[str, str] = AnkiMorphsDB.get_morph_statuses()
 
         with open(output_file, mode="w+", encoding="utf-8", newline="") as csvfile:
-            morph_writer = csv.writer(csvfile)
-            morph_writer.writerow(
+            curve_writer = csv.writer(csvfile)
+            curve_writer.writerow(
                 [
+                    "File",
+                    "Learned-morphs",
                     "Morph-lemma",
                     "Morph-inflection",
-                    "Learning-status",
                     "Occurrence",
-                    "File",
+                    "Comprehension",
                 ]
             )
 
-            for file_path, sorted_morph_occurrence in morph_occurrences_by_file.items():
-                morph_key_cutoff: str | None = None
+            for file_name, morph_occurrences in morph_occurrences_by_name.items():
+                # learning morphs are treated as known, just like on the am-ready cards
+                known_occurrences: int = 0
+                unknown_morphs: list[MorphOccurrence] = []
 
-                if selected_comprehension:
-                    morph_key_cutoff = self._get_comprehension_cutoff(
-                        sorted_morph_occurrence, comprehension_threshold
-                    )
-                elif selected_min_occurrence:
-                    morph_key_cutoff = self._get_min_occurrence_cutoff(
-                        sorted_morph_occurrence, min_occurrence_threshold
-                    )
+                for key, morph_occurrence in morph_occurrences.items():
+                    if morphs_learning_status.get(key, "unknown") == "unknown":
+                        unknown_morphs.append(morph_occurrence)
+                    else:
+                        known_occurrences += morph_occurrence.occurrence
 
-                for key, morph_occurrence in sorted_morph_occurrence.items():
-                    if key == morph_key_cutoff:
-                        break
+                # the unknown morphs are learned in frequency order
+                unknown_morphs.sort(key=lambda item: item.occurrence, reverse=True)
 
-                    morph = morph_occurrence.morph
-                    occurrence = morph_occurrence.occurrence
+                curve: list[float] = get_comprehension_curve(
+                    known_occurrences,
+                    [
+                        morph_occurrence.occurrence
+                        for morph_occurrence in unknown_morphs
+                    ],
+                )
 
-                    if key in morph_in_study_plan:
-                        continue
+                last_learned_morphs: int = len(unknown_morphs)
 
-                    learning_status: str
+                if selected_output_options.comprehension:
+                    morphs_needed: int | None = get_morphs_needed(
+                        curve, selected_output_options.comprehension_threshold
+                    )
+                    if morphs_needed is not None:
+                        last_learned_morphs = morphs_needed
+                elif selected_output_options.min_occurrence:
+                    last_learned_morphs = sum(
+                        1
+                        for morph_occurrence in unknown_morphs
+                        if morph_occurrence.occurrence
+                        >= selected_output_options.min_occurrence_threshold
+                    )
 
-                    if key not in morphs_learning_status:
-                        learning_status = "unknown"
-                    else:
-                        learning_status = morphs_learning_status[key]
+                # the first row is the current comprehension
+                curve_writer.writerow([file_name, 0, "", "", "", round(curve[0], 2)])
 
-                    morph_writer.writerow(
+                for learned_morphs in range(1, last_learned_morphs + 1):
+                    morph_occurrence = unknown_morphs[learned_morphs - 1]
+                    curve_writer.writerow(
                         [
-                            morph.lemma,
-                            morph.inflection,
-                            learning_status,
-                            occurrence,
-                            file_path.relative_to(self._input_dir_root),
+                            file_name,
+                            learned_morphs,
+                            morph_occurrence.morph.lemma,
+                            morph_occurrence.morph.inflection,
+                            morph_occurrence.occurrence,
+                            round(curve[learned_morphs], 2),
                         ]
                     )
-
-                    morph_in_study_plan[key] = None  # inserts the key
-
-    @staticmethod
-    def _get_comprehension_cutoff(
-        sorted_morph_occurrence: dict[str, MorphOccurrence],
-        comprehension_threshold: int,
-    ) -> str | None:
-        total_occurrences = 0
-
-        for morph_occurrence in sorted_morph_occurrence.values():
-            total_occurrences += morph_occurrence.occurrence
-
-        # _comprehension_threshold is between 100 and 1
-        target_percent = comprehension_threshold / 100
-        target_number = target_percent * total_occurrences
-
-        running_number = 0
-
-        for key, morph_occurrence in sorted_morph_occurrence.items():
-            running_number += morph_occurrence.occurrence
-            if running_number > target_number:
-                return key
-
-        return None
-
-    @staticmethod
-    def _get_min_occurrence_cutoff(
-        sorted_morph_occurrence: dict[str, MorphOccurrence],
-        min_occurrence_threshold: int,
-    ) -> str | None:
-        for morph_key in sorted_morph_occurrence:
-            if sorted_morph_occurrence[morph_key].occurrence < min_occurrence_threshold:
-                return morph_key
-        return None
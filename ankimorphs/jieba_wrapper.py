@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import importlib
 import importlib.util
+import re
 import sys
 from types import ModuleType
 
@@ -31,6 +32,19 @@ if sys.maxunicode > 0xFFFF:
     ]
 ################################################################################
 
+# A single character class made from the ranges above, this is much faster than
+# checking every character against every range in python.
+_cjk_ideographs_only_regex = re.compile(
+    "["
+    + "".join(f"{chr(start)}-{chr(end)}" for start, end in cjk_ideograph_unicode_ranges)
+    + "]*"
+)
+
+# Used to join multiple expressions into a single text for jieba. This character is
+# not a chinese character or whitespace, so jieba always yields it as a separate word
+# and never combines it with the surrounding characters.
+_BATCH_SEPARATOR = "\x00"
+
 
 def import_jieba() -> None:
     global posseg, successful_startup
@@ -62,15 +76,38 @@ def get_morphemes_jieba(expression: str) -> list[Morpheme]:
     return _morphs
 
 
-def char_found_in_cjk_ranges(_char: str) -> bool:
-    for start, end in cjk_ideograph_unicode_ranges:
-        if start <= ord(_char) <= end:
-            return True
-    return False
+def get_morphemes_jieba_batch(expressions: list[str]) -> list[list[Morpheme]]:
+    """
+    Same as get_morphemes_jieba, but all the expressions are cut by jieba in a single call.
+    """
+    assert posseg is not None
+
+    if len(expressions) == 0:
+        return []
+
+    joined_expressions: str = _BATCH_SEPARATOR.join(expressions)
+
+    # the separator would be ambiguous if it's also found in the expressions
+    if joined_expressions.count(_BATCH_SEPARATOR) != len(expressions) - 1:
+        return [get_morphemes_jieba(expression) for expression in expressions]
+
+    morphs_batch: list[list[Morpheme]] = [[]]
+
+    for posseg_pair in posseg.cut(joined_expressions):
+        if posseg_pair.word == _BATCH_SEPARATOR:
+            morphs_batch.append([])
+            continue
+
+        if text_contains_only_cjk_ranges(_text=posseg_pair.word) is False:
+            continue
+
+        # chinese does not have inflections, so we use the lemma for both
+        morphs_batch[-1].append(
+            Morpheme(lemma=posseg_pair.word, inflection=posseg_pair.word)
+        )
+
+    return morphs_batch
 
 
 def text_contains_only_cjk_ranges(_text: str) -> bool:
-    for char in _text:
-        if not char_found_in_cjk_ranges(char):
-            return False
-    return True
+    return _cjk_ideographs_only_regex.fullmatch(_text) is not None
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-import functools
 import importlib
 import importlib.util
+import os
 import re
 import subprocess
 import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from types import ModuleType
 from typing import IO, Any
 
+from .exceptions import MecabOutputException
 from .morpheme import Morpheme
 
 _MECAB_NODE_IPADIC_PARTS = ["%f[6]", "%m", "%f[7]", "%f[0]", "%f[1]"]
@@ -22,6 +27,11 @@ _MECAB_SUB_POS_BLACKLIST = [
     "数詞",  # Numbers
 ]
 
+# MeCab only outputs the end-of-sentence line for an empty input line. Every expression
+# line ends with the " 。" added by _get_mecab_input_expression, which always produces a
+# node, so an empty output line marks the end of a batch.
+_MECAB_BATCH_SENTINEL: bytes = b"\n"
+
 _control_chars_re = re.compile("[\x00-\x1f\x7f-\x9f]")
 _wide_alpha_num_rx = re.compile(r"[０-９Ａ-Ｚａ-ｚ]")
 
@@ -35,6 +45,15 @@ _mecab_args = [
     "--unk-format=",
 ]
 
+# MeCab processes are kept in a pool so that concurrent callers (e.g. recalc and the
+# generators) each lease their own process instead of interleaving on the same pipe.
+_MECAB_POOL_MAX_SIZE: int = max(1, os.cpu_count() or 1)
+_MECAB_IDLE_TIMEOUT_SECONDS: float = 60.0
+_mecab_pool_condition = threading.Condition()
+_idle_mecab_processes: list[tuple[subprocess.Popen[bytes], float]] = []
+_leased_mecab_processes_count: int = 0
+_idle_shutdown_timer: threading.Timer | None = None
+
 successful_startup: bool = False
 
 
@@ -81,15 +100,127 @@ def get_windows_startup_info() -> Any:
     return startup_info
 
 
-@functools.cache
 def _spawn_mecab() -> subprocess.Popen[bytes]:
     """
-    MeCab reads expressions from stdin at runtime, so only one instance is needed, hence the functools.cache.
+    MeCab reads expressions from stdin at runtime, so a process can be reused for any number of
+    expressions, see _lease_mecab.
     """
     assert _mecab_base_cmd is not None
     return _spawn_cmd(_mecab_base_cmd + _mecab_args, _mecab_windows_startupinfo)
 
 
+@contextmanager
+def _lease_mecab() -> Iterator[subprocess.Popen[bytes]]:
+    """
+    Leases a mecab process from the pool for the duration of the with-block, and
+    returns it to the pool afterward. If all the processes are leased and the pool
+    is full, then this blocks until another caller returns its process.
+    """
+    mecab_process: subprocess.Popen[bytes] = _acquire_mecab_process()
+    try:
+        yield mecab_process
+    except BaseException:
+        # the process could be in the middle of writing output that would then be
+        # read by the next caller, so it can't be reused
+        with _mecab_pool_condition:
+            _release_leased_mecab_process()
+        mecab_process.kill()
+        mecab_process.wait()
+        raise
+
+    with _mecab_pool_condition:
+        _release_leased_mecab_process()
+        # a process that has exited during the lease is not worth returning
+        if mecab_process.poll() is None:
+            _idle_mecab_processes.append((mecab_process, time.monotonic()))
+            _schedule_idle_shutdown()
+
+
+def _acquire_mecab_process() -> subprocess.Popen[bytes]:
+    global _leased_mecab_processes_count
+
+    with _mecab_pool_condition:
+        while True:
+            # the most recently returned process is the least likely to time out
+            while _idle_mecab_processes:
+                mecab_process, _ = _idle_mecab_processes.pop()
+                # processes that have exited for whatever reason are discarded
+                if mecab_process.poll() is None:
+                    _leased_mecab_processes_count += 1
+                    return mecab_process
+
+            if _leased_mecab_processes_count < _MECAB_POOL_MAX_SIZE:
+                _leased_mecab_processes_count += 1
+                break
+
+            _mecab_pool_condition.wait()
+
+    try:
+        return _spawn_mecab()
+    except BaseException:
+        with _mecab_pool_condition:
+            _release_leased_mecab_process()
+        raise
+
+
+def _release_leased_mecab_process() -> None:
+    # Note: the caller has to hold the _mecab_pool_condition lock
+    global _leased_mecab_processes_count
+    _leased_mecab_processes_count -= 1
+    _mecab_pool_condition.notify()
+
+
+def _schedule_idle_shutdown() -> None:
+    # Note: the caller has to hold the _mecab_pool_condition lock
+    global _idle_shutdown_timer
+
+    if _idle_shutdown_timer is not None:
+        return
+
+    _idle_shutdown_timer = threading.Timer(
+        _MECAB_IDLE_TIMEOUT_SECONDS, _shut_down_idle_mecab_processes
+    )
+    # daemon threads don't prevent anki from closing
+    _idle_shutdown_timer.daemon = True
+    _idle_shutdown_timer.start()
+
+
+def _shut_down_idle_mecab_processes() -> None:
+    global _idle_shutdown_timer
+
+    timed_out_mecab_processes: list[subprocess.Popen[bytes]] = []
+
+    with _mecab_pool_condition:
+        _idle_shutdown_timer = None
+        now = time.monotonic()
+
+        still_idle_mecab_processes = []
+        for mecab_process, idle_since in _idle_mecab_processes:
+            if now - idle_since >= _MECAB_IDLE_TIMEOUT_SECONDS:
+                timed_out_mecab_processes.append(mecab_process)
+            else:
+                still_idle_mecab_processes.append((mecab_process, idle_since))
+
+        _idle_mecab_processes[:] = still_idle_mecab_processes
+
+        if _idle_mecab_processes:
+            _schedule_idle_shutdown()
+
+    for mecab_process in timed_out_mecab_processes:
+        _shut_down_mecab_process(mecab_process)
+
+
+def _shut_down_mecab_process(mecab_process: subprocess.Popen[bytes]) -> None:
+    # mecab exits by itself when its stdin is closed
+    try:
+        assert mecab_process.stdin is not None
+        mecab_process.stdin.close()
+        mecab_process.wait(timeout=1)
+    except (OSError, subprocess.TimeoutExpired):
+        mecab_process.kill()
+        mecab_process.wait()
+
+
 def _get_subprocess_dump(sub_cmd: list[str]) -> bytes:
     assert _mecab_base_cmd is not None
 
@@ -115,14 +246,40 @@ def _spawn_cmd(cmd: list[str], _startupinfo: Any) -> subprocess.Popen[bytes]:
 
 
 def get_morphemes_mecab(expression: str) -> list[Morpheme]:
+    return _get_morphemes_from_mecab_output(
+        _interact(_get_mecab_input_expression(expression))
+    )
+
+
+def get_morphemes_mecab_batch(expressions: list[str]) -> list[list[Morpheme]]:
+    """
+    Same as get_morphemes_mecab, but all the expressions are sent to mecab at once, which
+    avoids the round-trip latency of the pipe for every expression.
+    """
+    if len(expressions) == 0:
+        return []
+
+    mecab_outputs: list[str] = _interact_batch(
+        [_get_mecab_input_expression(expression) for expression in expressions]
+    )
+    return [
+        _get_morphemes_from_mecab_output(mecab_output) for mecab_output in mecab_outputs
+    ]
+
+
+def _get_mecab_input_expression(expression: str) -> str:
     # HACK: mecab sometimes does not produce the right morphs if there are no extra characters in the expression,
     # so we just add a whitespace and a japanese punctuation mark "。" at the end to prevent the problem.
     expression += " 。"
 
     # Remove Unicode control codes before sending to MeCab.
-    expression = _control_chars_re.sub("", expression)
+    # Note: this also removes all line breaks, so every expression
+    # results in exactly one line of mecab output.
+    return _control_chars_re.sub("", expression)
+
 
-    mecab_morphs: list[str] = _interact(expression).split("\r")
+def _get_morphemes_from_mecab_output(mecab_output: str) -> list[Morpheme]:
+    mecab_morphs: list[str] = mecab_output.split("\r")
     actual_morphs: list[Morpheme] = []
 
     for morph_string in mecab_morphs:
@@ -154,25 +311,107 @@ def _interact(string_expression: str) -> str:  # Str -> IO Str
     "interacts" with 'mecab' command: writes expression to stdin of 'mecab' process and gets all the morpheme
     info from its stdout.
     """
-    mecab_process: subprocess.Popen[bytes] = _spawn_mecab()
-
-    assert mecab_process.stdin is not None
-    assert mecab_process.stdout is not None
     assert _mecab_encoding is not None
 
     bytes_expression = string_expression.encode(_mecab_encoding, errors="ignore")
+    entire_output: str = ""
 
-    # The line terminator is always b'\n' for binary files: https://docs.python.org/3/library/io.html#io.IOBase
-    mecab_process.stdin.write(bytes_expression + b"\n")
+    with _lease_mecab() as mecab_process:
+        assert mecab_process.stdin is not None
+        assert mecab_process.stdout is not None
 
-    # The buffer will be written out to the underlying RawIOBase object when flush() is called
-    mecab_process.stdin.flush()
-    mecab_process.stdout.flush()
+        # The line terminator is always b'\n' for binary files: https://docs.python.org/3/library/io.html#io.IOBase
+        mecab_process.stdin.write(bytes_expression + b"\n")
 
-    entire_output: str = ""
-    lines_to_read = len(bytes_expression.split(b"\n"))
+        # The buffer will be written out to the underlying RawIOBase object when flush() is called
+        mecab_process.stdin.flush()
+        mecab_process.stdout.flush()
 
-    for line in mecab_process.stdout.readlines(lines_to_read):
-        entire_output += str(line.rstrip(b"\r\n"), _mecab_encoding)
+        lines_to_read = len(bytes_expression.split(b"\n"))
+
+        for line in mecab_process.stdout.readlines(lines_to_read):
+            entire_output += str(line.rstrip(b"\r\n"), _mecab_encoding)
 
     return entire_output
+
+
+def _interact_batch(string_expressions: list[str]) -> list[str]:
+    """
+    Writes all the expressions to stdin of the 'mecab' process in one go, followed by
+    a sentinel line, and reads back one line of output per expression.
+    """
+    assert _mecab_encoding is not None
+
+    bytes_expressions: bytes = (
+        b"".join(
+            string_expression.encode(_mecab_encoding, errors="ignore") + b"\n"
+            for string_expression in string_expressions
+        )
+        + _MECAB_BATCH_SENTINEL
+    )
+
+    with _lease_mecab() as mecab_process:
+        assert mecab_process.stdout is not None
+
+        # If we wrote everything before reading anything, then mecab would eventually
+        # block when its stdout pipe is full, which in turn blocks our write to its stdin
+        # (a deadlock), so the writing is done on a separate thread.
+        writer_errors: list[OSError] = []
+        writer_thread = threading.Thread(
+            target=_write_to_mecab,
+            args=(mecab_process, bytes_expressions, writer_errors),
+        )
+        writer_thread.start()
+
+        try:
+            output_lines: list[bytes] = _read_mecab_batch_output(mecab_process.stdout)
+        except BaseException:
+            # unblocks the writer thread, the process can't be reused anyway
+            mecab_process.kill()
+            writer_thread.join()
+            raise
+
+        writer_thread.join()
+
+        if writer_errors:
+            raise writer_errors[0]
+
+        # Any extra line (e.g. a warning on the merged stderr) or missing line means the
+        # output is out of step with the expressions. Raising here makes _lease_mecab
+        # shut the process down instead of returning it to the pool.
+        if len(output_lines) != len(string_expressions):
+            raise MecabOutputException(
+                f"mecab returned {len(output_lines)} lines for {len(string_expressions)} expressions"
+            )
+
+    return [str(output_line, _mecab_encoding) for output_line in output_lines]
+
+
+def _read_mecab_batch_output(mecab_stdout: IO[bytes]) -> list[bytes]:
+    output_lines: list[bytes] = []
+
+    while True:
+        line: bytes = mecab_stdout.readline()
+        if line == b"":
+            raise MecabOutputException("mecab exited before the end of the batch")
+
+        line = line.rstrip(b"\r\n")
+        if line == b"":
+            return output_lines  # the sentinel
+
+        output_lines.append(line)
+
+
+def _write_to_mecab(
+    mecab_process: subprocess.Popen[bytes],
+    bytes_expressions: bytes,
+    writer_errors: list[OSError],
+) -> None:
+    assert mecab_process.stdin is not None
+
+    try:
+        mecab_process.stdin.write(bytes_expressions)
+        mecab_process.stdin.flush()
+    except OSError as error:
+        # the exception is raised on the thread that reads the output
+        writer_errors.append(error)
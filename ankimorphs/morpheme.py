@@ -37,15 +37,15 @@ class Morpheme:
 
     def __eq__(self, other: object) -> bool:
         assert isinstance(other, Morpheme)
-        return all(
-            [
-                self.lemma == other.lemma,
-                self.inflection == other.inflection,
-            ]
-        )
+        # recalc shares the same morph objects between cards, see get_card_morph_map_cache
+        if self is other:
+            return True
+        return self.lemma == other.lemma and self.inflection == other.inflection
 
     def __hash__(self) -> int:
-        return hash((self.lemma, self.inflection))
+        # strings cache their hash, so this is cheaper than hashing a (lemma, inflection)
+        # tuple. "ab"+"c" and "a"+"bc" give the same hash, but __eq__ tells them apart.
+        return hash(self.lemma_and_inflection)
 
     def is_proper_noun(self) -> bool:
         return self.sub_part_of_speech == "固有名詞" or self.part_of_speech == "PROPN"
@@ -1,13 +1,114 @@
 from __future__ import annotations
 
-import functools
 import re
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
 
 from . import jieba_wrapper, mecab_wrapper, spacy_wrapper
 from .morpheme import Morpheme
 
 space_char_regex = re.compile(" ")
 
+# Used by the morphemizer caches, can be changed with the "morphemizer_cache_size_mb" setting
+_DEFAULT_CACHE_MAX_SIZE_MB: int = 100
+_cache_max_size_bytes: int = _DEFAULT_CACHE_MAX_SIZE_MB * 1024 * 1024
+
+
+####################################################################################################
+# Morphemizer Cache
+####################################################################################################
+
+
+class MorphemizerCache:  # pylint:disable=too-many-instance-attributes
+    """
+    A least-recently-used cache of the morphemes found in expressions. The size of the
+    cache is limited by the (approximate) number of bytes the entries take up rather
+    than the number of entries, since expressions can be anything from a single word
+    to a whole paragraph.
+    """
+
+    def __init__(self, max_size_bytes: int) -> None:
+        # the values are tuples, so the cached morphs can't accidentally be modified by callers
+        self._entries: OrderedDict[str, tuple[Morpheme, ...]] = OrderedDict()
+        self._entry_sizes: dict[str, int] = {}
+        # the morphemizers can be used from multiple threads at the same time
+        self._lock = threading.Lock()
+        self.max_size_bytes: int = max_size_bytes
+        self.size_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, expression: str) -> tuple[Morpheme, ...] | None:
+        with self._lock:
+            morphs = self._entries.get(expression)
+            if morphs is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(expression)
+            self.hits += 1
+            return morphs
+
+    def put(self, expression: str, morphs: Sequence[Morpheme]) -> None:
+        entry: tuple[Morpheme, ...] = tuple(morphs)
+        entry_size: int = _get_cache_entry_size(expression, entry)
+
+        with self._lock:
+            if expression in self._entries:
+                self.size_bytes -= self._entry_sizes[expression]
+
+            self._entries[expression] = entry
+            self._entries.move_to_end(expression)
+            self._entry_sizes[expression] = entry_size
+            self.size_bytes += entry_size
+            self._evict_least_recently_used()
+
+    def set_max_size_bytes(self, max_size_bytes: int) -> None:
+        with self._lock:
+            self.max_size_bytes = max_size_bytes
+            self._evict_least_recently_used()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._entry_sizes.clear()
+            self.size_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> str:
+        with self._lock:
+            return (
+                f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions, "
+                f"{len(self._entries)} entries, {round(self.size_bytes / (1024 * 1024), 1)} MB"
+            )
+
+    def _evict_least_recently_used(self) -> None:
+        while self.size_bytes > self.max_size_bytes and len(self._entries) > 0:
+            expression, _ = self._entries.popitem(last=False)
+            self.size_bytes -= self._entry_sizes.pop(expression)
+            self.evictions += 1
+
+
+def _get_cache_entry_size(expression: str, morphs: tuple[Morpheme, ...]) -> int:
+    # This is only an estimate, the strings of the morphs are often shared
+    # between entries, but it's close enough to keep the memory usage bounded.
+    size: int = sys.getsizeof(expression) + sys.getsizeof(morphs)
+    for morph in morphs:
+        size += (
+            sys.getsizeof(morph)
+            + sys.getsizeof(morph.lemma)
+            + sys.getsizeof(morph.inflection)
+            + sys.getsizeof(morph.lemma_and_inflection)
+        )
+    return size
+
 
 ####################################################################################################
 # Base Class
@@ -15,14 +116,21 @@ space_char_regex = re.compile(" ")
 
 
 class Morphemizer:
+    # Morphemizers that do the work in separate processes are not limited by the GIL,
+    # so they are the only ones that benefit from being used by multiple threads.
+    runs_in_subprocess: bool = False
+
     def __init__(self) -> None:
-        pass
+        # the morphemizers are only instantiated once (see get_all_morphemizers),
+        # so the cache is shared by recalc, the generators, etc.
+        self.cache = MorphemizerCache(max_size_bytes=_cache_max_size_bytes)
 
-    # the cache needs to have a max size to maintain garbage collection
-    @functools.lru_cache(maxsize=131072)
     def get_morphemes_from_expr(self, expression: str) -> list[Morpheme]:
-        morphs = self._get_morphemes_from_expr(expression)
-        return morphs
+        morphs: tuple[Morpheme, ...] | None = self.cache.get(expression)
+        if morphs is None:
+            morphs = tuple(self._get_morphemes_from_expr(expression))
+            self.cache.put(expression, morphs)
+        return list(morphs)
 
     def _get_morphemes_from_expr(  # pylint:disable=unused-argument
         self, expression: str
@@ -32,6 +140,48 @@ class Morphemizer:
         """
         return []
 
+    def get_morphemes_from_expr_batch(
+        self, expressions: list[str]
+    ) -> list[list[Morpheme]]:
+        """
+        Returns the morphemes of every expression, in the same order as the expressions.
+        """
+        # duplicate expressions are very common, e.g. in subtitles, so we only process them once
+        morphs_by_expression: dict[str, tuple[Morpheme, ...] | None] = {
+            expression: self.cache.get(expression)
+            for expression in dict.fromkeys(expressions)
+        }
+        uncached_expressions: list[str] = [
+            expression
+            for expression, morphs in morphs_by_expression.items()
+            if morphs is None
+        ]
+
+        if len(uncached_expressions) > 0:
+            for expression, uncached_morphs in zip(
+                uncached_expressions,
+                self._get_morphemes_from_expr_batch(uncached_expressions),
+            ):
+                morphs = tuple(uncached_morphs)
+                morphs_by_expression[expression] = morphs
+                self.cache.put(expression, morphs)
+
+        morphs_batch: list[list[Morpheme]] = []
+        for expression in expressions:
+            cached_morphs = morphs_by_expression[expression]
+            assert cached_morphs is not None
+            morphs_batch.append(list(cached_morphs))
+        return morphs_batch
+
+    def _get_morphemes_from_expr_batch(
+        self, expressions: list[str]
+    ) -> list[list[Morpheme]]:
+        """
+        Morphemizers that can process multiple expressions more efficiently
+        than one at a time should override this.
+        """
+        return [self._get_morphemes_from_expr(expression) for expression in expressions]
+
     def get_description(self) -> str:
         """
         Returns a single line, for which languages this Morphemizer is.
@@ -78,12 +228,31 @@ def get_morphemizer_by_description(description: str) -> Morphemizer | None:
     return morphemizers_by_description.get(description, None)
 
 
+def print_cache_stats() -> None:
+    # only the morphemizers that have actually been used are of interest, the
+    # counters add up over the whole session since the caches are shared.
+    for morphemizer in get_all_morphemizers():
+        if morphemizer.cache.hits + morphemizer.cache.misses > 0:
+            print(
+                f"{morphemizer.get_description()} cache: {morphemizer.cache.get_stats()}"
+            )
+
+
+def update_cache_max_size(max_size_mb: int) -> None:
+    global _cache_max_size_bytes
+
+    _cache_max_size_bytes = max_size_mb * 1024 * 1024
+    for morphemizer in get_all_morphemizers():
+        morphemizer.cache.set_max_size_bytes(_cache_max_size_bytes)
+
+
 ####################################################################################################
 # Mecab Morphemizer
 ####################################################################################################
 
 
 class MecabMorphemizer(Morphemizer):
+    runs_in_subprocess = True  # see mecab_wrapper
 
     def __init__(self) -> None:
         super().__init__()
@@ -95,6 +264,13 @@ class MecabMorphemizer(Morphemizer):
             expression = space_char_regex.sub("", expression)
         return mecab_wrapper.get_morphemes_mecab(expression)
 
+    def _get_morphemes_from_expr_batch(
+        self, expressions: list[str]
+    ) -> list[list[Morpheme]]:
+        return mecab_wrapper.get_morphemes_mecab_batch(
+            [space_char_regex.sub("", expression) for expression in expressions]
+        )
+
     def get_description(self) -> str:
         return "AnkiMorphs: Japanese"
 
@@ -168,5 +344,10 @@ class JiebaMorphemizer(Morphemizer):
     def _get_morphemes_from_expr(self, expression: str) -> list[Morpheme]:
         return jieba_wrapper.get_morphemes_jieba(expression)
 
+    def _get_morphemes_from_expr_batch(
+        self, expressions: list[str]
+    ) -> list[list[Morpheme]]:
+        return jieba_wrapper.get_morphemes_jieba_batch(expressions)
+
     def get_description(self) -> str:
         return "AnkiMorphs: Chinese"
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import functools
 import os
 
@@ -24,11 +26,13 @@ def add_name_to_file(selected_text: str) -> None:
 
 
 @functools.cache
-def get_names_from_file() -> set[str]:
-    assert mw is not None
+def get_names_from_file(profile_folder: str | None = None) -> set[str]:
+    # the profile folder is only given outside of anki, e.g. by the recalc cli
+    if profile_folder is None:
+        assert mw is not None
+        profile_folder = mw.pm.profileFolder()
 
-    profile_path: str = mw.pm.profileFolder()
-    path: str = os.path.join(profile_path, ankimorphs_globals.NAMES_TXT_FILE_NAME)
+    path: str = os.path.join(profile_folder, ankimorphs_globals.NAMES_TXT_FILE_NAME)
 
     # 'a+' creates the file if it does not exist (w+ overwrites the content)
     with open(path, mode="a+", encoding="utf-8") as names_file:
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from .ankimorphs_config import AnkiMorphsConfig
-from .ankimorphs_db import AnkiMorphsDB
 from .morpheme import Morpheme, MorphOccurrence
 
 
@@ -42,17 +41,18 @@ class FileMorphsStats:
 
 def get_morph_stats_from_file(
     am_config: AnkiMorphsConfig,
-    am_db: AnkiMorphsDB,
+    highest_learning_intervals: dict[tuple[str, str], int],
     file_morphs: dict[str, MorphOccurrence],
 ) -> FileMorphsStats:
+    # highest_learning_intervals: see AnkiMorphsDB.get_highest_learning_intervals
     file_morphs_stats = FileMorphsStats()
 
     for morph_occurrence_object in file_morphs.values():
         morph = morph_occurrence_object.morph
         occurrence = morph_occurrence_object.occurrence
 
-        highest_learning_interval: int | None = am_db.get_highest_learning_interval(
-            morph.lemma, morph.inflection
+        highest_learning_interval: int | None = highest_learning_intervals.get(
+            (morph.lemma, morph.inflection)
         )
 
         if highest_learning_interval is None:
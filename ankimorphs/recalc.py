@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import csv
 import time
-from functools import partial
 from pathlib import Path
 from typing import Any
 
@@ -36,9 +35,10 @@ from .exceptions import (
 )
 from .morpheme import Morpheme
 from .morphemizer import SpacyMorphemizer
+from .recalc_context import RecalcContext, RecalcProgress, get_main_window_context
 from .text_preprocessing import (
     get_processed_expression,
-    get_processed_morphemizer_morphs,
+    get_processed_morphemizer_morphs_batch,
     get_processed_spacy_morphs,
 )
 
@@ -49,6 +49,9 @@ from .text_preprocessing import (
 # which should give plenty of leeway (10^8).
 _DEFAULT_SCORE: int = 2047483647
 
+# The number of expressions that are sent to the morphemizer at once
+_MORPHEMIZER_BATCH_SIZE: int = 1000
+
 
 def recalc() -> None:
     ################################################################
@@ -64,6 +67,7 @@ def recalc() -> None:
 
     assert mw is not None
 
+    context: RecalcContext = get_main_window_context()
     read_enabled_config_filters: list[AnkiMorphsConfigFilter] = (
         ankimorphs_config.get_read_enabled_filters()
     )
@@ -74,8 +78,8 @@ def recalc() -> None:
     # Note: we check for potential errors before running the QueryOp because
     # these processes and confirmations can require gui elements being displayed,
     # which is less of a headache to do on the main thread.
-    settings_error: Exception | None = _check_selected_settings_for_errors(
-        read_enabled_config_filters, modify_enabled_config_filters
+    settings_error: Exception | None = check_selected_settings_for_errors(
+        read_enabled_config_filters, modify_enabled_config_filters, context
     )
 
     if settings_error is not None:
@@ -93,8 +97,8 @@ def recalc() -> None:
     # lambda is used to ignore the irrelevant arguments given by QueryOp
     operation = QueryOp(
         parent=mw,
-        op=lambda _: _recalc_background_op(
-            read_enabled_config_filters, modify_enabled_config_filters
+        op=lambda _: recalc_background_op(
+            read_enabled_config_filters, modify_enabled_config_filters, context
         ),
         success=lambda _: _on_success(_start_time),
     )
@@ -102,18 +106,20 @@ def recalc() -> None:
     operation.with_progress().run_in_background()
 
 
-def _check_selected_settings_for_errors(
+def check_selected_settings_for_errors(
     read_enabled_config_filters: list[AnkiMorphsConfigFilter],
     modify_enabled_config_filters: list[AnkiMorphsConfigFilter],
+    context: RecalcContext | None = None,
 ) -> Exception | None:
-    assert mw is not None
+    if context is None:
+        context = get_main_window_context()
 
     # ideally we would combine the read and modify filters into a set since they
     # usually have significant overlap, but they contain dicts, which makes
     # comparing them impractical, so we just combine them into a list.
     config_filters = read_enabled_config_filters + modify_enabled_config_filters
 
-    model_manager: ModelManager = mw.col.models
+    model_manager: ModelManager = context.col.models
 
     for config_filter in config_filters:
         options_possibly_containing_none: set[str] = {
@@ -126,7 +132,7 @@ def _check_selected_settings_for_errors(
         if ankimorphs_globals.NONE_OPTION in options_possibly_containing_none:
             return DefaultSettingsException()
 
-        note_type_dict: NotetypeDict | None = mw.col.models.by_name(
+        note_type_dict: NotetypeDict | None = model_manager.by_name(
             config_filter.note_type
         )
         if note_type_dict is None:
@@ -150,7 +156,7 @@ def _check_selected_settings_for_errors(
             != ankimorphs_globals.COLLECTION_FREQUENCY_OPTION
         ):
             frequency_file_path = Path(
-                mw.pm.profileFolder(),
+                context.profile_folder,
                 ankimorphs_globals.FREQUENCY_FILES_DIR_NAME,
                 config_filter.morph_priority,
             )
@@ -160,18 +166,25 @@ def _check_selected_settings_for_errors(
     return None
 
 
-def _recalc_background_op(
+def recalc_background_op(
     read_enabled_config_filters: list[AnkiMorphsConfigFilter],
     modify_enabled_config_filters: list[AnkiMorphsConfigFilter],
+    context: RecalcContext | None = None,
 ) -> None:
+    # nothing in here uses 'mw' directly, so it also runs outside of anki
+    if context is None:
+        context = get_main_window_context()
+
     am_config = AnkiMorphsConfig()
-    _cache_anki_data(am_config, read_enabled_config_filters)
-    _update_cards_and_notes(am_config, modify_enabled_config_filters)
+    morphemizer_module.update_cache_max_size(am_config.morphemizer_cache_size_mb)
+    _cache_anki_data(am_config, read_enabled_config_filters, context)
+    _update_cards_and_notes(am_config, modify_enabled_config_filters, context)
 
 
 def _cache_anki_data(  # pylint:disable=too-many-locals, too-many-branches, too-many-statements
     am_config: AnkiMorphsConfig,
     read_enabled_config_filters: list[AnkiMorphsConfigFilter],
+    context: RecalcContext,
 ) -> None:
     # Extracting morphs from cards is expensive, so caching them yields a significant
     # performance gain.
@@ -181,11 +194,9 @@ def _cache_anki_data(  # pylint:disable=too-many-locals, too-many-branches, too-
     # of all the things that are happening. Refactoring this into even smaller pieces
     # will in effect lead to spaghetti code.
 
-    assert mw is not None
-
     # Rebuilding the entire ankimorphs db every time is faster and much simpler than
     # updating it since we can bulk queries to the anki db.
-    am_db = AnkiMorphsDB()
+    am_db = context.get_am_db()
     am_db.drop_all_tables()
     am_db.create_all_tables()
 
@@ -199,6 +210,7 @@ def _cache_anki_data(  # pylint:disable=too-many-locals, too-many-branches, too-
 
         cards_data_dict: dict[int, AnkiCardData] = (
             anki_data_utils.create_card_data_dict(
+                context.col,
                 am_config,
                 config_filter,
             )
@@ -245,30 +257,40 @@ def _cache_anki_data(  # pylint:disable=too-many-locals, too-many-branches, too-
         if nlp is not None:
             for index, doc in enumerate(nlp.pipe(all_text)):
                 _update_progress_potentially_cancel(
+                    context.progress,
                     label=f"Extracting morphs from<br>{config_filter.note_type} cards<br>card: {index} of {card_amount}",
                     counter=index,
                     max_value=card_amount,
                 )
-                morphs = set(get_processed_spacy_morphs(am_config, doc))
+                morphs = set(
+                    get_processed_spacy_morphs(am_config, doc, context.profile_folder)
+                )
                 key = all_keys[index]
                 cards_data_dict[key].morphs = morphs
         else:
-            for index, _expression in enumerate(all_text):
+            # The expressions are sent to the morphemizer in batches, which avoids
+            # a lot of overhead, e.g. a pipe round-trip per expression with mecab.
+            # The batch size matches the interval of the progress updates.
+            for batch_start in range(0, card_amount, _MORPHEMIZER_BATCH_SIZE):
                 _update_progress_potentially_cancel(
-                    label=f"Extracting morphs from<br>{config_filter.note_type} cards<br>card: {index} of {card_amount}",
-                    counter=index,
+                    context.progress,
+                    label=f"Extracting morphs from<br>{config_filter.note_type} cards<br>card: {batch_start} of {card_amount}",
+                    counter=batch_start,
                     max_value=card_amount,
                 )
-                morphs = set(
-                    get_processed_morphemizer_morphs(
-                        morphemizer, _expression, am_config
-                    )
+                morphs_batch = get_processed_morphemizer_morphs_batch(
+                    morphemizer,
+                    all_text[batch_start : batch_start + _MORPHEMIZER_BATCH_SIZE],
+                    am_config,
+                    context.profile_folder,
                 )
-                key = all_keys[index]
-                cards_data_dict[key].morphs = morphs
+                for index, _morphs in enumerate(morphs_batch, start=batch_start):
+                    key = all_keys[index]
+                    cards_data_dict[key].morphs = set(_morphs)
 
         for counter, card_id in enumerate(cards_data_dict):
             _update_progress_potentially_cancel(
+                context.progress,
                 label=f"Caching {config_filter.note_type} cards<br>card: {counter} of {card_amount}",
                 counter=counter,
                 max_value=card_amount,
@@ -316,23 +338,24 @@ def _cache_anki_data(  # pylint:disable=too-many-locals, too-many-branches, too-
 
     morphs_from_files: list[dict[str, Any]] = []
     if am_config.recalc_read_known_morphs_folder is True:
-        morphs_from_files = _get_morphs_from_files(am_config)
+        morphs_from_files = _get_morphs_from_files(am_config, context)
 
-    mw.taskman.run_on_main(partial(mw.progress.update, label="Saving to ankimorphs.db"))
+    context.progress.update(label="Saving to ankimorphs.db")
 
     am_db.insert_many_into_morph_table(morph_table_data + morphs_from_files)
     am_db.insert_many_into_card_table(card_table_data)
     am_db.insert_many_into_card_morph_map_table(card_morph_map_table_data)
+    am_db.update_stats(am_config.recalc_interval_for_known)
     # am_db.print_table("Cards")
     am_db.con.close()
 
 
-def _get_morphs_from_files(am_config: AnkiMorphsConfig) -> list[dict[str, Any]]:
-    assert mw is not None
-
+def _get_morphs_from_files(
+    am_config: AnkiMorphsConfig, context: RecalcContext
+) -> list[dict[str, Any]]:
     morphs_from_files: list[dict[str, Any]] = []
     known_morphs_dir_path: Path = Path(
-        mw.pm.profileFolder(), ankimorphs_globals.KNOWN_MORPHS_DIR_NAME
+        context.profile_folder, ankimorphs_globals.KNOWN_MORPHS_DIR_NAME
     )
     input_files: list[Path] = []
 
@@ -340,14 +363,11 @@ def _get_morphs_from_files(am_config: AnkiMorphsConfig) -> list[dict[str, Any]]:
         input_files.append(path)
 
     for input_file in input_files:
-        if mw.progress.want_cancel():  # user clicked 'x'
+        if context.progress.want_cancel():
             raise CancelledOperationException
 
-        mw.taskman.run_on_main(
-            partial(
-                mw.progress.update,
-                label=f"Importing known morphs from file:<br>{input_file.relative_to(known_morphs_dir_path)}",
-            )
+        context.progress.update(
+            label=f"Importing known morphs from file:<br>{input_file.relative_to(known_morphs_dir_path)}",
         )
 
         with open(input_file, encoding="utf-8") as csvfile:
@@ -370,14 +390,13 @@ def _get_morphs_from_files(am_config: AnkiMorphsConfig) -> list[dict[str, Any]]:
 def _update_cards_and_notes(  # pylint:disable=too-many-locals, too-many-statements, too-many-branches
     am_config: AnkiMorphsConfig,
     modify_enabled_config_filters: list[AnkiMorphsConfigFilter],
+    context: RecalcContext,
 ) -> None:
-    assert mw is not None
-    assert mw.col.db is not None
-    assert mw.progress is not None
-
-    am_db = AnkiMorphsDB()
-    model_manager: ModelManager = mw.col.models
+    am_db = context.get_am_db()
+    model_manager: ModelManager = context.col.models
     card_morph_map_cache: dict[int, list[Morpheme]] = am_db.get_card_morph_map_cache()
+    original_highlight_fingerprints: dict[int, str] = am_db.get_highlight_fingerprints()
+    highlight_fingerprints: dict[int, str] = original_highlight_fingerprints.copy()
     handled_cards: dict[int, None] = {}  # we only care about the key lookup, not values
     modified_cards: dict[int, Card] = {}  # a dict makes the offsetting process easier
     modified_notes: list[Note] = []
@@ -403,7 +422,9 @@ def _update_cards_and_notes(  # pylint:disable=too-many-locals, too-many-stateme
         note_type_field_name_dict: dict[str, tuple[int, FieldDict]] = (
             model_manager.field_map(note_type_dict)
         )
-        morph_priority: dict[str, int] = _get_morph_priority(am_db, config_filter)
+        morph_priority: dict[str, int] = _get_morph_priority(
+            am_db, config_filter, context.profile_folder
+        )
         cards_data_dict: dict[int, AnkiMorphsCardData] = am_db.get_am_cards_data_dict(
             note_type_id=model_manager.id_for_name(config_filter.note_type)
         )
@@ -411,6 +432,7 @@ def _update_cards_and_notes(  # pylint:disable=too-many-locals, too-many-stateme
 
         for counter, card_id in enumerate(cards_data_dict):
             _update_progress_potentially_cancel(
+                context.progress,
                 label=f"Updating {config_filter.note_type} cards<br>card: {counter} of {card_amount}",
                 counter=counter,
                 max_value=card_amount,
@@ -420,7 +442,7 @@ def _update_cards_and_notes(  # pylint:disable=too-many-locals, too-many-stateme
             if card_id in handled_cards:
                 continue
 
-            card: Card = mw.col.get_card(card_id)
+            card: Card = context.col.get_card(card_id)
             note: Note = card.note()
 
             # make sure to get the values and not references
@@ -472,6 +494,7 @@ def _update_cards_and_notes(  # pylint:disable=too-many-locals, too-many-stateme
                     card_morph_map_cache,
                     card.id,
                     note,
+                    highlight_fingerprints,
                 )
 
             # we only want anki to update the cards and notes that have actually changed
@@ -483,6 +506,14 @@ def _update_cards_and_notes(  # pylint:disable=too-many-locals, too-many-stateme
 
             handled_cards[card_id] = None  # this marks the card as handled
 
+    am_db.insert_many_into_highlight_fingerprint_table(
+        [
+            {"note_id": note_id, "fingerprint": fingerprint}
+            for note_id, fingerprint in highlight_fingerprints.items()
+            if original_highlight_fingerprints.get(note_id) != fingerprint
+        ]
+    )
+    am_db.delete_stale_highlight_fingerprints()
     am_db.con.close()
 
     if am_config.recalc_offset_new_cards:
@@ -491,17 +522,13 @@ def _update_cards_and_notes(  # pylint:disable=too-many-locals, too-many-stateme
             card_morph_map_cache,
             modified_cards,
             handled_cards,
+            context,
         )
 
-    mw.taskman.run_on_main(
-        partial(
-            mw.progress.update,
-            label="Inserting into Anki collection",
-        )
-    )
+    context.progress.update(label="Inserting into Anki collection")
 
-    mw.col.update_cards(list(modified_cards.values()))
-    mw.col.update_notes(modified_notes)
+    context.col.update_cards(list(modified_cards.values()))
+    context.col.update_notes(modified_notes)
 
 
 def _add_offsets_to_new_cards(  # pylint:disable=too-many-locals, too-many-branches
@@ -509,10 +536,10 @@ def _add_offsets_to_new_cards(  # pylint:disable=too-many-locals, too-many-branc
     card_morph_map_cache: dict[int, list[Morpheme]],
     modified_cards: dict[int, Card],
     handled_cards: dict[int, None],
+    context: RecalcContext,
 ) -> dict[int, Card]:
     # This essentially replaces the need for the "skip" options, which in turn
     # makes reviewing cards on mobile a viable alternative.
-    assert mw is not None
 
     modified_offset_cards: dict[int, Card] = {}
     earliest_due_card_for_unknown_morph: dict[Morpheme, Card] = {}
@@ -523,6 +550,7 @@ def _add_offsets_to_new_cards(  # pylint:disable=too-many-locals, too-many-branc
     card_amount = len(handled_cards)
     for counter, card_id in enumerate(handled_cards):
         _update_progress_potentially_cancel(
+            context.progress,
             label=f"Potentially offsetting cards<br>card: {counter} of {card_amount}",
             counter=counter,
             max_value=card_amount,
@@ -531,7 +559,7 @@ def _add_offsets_to_new_cards(  # pylint:disable=too-many-locals, too-many-branc
         try:
             card_morphs: list[Morpheme] = card_morph_map_cache[card_id]
             card_unknown_morphs: set[Morpheme] = set()
-            card = mw.col.get_card(card_id)
+            card = context.col.get_card(card_id)
 
             for morph in card_morphs:
                 assert morph.highest_learning_interval is not None
@@ -561,12 +589,7 @@ def _add_offsets_to_new_cards(  # pylint:disable=too-many-locals, too-many-branc
             # card does not have morphs or is buggy in some way
             continue
 
-    mw.taskman.run_on_main(
-        partial(
-            mw.progress.update,
-            label="Applying offsets",
-        )
-    )
+    context.progress.update(label="Applying offsets")
 
     # sort so we can limit to the top x unknown morphs
     earliest_due_card_for_unknown_morph = dict(
@@ -584,7 +607,7 @@ def _add_offsets_to_new_cards(  # pylint:disable=too-many-locals, too-many-branc
         all_new_cards_with_morph.remove(earliest_due_card.id)
 
         for card_id in all_new_cards_with_morph:
-            card = mw.col.get_card(card_id)
+            card = context.col.get_card(card_id)
             score_and_offset: int | None = None
 
             # we don't want to offset the card due if it has already been offset previously
@@ -615,6 +638,7 @@ def _add_offsets_to_new_cards(  # pylint:disable=too-many-locals, too-many-branc
 def _get_morph_priority(
     am_db: AnkiMorphsDB,
     am_config_filter: AnkiMorphsConfigFilter,
+    profile_folder: str,
 ) -> dict[str, int]:
     if (
         am_config_filter.morph_priority
@@ -623,17 +647,17 @@ def _get_morph_priority(
         morph_priority = am_db.get_morph_collection_priority()
     else:
         morph_priority = _get_morph_frequency_file_priority(
-            am_config_filter.morph_priority
+            am_config_filter.morph_priority, profile_folder
         )
     return morph_priority
 
 
-def _get_morph_frequency_file_priority(frequency_file_name: str) -> dict[str, int]:
-    assert mw is not None
-
+def _get_morph_frequency_file_priority(
+    frequency_file_name: str, profile_folder: str
+) -> dict[str, int]:
     morph_priority: dict[str, int] = {}
     frequency_file_path = Path(
-        mw.pm.profileFolder(),
+        profile_folder,
         ankimorphs_globals.FREQUENCY_FILES_DIR_NAME,
         frequency_file_name,
     )
@@ -786,6 +810,7 @@ def _on_success(_start_time: float) -> None:
     tooltip("Finished Recalc", parent=mw)
     end_time: float = time.time()
     print(f"Recalc duration: {round(end_time - _start_time, 3)} seconds")
+    morphemizer_module.print_cache_stats()
 
 
 def _on_failure(
@@ -812,7 +837,12 @@ def _on_failure(
         return
 
     title = "AnkiMorphs Error"
+    text = get_error_text(error)
+    message_box_utils.show_error_box(title=title, body=text, parent=mw)
 
+
+def get_error_text(error: Exception) -> str:
+    # unexpected errors are raised again, those are bugs
     if isinstance(error, DefaultSettingsException):
         text = f'Found a note filter containing a "{ankimorphs_globals.NONE_OPTION}" option. Please select something else.'
     elif isinstance(error, AnkiNoteTypeNotFound):
@@ -844,23 +874,14 @@ def _on_failure(
     else:
         raise error
 
-    message_box_utils.show_error_box(title=title, body=text, parent=mw)
+    return text
 
 
 def _update_progress_potentially_cancel(
-    label: str, counter: int, max_value: int
+    progress: RecalcProgress, label: str, counter: int, max_value: int
 ) -> None:
-    assert mw is not None
-
     if counter % 1000 == 0:
-        if mw.progress.want_cancel():  # user clicked 'x'
+        if progress.want_cancel():
             raise CancelledOperationException
 
-        mw.taskman.run_on_main(
-            partial(
-                mw.progress.update,
-                label=label,
-                value=counter,
-                max=max_value,
-            )
-        )
+        progress.update(label=label, value=counter, max_value=max_value)
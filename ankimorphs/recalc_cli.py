@@ -0,0 +1,105 @@
+"""
+Runs recalc directly on a collection file without the anki gui, e.g. on a
+server before syncing, or to benchmark it:
+
+    python -m ankimorphs.recalc_cli --collection "Anki2/User 1/collection.anki2"
+
+Anki must not have the collection open at the same time.
+Run with '--help' to see all the options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from anki.collection import Collection
+
+from . import ankimorphs_config, ankimorphs_globals
+from . import morphemizer as morphemizer_module
+from . import recalc
+from .ankimorphs_config import AnkiMorphsConfigFilter
+from .recalc_context import RecalcContext, RecalcProgress
+
+
+class _PrintProgress(RecalcProgress):
+    # used by the cli, recalc can't be cancelled there except with ctrl+c
+
+    def update(
+        self, label: str, value: int | None = None, max_value: int | None = None
+    ) -> None:
+        print(label.replace("<br>", " "), file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m ankimorphs.recalc_cli",
+        description="Runs recalc on a collection without opening Anki.",
+    )
+    parser.add_argument(
+        "--collection",
+        required=True,
+        help="the collection.anki2 file of an anki profile",
+    )
+    parser.add_argument(
+        "--config",
+        help="the AnkiMorphs settings (default: the "
+        f"{ankimorphs_globals.PROFILE_SETTINGS_FILE_NAME} of the profile)",
+    )
+    parser.add_argument(
+        "--profile-folder",
+        help="the folder with ankimorphs.db, the frequency files, etc. "
+        "(default: the folder of the collection)",
+    )
+    args = parser.parse_args(argv)
+
+    profile_folder: str = args.profile_folder or str(
+        Path(args.collection).absolute().parent
+    )
+    config_path: Path = (
+        Path(args.config)
+        if args.config is not None
+        else Path(profile_folder, ankimorphs_globals.PROFILE_SETTINGS_FILE_NAME)
+    )
+    ankimorphs_config.load_configs_from_file(config_path)
+
+    read_enabled_config_filters: list[AnkiMorphsConfigFilter] = (
+        ankimorphs_config.get_read_enabled_filters()
+    )
+    modify_enabled_config_filters: list[AnkiMorphsConfigFilter] = (
+        ankimorphs_config.get_modify_enabled_filters()
+    )
+
+    col = Collection(args.collection)
+    try:
+        context = RecalcContext(
+            col=col, profile_folder=profile_folder, progress=_PrintProgress()
+        )
+
+        settings_error: Exception | None = recalc.check_selected_settings_for_errors(
+            read_enabled_config_filters, modify_enabled_config_filters, context
+        )
+        if settings_error is not None:
+            print(recalc.get_error_text(settings_error), file=sys.stderr)
+            return 1
+
+        _start_time: float = time.time()
+        recalc.recalc_background_op(
+            read_enabled_config_filters, modify_enabled_config_filters, context
+        )
+        end_time: float = time.time()
+        print(
+            f"Recalc duration: {round(end_time - _start_time, 3)} seconds",
+            file=sys.stderr,
+        )
+        morphemizer_module.print_cache_stats()
+    finally:
+        col.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
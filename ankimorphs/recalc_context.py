@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+from functools import partial
+
+from anki.collection import Collection
+from aqt import mw
+
+from .ankimorphs_db import AnkiMorphsDB
+
+# Recalc itself (recalc.py) only uses the collection, the profile folder and the
+# progress through a RecalcContext, which makes it possible to run it both from
+# the main window and from the command line (recalc_cli.py).
+
+
+class RecalcProgress:
+    """
+    Recalc reports its progress here, and checks if it should be cancelled.
+    This does neither, subclasses decide where the progress is shown.
+    """
+
+    def want_cancel(self) -> bool:
+        return False
+
+    def update(
+        self, label: str, value: int | None = None, max_value: int | None = None
+    ) -> None:
+        pass
+
+
+class _MainWindowProgress(RecalcProgress):
+    # recalc runs on a background thread, so the progress
+    # dialog has to be updated on the main thread.
+
+    def want_cancel(self) -> bool:
+        assert mw is not None
+        return mw.progress.want_cancel()  # user clicked 'x'
+
+    def update(
+        self, label: str, value: int | None = None, max_value: int | None = None
+    ) -> None:
+        assert mw is not None
+        mw.taskman.run_on_main(
+            partial(
+                mw.progress.update,
+                label=label,
+                value=value,
+                max=max_value,
+            )
+        )
+
+
+class RecalcContext:
+    """
+    Everything recalc needs from anki: the collection, the profile folder with
+    ankimorphs.db and the frequency files, and where to report the progress.
+    In anki these come from the main window, in the cli (see 'recalc_cli') the
+    collection is opened directly from its file.
+    """
+
+    def __init__(
+        self, col: Collection, profile_folder: str, progress: RecalcProgress
+    ) -> None:
+        self.col: Collection = col
+        self.profile_folder: str = profile_folder
+        self.progress: RecalcProgress = progress
+
+    def get_am_db(self) -> AnkiMorphsDB:
+        return AnkiMorphsDB(os.path.join(self.profile_folder, "ankimorphs.db"))
+
+
+def get_main_window_context() -> RecalcContext:
+    assert mw is not None
+    assert mw.pm is not None
+    return RecalcContext(
+        col=mw.col,
+        profile_folder=mw.pm.profileFolder(),
+        progress=_MainWindowProgress(),
+    )
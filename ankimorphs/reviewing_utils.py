@@ -7,6 +7,7 @@ from anki.cards import Card
 from anki.collection import Collection, UndoStatus
 from anki.consts import CARD_TYPE_NEW
 from anki.notes import Note
+from anki.scheduler.v3 import Scheduler as V3Scheduler
 from aqt import mw
 from aqt.operations import QueryOp
 from aqt.qt import QKeySequence, QMessageBox, Qt  # pylint:disable=no-name-in-module
@@ -31,6 +32,10 @@ VALID_UNDO_MERGE_TARGETS: set[str] = {  # a set has faster lookup than a list
 }
 set_known_and_skip_undo: UndoStatus | None = None
 
+# The maximum number of queued cards the prefetcher evaluates ahead of time
+_PREFETCH_LIMIT: int = 5
+_prefetched_cards: PrefetchedCards | None = None
+
 
 def am_next_card() -> None:
     ################################################################
@@ -52,6 +57,9 @@ def am_next_card() -> None:
     am_config = AnkiMorphsConfig()
     skipped_cards = SkippedCards()
 
+    if _show_prefetched_card(am_config, skipped_cards):
+        return
+
     operation = QueryOp(
         parent=mw,
         op=partial(
@@ -204,6 +212,168 @@ def _show_card(
             skipped_cards.show_tooltip_of_skipped_cards()
 
 
+def prefetch_next_cards(card: Card) -> None:
+    ################################################################
+    #                          PREFETCHING
+    ################################################################
+    # Running the skip checks in am_next_card adds latency to every
+    # review, even when no cards end up being skipped. While the
+    # current card is displayed, we therefore evaluate the skip
+    # conditions of the next cards in the queue on a background
+    # thread. When the card is answered, am_next_card can use these
+    # decisions directly, as long as the queue and the undo state
+    # are still the same as when the decisions were made.
+    ################################################################
+    global _prefetched_cards
+
+    assert mw is not None
+
+    _prefetched_cards = None
+
+    if mw.col.sched.version < 3:
+        return
+
+    prefetched_cards = PrefetchedCards(
+        card_id=card.id,
+        undo_step=mw.col.undo_status().last_step,
+        am_config=AnkiMorphsConfig(),
+    )
+    _prefetched_cards = prefetched_cards
+
+    operation = QueryOp(
+        parent=mw,
+        op=partial(_prefetch_next_cards_background, prefetched_cards=prefetched_cards),
+        success=partial(_on_prefetch_success, prefetched_cards=prefetched_cards),
+    )
+    operation.failure(_on_prefetch_failure)
+    operation.run_in_background()
+
+
+def _prefetch_next_cards_background(
+    collection: Collection,
+    prefetched_cards: PrefetchedCards,
+) -> None:
+    am_config = prefetched_cards.am_config
+
+    # the queue can only be read ahead with the v3 scheduler
+    if not isinstance(collection.sched, V3Scheduler):
+        return
+
+    # the top of the queue is the card that is currently displayed
+    queued_cards = collection.sched.get_queued_cards(fetch_limit=_PREFETCH_LIMIT + 1)
+
+    if (
+        len(queued_cards.cards) == 0
+        or queued_cards.cards[0].card.id != prefetched_cards.card_id
+    ):
+        return
+
+    am_db = AnkiMorphsDB()
+
+    # The morphs of the displayed card are inserted into the 'Seen_Morphs'-table
+    # when it is answered, so we have to take those into account already.
+    morphs_already_seen_morphs_today: set[str] = am_db.get_all_morphs_seen_today()
+    morphs_already_seen_morphs_today.update(
+        lemma + inflection
+        for lemma, inflection in am_db.get_readable_card_morphs(
+            prefetched_cards.card_id
+        )
+    )
+
+    for queued_card in queued_cards.cards[1:]:
+        card = Card(collection, backend_card=queued_card.card)
+        skipped_cards = SkippedCards()
+
+        if card.type == CARD_TYPE_NEW:
+            note: Note = card.note()
+            if ankimorphs_config.get_matching_modify_filter(note) is not None:
+                skipped_cards.process_skip_conditions_of_card(
+                    am_config,
+                    am_db,
+                    note=note,
+                    card_id=card.id,
+                    morphs_already_seen_morphs_today=morphs_already_seen_morphs_today,
+                )
+
+        if not skipped_cards.did_skip_card:
+            prefetched_cards.show_card_id = card.id
+            break
+
+        prefetched_cards.skipped_cards_by_id[card.id] = skipped_cards
+
+    am_db.con.close()
+
+
+def _on_prefetch_success(result: Any, prefetched_cards: PrefetchedCards) -> None:
+    # This function runs on the main thread.
+    del result  # unused
+    prefetched_cards.is_ready = True
+
+
+def _on_prefetch_failure(error: Exception) -> None:
+    # This function runs on the main thread.
+    # Prefetching is only an optimization, am_next_card falls back
+    # to the normal skip checks, so the prefetch is quietly dropped.
+    global _prefetched_cards
+    del error  # unused
+    _prefetched_cards = None
+
+
+def _show_prefetched_card(
+    am_config: AnkiMorphsConfig, skipped_cards: SkippedCards
+) -> bool:
+    # This function runs on the main thread.
+    # Returns True if the prefetched decisions were still valid
+    # and the next card has been shown.
+    global _prefetched_cards
+
+    assert mw is not None
+    assert mw.reviewer is not None
+
+    prefetched_cards = _prefetched_cards
+    _prefetched_cards = None  # the decisions can only be used once
+
+    if prefetched_cards is None:
+        return False
+
+    if not prefetched_cards.is_valid(mw.col.undo_status(), mw.reviewer.card):
+        return False
+
+    # The queue also has to be unchanged, i.e. the cards at the top of
+    # the queue are the cards that were evaluated, in the same order.
+    queue_card_ids: list[int] = prefetched_cards.get_queue_card_ids()
+    if not isinstance(mw.col.sched, V3Scheduler):
+        return False
+    queued_cards = mw.col.sched.get_queued_cards(fetch_limit=len(queue_card_ids))
+
+    if [queued_card.card.id for queued_card in queued_cards.cards] != queue_card_ids:
+        return False
+
+    if len(prefetched_cards.skipped_cards_by_id) > 0:
+        undo_status = _get_valid_undo_status()
+        mw.col.sched.buryCards(list(prefetched_cards.skipped_cards_by_id), manual=False)
+        mw.col.merge_undo_entries(undo_status.last_step)
+
+        for prefetched_skipped_cards in prefetched_cards.skipped_cards_by_id.values():
+            skipped_cards += prefetched_skipped_cards
+
+    reviewer: Reviewer = mw.reviewer
+    reviewer.previous_card = reviewer.card
+    reviewer.card = None
+    reviewer._v3 = None
+
+    reviewer._get_next_v3_card()
+    reviewer._previous_card_info.set_card(reviewer.previous_card)
+    reviewer._card_info.set_card(reviewer.card)
+
+    if not reviewer.card:
+        mw.moveToState("overview")
+        return True
+
+    _show_card(None, am_config, skipped_cards)
+    return True
+
+
 def _set_card_as_known_and_skip(am_config: AnkiMorphsConfig) -> None:
     ################################################################
     #                          KNOWN BUG
@@ -377,13 +547,16 @@ class SkippedCards:
         self.total_skipped_cards = 0
         self.did_skip_card = False
 
-    def process_skip_conditions_of_card(
+    def process_skip_conditions_of_card(  # pylint:disable=too-many-arguments
         self,
         am_config: AnkiMorphsConfig,
         am_db: AnkiMorphsDB,
         note: Note,
         card_id: int,
+        morphs_already_seen_morphs_today: set[str] | None = None,
     ) -> None:
+        # The prefetcher evaluates cards before the current card has been answered,
+        # so it supplies its own set of seen morphs instead of reading the db table.
         self.did_skip_card = False
 
         learn_now_tag: bool = note.has_tag(am_config.tag_learn_card_now)
@@ -398,9 +571,8 @@ class SkippedCards:
                 self.skipped_known_cards += 1
                 self.did_skip_card = True
         elif am_config.skip_unknown_morph_seen_today_cards:
-            morphs_already_seen_morphs_today: set[str] = (
-                am_db.get_all_morphs_seen_today()
-            )
+            if morphs_already_seen_morphs_today is None:
+                morphs_already_seen_morphs_today = am_db.get_all_morphs_seen_today()
             card_unknown_morphs_raw: set[tuple[str, str]] | None = (
                 am_db.get_morphs_of_card(card_id, search_unknowns=True)
             )
@@ -416,6 +588,14 @@ class SkippedCards:
             self.skipped_known_cards + self.skipped_already_seen_morphs_cards
         )
 
+    def __iadd__(self, other: SkippedCards) -> SkippedCards:
+        self.skipped_known_cards += other.skipped_known_cards
+        self.skipped_already_seen_morphs_cards += (
+            other.skipped_already_seen_morphs_cards
+        )
+        self.total_skipped_cards += other.total_skipped_cards
+        return self
+
     def show_tooltip_of_skipped_cards(self) -> None:
         skipped_string = ""
 
@@ -427,3 +607,47 @@ class SkippedCards:
             skipped_string += f"Skipped <b>{self.skipped_already_seen_morphs_cards}</b> cards with morphs already seen today"
 
         tooltip(skipped_string, parent=mw)
+
+
+class PrefetchedCards:
+    __slots__ = (
+        "card_id",
+        "undo_step",
+        "am_config",
+        "skipped_cards_by_id",
+        "show_card_id",
+        "is_ready",
+    )
+
+    def __init__(self, card_id: int, undo_step: int, am_config: AnkiMorphsConfig):
+        # card_id and undo_step are the versions the prefetch was made against:
+        # the card being displayed, and the undo step before it gets answered.
+        self.card_id: int = card_id
+        self.undo_step: int = undo_step
+        self.am_config: AnkiMorphsConfig = am_config
+
+        # the queued cards in the order they will be encountered, the
+        # last entry is the card that should be shown, the rest are skipped
+        self.skipped_cards_by_id: dict[int, SkippedCards] = {}
+        self.show_card_id: int | None = None
+        self.is_ready: bool = False
+
+    def is_valid(self, undo_status: UndoStatus, current_card: Card | None) -> bool:
+        # The decisions are only valid if the only thing that happened since the
+        # prefetch is that the displayed card was answered, which is exactly
+        # one undoable step. Anything else (undo, bury, edits, set known and skip)
+        # can change tags or seen morphs, so we have to fall back to the slow path.
+        if not self.is_ready or self.show_card_id is None:
+            return False
+        if current_card is None or current_card.id != self.card_id:
+            return False
+        if undo_status.redo != "":
+            return False
+        return bool(
+            undo_status.undo == "Answer Card"
+            and undo_status.last_step == self.undo_step + 1
+        )
+
+    def get_queue_card_ids(self) -> list[int]:
+        assert self.show_card_id is not None
+        return list(self.skipped_cards_by_id) + [self.show_card_id]
@@ -323,14 +323,14 @@ def get_installed_models() -> list[str]:
     try:
         global updated_python_path
 
-        if not updated_python_path and not testing_environment:
+        # Outside of anki, e.g. in the generators cli, spaCy is simply
+        # imported from the current python environment.
+        if not updated_python_path and not testing_environment and mw is not None:
             # Anki only looks into its own directories for python packages,
             # to add other lookup folders we have to change the sys path.
             # In the guide we instruct the users to install the spacy
             # virtual environment into the addons21 folder as 'spacyenv'.
             # That way we can get the path based on the anki mw.pm.
-            assert mw is not None
-
             spacy_path = os.path.join(mw.pm.addonFolder(), "spacyenv")
 
             if is_win is True:
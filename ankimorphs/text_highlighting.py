@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import re
-
 from . import text_preprocessing
 from .ankimorphs_config import AnkiMorphsConfig
 from .morpheme import Morpheme
@@ -12,7 +10,7 @@ class SpanElement:
     def __init__(
         self, morph_group: str, morph_status: str, start_index: int, end_index: int
     ):
-        # it's crucial that the morph_group parameter originates from Match[str].group()
+        # it's crucial that the morph_group parameter originates from the text itself
         # because that maintains the original letter casing, which we want to preserve
         # in the highlighted version of the text.
         self.morph_group: str = morph_group
@@ -31,25 +29,24 @@ def get_highlighted_text(
     # of ruby characters (https://docs.ankiweb.net/templates/fields.html#ruby-characters).
     #
     # To prevent that problem, we have to first have to iterate over the string and extract the ruby characters
-    # and return the filtered string. Next, we can run almost the same procedure with the found morphs: extract
-    # them and filter the string. Once both of these passes are completed, we are left with a string that
-    # only has non-word characters and text that did not match any morphs.
+    # and return the filtered string. Next, we scan the filtered string once for all the morphs and store
+    # their positions. Once both of these passes are completed, we know exactly which parts of the string are
+    # morphs and which parts are non-word characters or text that did not match any morphs.
     #
     # Take, for example, the following (contrived) text:
     #   "Hello[ハロー] myy world!"
     #
     # The process would look like this:
     # 1. The "[ハロー]" part is found to be ruby characters and is therefore removed from the
-    # string and stored in a dict along with its original position, leaving us with string:
+    # string and stored in a list along with its position, leaving us with string:
     #   "Hello myy world!"
     #
     # 2. The words "Hello" and "world" are found to be morphs, and information about them and their original position
-    # are stored as SpanElement objects in a list, and are then removed from the string and replaced
-    # by whitespaces, leaving us with:
+    # are stored as SpanElement objects in a list, which means only these parts are left unmatched:
     #   "      myy      !"
     #
-    # 3. We now have all the information we need to reassemble the string with the span elements that contain the morphs
-    # and any ruby characters that directly followed them will be included in the spans.
+    # 3. We now have all the information we need to reassemble the string segment by segment, the span elements contain
+    # the morphs and any ruby characters that directly followed them will be included in the spans.
     #
     # The final highlighted string could end up looking something like this:
     #   "<span morph-status="known">Hello[ハロー]</span> myy <span morph-status="unknown">world</span>!"
@@ -57,175 +54,250 @@ def get_highlighted_text(
     # print(f"text_to_highlight: {text_to_highlight}")
     # print(f"text_to_highlight list: {list(text_to_highlight)}")
 
-    ruby_character_dict, text_to_highlight = _extract_ruby_characters_and_filter_string(
+    ruby_characters, text_to_highlight = _extract_ruby_characters_and_filter_string(
         am_config, text_to_highlight
     )
-    span_elements, text_to_highlight = _extract_span_elements_and_filter_string(
+    span_elements: list[SpanElement] = _get_span_elements(
         am_config, card_morphs, text_to_highlight
     )
-    # sorting the spans allows for iteration by a single index instead of looping
-    # through the list every time we want to find an element
+    # sorting the spans allows us to reassemble the string from left to right
     span_elements.sort(key=lambda span: span.start_index)
 
     # the string has now been sufficiently stripped and split into its constituent parts,
-    # and we can now reassemble it
+    # and we can now reassemble it segment by segment, where each segment is either a
+    # span element or the text between two span elements.
     highlighted_text_list: list[str] = []
-    index: int = 0
-    previous_span_index: int = -1
-
-    while index < len(text_to_highlight):
-
-        span_element: SpanElement | None = _get_span_element(
-            span_elements, previous_span_index
-        )
-        if (
-            span_element is not None
-            and span_element.start_index <= index < span_element.end_index
-        ):
-            span_string = span_element.morph_group
-
-            if len(ruby_character_dict) > 0:
-                # we need to do this in reverse order to preserve the indices
-                global_string_index = span_element.end_index
-                # this substring index is offset by +1 because it is used for string splicing
-                sub_string_index = len(span_string)
-
-                while global_string_index > span_element.start_index:
-                    if global_string_index in ruby_character_dict:
-                        span_string = (
-                            span_string[:sub_string_index]
-                            + ruby_character_dict[global_string_index]
-                            + span_string[sub_string_index:]
-                        )
-                        # this entry is not needed anymore
-                        del ruby_character_dict[global_string_index]
-
-                    global_string_index -= 1
-                    sub_string_index -= 1
-
-            span_string = (
-                f'<span morph-status="{span_element.morph_status}">{span_string}</span>'
+    ruby_index: int = 0
+    previous_end_index: int = 0
+
+    # ruby characters at the very start of the text don't follow any characters
+    while ruby_index < len(ruby_characters) and ruby_characters[ruby_index][0] == 0:
+        highlighted_text_list.append(ruby_characters[ruby_index][1])
+        ruby_index += 1
+
+    for span_element in span_elements:
+        if span_element.start_index > previous_end_index:
+            non_span_string, ruby_index = _add_ruby_characters(
+                text_to_highlight[previous_end_index : span_element.start_index],
+                previous_end_index,
+                ruby_characters,
+                ruby_index,
             )
-            highlighted_text_list.append(span_string)
-            index = span_element.end_index
-
-            # keep the index within range
-            if previous_span_index < len(span_elements) - 2:
-                previous_span_index += 1
-
-        else:
-            non_span_string = text_to_highlight[index]
-            if len(ruby_character_dict) > 0:
-                # add any ruby characters found in the subsequent index.
-                # note: it can seem unnecessarily complicated to append
-                # the ruby character in this else branch, but since the
-                # if branch above can potentially also trigger on the
-                # subsequent index _and_ that takes priority, it means that
-                # this next ruby character might never be reached unless
-                # we do it here.
-                next_index = index + 1
-                if next_index in ruby_character_dict:
-                    non_span_string += ruby_character_dict[next_index]
-                    # this entry is not needed anymore
-                    del ruby_character_dict[next_index]
-
             highlighted_text_list.append(non_span_string)
-            index += 1
+
+        span_string, ruby_index = _add_ruby_characters(
+            span_element.morph_group,
+            span_element.start_index,
+            ruby_characters,
+            ruby_index,
+        )
+        highlighted_text_list.append(
+            f'<span morph-status="{span_element.morph_status}">{span_string}</span>'
+        )
+        previous_end_index = span_element.end_index
+
+    # the remaining text after the last span element, this is also
+    # where any trailing ruby characters are added.
+    non_span_string, ruby_index = _add_ruby_characters(
+        text_to_highlight[previous_end_index:],
+        previous_end_index,
+        ruby_characters,
+        ruby_index,
+    )
+    highlighted_text_list.append(non_span_string)
 
     # print(f'highlighted text: {"".join(highlighted_text_list)}')
     return "".join(highlighted_text_list)
 
 
+def get_morph_status(am_config: AnkiMorphsConfig, morph: Morpheme) -> str:
+    assert morph.highest_learning_interval is not None
+
+    if morph.highest_learning_interval == 0:
+        return "unknown"
+    if morph.highest_learning_interval < am_config.recalc_interval_for_known:
+        return "learning"
+    return "known"
+
+
 def _extract_ruby_characters_and_filter_string(
     am_config: AnkiMorphsConfig, text_to_highlight: str
-) -> tuple[dict[int, str], str]:
-    ruby_character_dict: dict[int, str] = {}
+) -> tuple[list[tuple[int, str]], str]:
+    # Returns the ruby characters as (index, ruby characters) tuples, where the
+    # index is the position in the filtered string the ruby characters came
+    # directly before, e.g. "時間[じかん]が" -> [(2, "[じかん]")], "時間が"
+    ruby_characters: list[tuple[int, str]] = []
 
     # most users probably don't have ruby characters on their cards,
     # so we only want to do all this extra work of extracting and replacing
     # if they have activated the relevant pre-process option
     if not am_config.preprocess_ignore_bracket_contents:
-        return ruby_character_dict, text_to_highlight
+        return ruby_characters, text_to_highlight
+
+    # a single left to right pass, where the text between the ruby characters
+    # is collected and joined at the end.
+    base_text_list: list[str] = []
+    base_text_length: int = 0
+    previous_end_index: int = 0
+
+    for match in text_preprocessing.square_brackets_regex.finditer(text_to_highlight):
+        base_text = text_to_highlight[previous_end_index : match.start()]
+        base_text_list.append(base_text)
+        base_text_length += len(base_text)
+        ruby_characters.append((base_text_length, match.group()))
+        previous_end_index = match.end()
+
+    if len(ruby_characters) == 0:
+        return ruby_characters, text_to_highlight
+
+    base_text_list.append(text_to_highlight[previous_end_index:])
+    return ruby_characters, "".join(base_text_list)
+
+
+def _add_ruby_characters(
+    text_segment: str,
+    segment_start_index: int,
+    ruby_characters: list[tuple[int, str]],
+    ruby_index: int,
+) -> tuple[str, int]:
+    # Inserts the ruby characters that belong to the segment, i.e. the ones that
+    # directly follow one of its characters, and returns the index of the first
+    # ruby characters that belong to a later segment.
+    segment_end_index = segment_start_index + len(text_segment)
+
+    if (
+        ruby_index == len(ruby_characters)
+        or ruby_characters[ruby_index][0] > segment_end_index
+    ):
+        return text_segment, ruby_index
 
-    while True:
-        # matches first found, left to right
-        match: re.Match[str] | None = re.search(
-            text_preprocessing.square_brackets_regex, text_to_highlight
-        )
-        if match is None:
-            break
+    segment_list: list[str] = []
+    previous_sub_string_index: int = 0
 
-        ruby_character_dict[match.start()] = match.group()
+    while (
+        ruby_index < len(ruby_characters)
+        and ruby_characters[ruby_index][0] <= segment_end_index
+    ):
+        global_string_index, ruby_string = ruby_characters[ruby_index]
+        sub_string_index = global_string_index - segment_start_index
+        segment_list.append(text_segment[previous_sub_string_index:sub_string_index])
+        segment_list.append(ruby_string)
+        previous_sub_string_index = sub_string_index
+        ruby_index += 1
 
-        # remove the found match from the string and repeat
-        text_to_highlight = (
-            text_to_highlight[: match.start()] + text_to_highlight[match.end() :]
-        )
+    segment_list.append(text_segment[previous_sub_string_index:])
+    return "".join(segment_list), ruby_index
 
-    return ruby_character_dict, text_to_highlight
 
+class _MorphTrieNode:
+    __slots__ = (
+        "children",
+        "morph_index",
+    )
+
+    def __init__(self) -> None:
+        self.children: dict[str, _MorphTrieNode] = {}
+        self.morph_index: int | None = None
 
-def _extract_span_elements_and_filter_string(
-    am_config: AnkiMorphsConfig, card_morphs: list[Morpheme], text_to_highlight: str
-) -> tuple[list[SpanElement], str]:
-    span_elements: list[SpanElement] = []
 
+def _get_morph_trie(
+    am_config: AnkiMorphsConfig, card_morphs: list[Morpheme]
+) -> tuple[_MorphTrieNode, list[str]]:
     # To avoid formatting a smaller morph contained in a bigger morph, we reverse sort
-    # the morphs based on length and extract those first.
+    # the morphs based on length, so the bigger morphs take priority.
     morphs_by_size = sorted(
         card_morphs,
         key=lambda _simple_morph: len(_simple_morph.inflection),
         reverse=True,
     )
 
+    # Instead of running a separate regex search (and rebuilding the string) for every
+    # morph, we insert all the inflections into a trie and then scan the text only once.
+    # Both the inflections and the text are lowercased to make the matching case-insensitive.
+    morph_statuses: list[str] = []
+    morph_trie = _MorphTrieNode()
+
     for morph in morphs_by_size:
         # print(f"morph: {morph.lemma}, {morph.inflection}")
-        assert morph.highest_learning_interval is not None
-
-        if morph.highest_learning_interval == 0:
-            morph_status = "unknown"
-        elif morph.highest_learning_interval < am_config.recalc_interval_for_known:
-            morph_status = "learning"
-        else:
-            morph_status = "known"
-
-        # escaping special regex characters is crucial because morphs from malformed text
-        # sometimes can include them, e.g. "?몇"
-        regex_pattern: str = f"{re.escape(morph.inflection)}"
-        morph_matches = re.finditer(
-            regex_pattern, text_to_highlight, flags=re.IGNORECASE
-        )
+        inflection = _to_lowercase_preserving_indices(morph.inflection)
+        if inflection == "":
+            continue
 
-        for morph_match in morph_matches:
-            start_index = morph_match.start()
-            end_index = morph_match.end()
-            morph_len = end_index - start_index
+        node = morph_trie
+        for char in inflection:
+            if char not in node.children:
+                node.children[char] = _MorphTrieNode()
+            node = node.children[char]
 
-            # the morph_match.group() maintains the original letter casing of the
-            # morph found in the text, which is crucial because we want everything
-            # to be identical to the original text.
-            span_elements.append(
-                SpanElement(morph_match.group(), morph_status, start_index, end_index)
-            )
+        # the same inflection can come from multiple morphs, e.g. "見" from "見る" and "見",
+        # in which case the first (bigger) one takes priority
+        if node.morph_index is not None:
+            continue
+
+        node.morph_index = len(morph_statuses)
+        morph_statuses.append(get_morph_status(am_config, morph))
 
-            # we need to preserve indices, so we replace the morphs with whitespaces
-            text_to_highlight = (
-                text_to_highlight[:start_index]
-                + "".join([" " for _ in range(morph_len)])
-                + text_to_highlight[end_index:]
+    return morph_trie, morph_statuses
+
+
+def _get_span_elements(
+    am_config: AnkiMorphsConfig, card_morphs: list[Morpheme], text_to_highlight: str
+) -> list[SpanElement]:
+    morph_trie, morph_statuses = _get_morph_trie(am_config, card_morphs)
+
+    lowercase_text = _to_lowercase_preserving_indices(text_to_highlight)
+    text_length = len(lowercase_text)
+
+    # (morph index, start index, end index)
+    match_candidates: list[tuple[int, int, int]] = []
+
+    for start_index, char in enumerate(lowercase_text):
+        child_node = morph_trie.children.get(char)
+        end_index = start_index + 1
+
+        while child_node is not None:
+            if child_node.morph_index is not None:
+                match_candidates.append(
+                    (child_node.morph_index, start_index, end_index)
+                )
+            if end_index == text_length:
+                break
+            child_node = child_node.children.get(lowercase_text[end_index])
+            end_index += 1
+
+    # The candidates are resolved in the same order as the morphs are sorted, i.e.
+    # the biggest morphs first and then left to right. A candidate is only used if
+    # none of its characters have already been claimed by a previous candidate.
+    match_candidates.sort()
+    claimed_indices = bytearray(text_length)
+    span_elements: list[SpanElement] = []
+
+    for morph_index, start_index, end_index in match_candidates:
+        if claimed_indices.find(1, start_index, end_index) != -1:
+            continue
+
+        claimed_indices[start_index:end_index] = b"\x01" * (end_index - start_index)
+
+        # slicing the original text maintains the original letter casing of the
+        # morph found in the text, which is crucial because we want everything
+        # to be identical to the original text.
+        span_elements.append(
+            SpanElement(
+                text_to_highlight[start_index:end_index],
+                morph_statuses[morph_index],
+                start_index,
+                end_index,
             )
+        )
+
+    return span_elements
 
-    return span_elements, text_to_highlight
 
+def _to_lowercase_preserving_indices(text: str) -> str:
+    lowercase_text = text.lower()
+    if len(lowercase_text) == len(text):
+        return lowercase_text
 
-def _get_span_element(
-    span_elements: list[SpanElement], previous_span_index: int
-) -> SpanElement | None:
-    try:
-        return span_elements[previous_span_index + 1]
-    except IndexError:
-        # This exception should only happen when the span_elements
-        # list is empty, which should be a rare occurrence. Catching
-        # a rare exception is more efficient than checking with an
-        # if statement every time.
-        return None
+    # A few characters expand when they are lowercased, e.g. "İ" -> "i̇", which would
+    # shift all the subsequent indices, so those characters are left as they are.
+    return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import re
 from typing import Any
 
@@ -12,8 +14,12 @@ slim_round_brackets_regexp = re.compile(r"\([^)]*\)")
 non_alpha_regexp = re.compile(r"[-'\w]")
 
 
-def get_processed_spacy_morphs(am_config: AnkiMorphsConfig, doc: Any) -> list[Morpheme]:
+def get_processed_spacy_morphs(
+    am_config: AnkiMorphsConfig, doc: Any, profile_folder: str | None = None
+) -> list[Morpheme]:
     # doc: spacy.tokens.Doc
+    #
+    # profile_folder: where the names file is, see 'remove_names_textfile'
 
     morphs: list[Morpheme] = []
 
@@ -34,23 +40,30 @@ def get_processed_spacy_morphs(am_config: AnkiMorphsConfig, doc: Any) -> list[Mo
         )
 
     if am_config.preprocess_ignore_names_textfile:
-        morphs = remove_names_textfile(morphs)
+        morphs = remove_names_textfile(morphs, profile_folder)
 
     return morphs
 
 
-def get_processed_morphemizer_morphs(
-    morphemizer: Morphemizer, expression: str, am_config: AnkiMorphsConfig
-) -> list[Morpheme]:
-    morphs: list[Morpheme] = morphemizer.get_morphemes_from_expr(expression)
+def get_processed_morphemizer_morphs_batch(
+    morphemizer: Morphemizer,
+    expressions: list[str],
+    am_config: AnkiMorphsConfig,
+    profile_folder: str | None = None,
+) -> list[list[Morpheme]]:
+    morphs_batch: list[list[Morpheme]] = morphemizer.get_morphemes_from_expr_batch(
+        expressions
+    )
 
     if am_config.preprocess_ignore_names_morphemizer:
-        morphs = remove_names_morphemizer(morphs)
+        morphs_batch = [remove_names_morphemizer(morphs) for morphs in morphs_batch]
 
     if am_config.preprocess_ignore_names_textfile:
-        morphs = remove_names_textfile(morphs)
+        morphs_batch = [
+            remove_names_textfile(morphs, profile_folder) for morphs in morphs_batch
+        ]
 
-    return morphs
+    return morphs_batch
 
 
 def get_processed_expression(am_config: AnkiMorphsConfig, expression: str) -> str:
@@ -73,8 +86,10 @@ def remove_names_morphemizer(morphs: list[Morpheme]) -> list[Morpheme]:
     return [morph for morph in morphs if not morph.is_proper_noun()]
 
 
-def remove_names_textfile(morphs: list[Morpheme]) -> list[Morpheme]:
-    names = name_file_utils.get_names_from_file()
+def remove_names_textfile(
+    morphs: list[Morpheme], profile_folder: str | None = None
+) -> list[Morpheme]:
+    names = name_file_utils.get_names_from_file(profile_folder)
     non_name_morphs: list[Morpheme] = []
 
     for morph in morphs:
@@ -11,6 +11,9 @@ class MorphToolbarStats:
         self.update_stats()
 
     def update_stats(self) -> None:
+        self.unique_morphs = "U: ?"
+        self.all_morphs = "A: ?"
+
         try:
             am_db = AnkiMorphsDB()
         except TypeError:
@@ -21,35 +24,33 @@ class MorphToolbarStats:
 
         # this is only reached after the profile is loaded
 
-        am_db.create_morph_table()
         am_config = AnkiMorphsConfig()
-        learning_interval: int = 1  # seen morphs
-
-        if am_config.recalc_toolbar_stats_use_known is True:
-            learning_interval = am_config.recalc_interval_for_known
 
         try:
-            all_unique_morphs = am_db.con.execute(
-                """
-                SELECT COUNT(DISTINCT lemma)
-                FROM Morphs
-                WHERE highest_learning_interval >= ?
-                """,
-                (learning_interval,),
-            ).fetchone()[0]
-
-            all_morphs = am_db.con.execute(
-                """
-                SELECT COUNT(*)
-                FROM Morphs
-                WHERE highest_learning_interval >= ?
-                """,
-                (learning_interval,),
-            ).fetchone()[0]
-            am_db.con.close()
+            # the stats are stored at the end of recalc, so we usually only have to read them
+            latest_stats = am_db.get_latest_stats()
+
+            if (
+                latest_stats is None
+                or latest_stats[0] != am_config.recalc_interval_for_known
+            ):
+                # There are no stats yet (e.g. right after upgrading), or the known
+                # interval setting was changed after the last recalc. The counts
+                # can still be derived from the existing 'Morphs'-table, but they
+                # are only stored by the next recalc.
+                latest_stats = am_db.get_stats(am_config.recalc_interval_for_known)
         except sqlite3.OperationalError:
             # database schema has changed
+            am_db.con.close()
             return
 
-        self.unique_morphs = f"U: {all_unique_morphs}"
-        self.all_morphs = f"A: {all_morphs}"
+        am_db.con.close()
+
+        _, unique_seen, all_seen, unique_known, all_known = latest_stats
+
+        if am_config.recalc_toolbar_stats_use_known is True:
+            self.unique_morphs = f"U: {unique_known}"
+            self.all_morphs = f"A: {all_known}"
+        else:
+            self.unique_morphs = f"U: {unique_seen}"
+            self.all_morphs = f"A: {all_seen}"
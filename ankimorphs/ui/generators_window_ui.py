@@ -52,6 +52,9 @@ class Ui_GeneratorsWindow(object):
         self.vttFilesCheckBox = QtWidgets.QCheckBox(parent=self.centralwidget)
         self.vttFilesCheckBox.setObjectName("vttFilesCheckBox")
         self.horizontalLayout.addWidget(self.vttFilesCheckBox)
+        self.assFilesCheckBox = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.assFilesCheckBox.setObjectName("assFilesCheckBox")
+        self.horizontalLayout.addWidget(self.assFilesCheckBox)
         self.mdFilesCheckBox = QtWidgets.QCheckBox(parent=self.centralwidget)
         self.mdFilesCheckBox.setObjectName("mdFilesCheckBox")
         self.horizontalLayout.addWidget(self.mdFilesCheckBox)
@@ -122,6 +125,12 @@ class Ui_GeneratorsWindow(object):
         self.generateStudyPlanPushButton = QtWidgets.QPushButton(parent=self.centralwidget)
         self.generateStudyPlanPushButton.setObjectName("generateStudyPlanPushButton")
         self.horizontalLayout_7.addWidget(self.generateStudyPlanPushButton)
+        self.generateSentencesPushButton = QtWidgets.QPushButton(parent=self.centralwidget)
+        self.generateSentencesPushButton.setObjectName("generateSentencesPushButton")
+        self.horizontalLayout_7.addWidget(self.generateSentencesPushButton)
+        self.generateComprehensionCurvePushButton = QtWidgets.QPushButton(parent=self.centralwidget)
+        self.generateComprehensionCurvePushButton.setObjectName("generateComprehensionCurvePushButton")
+        self.horizontalLayout_7.addWidget(self.generateComprehensionCurvePushButton)
         spacerItem3 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
         self.horizontalLayout_7.addItem(spacerItem3)
         self.verticalLayout_3.addLayout(self.horizontalLayout_7)
@@ -132,57 +141,17 @@ class Ui_GeneratorsWindow(object):
         self.tab.setObjectName("tab")
         self.verticalLayout_6 = QtWidgets.QVBoxLayout(self.tab)
         self.verticalLayout_6.setObjectName("verticalLayout_6")
-        self.numericalTableWidget = QtWidgets.QTableWidget(parent=self.tab)
-        self.numericalTableWidget.setObjectName("numericalTableWidget")
-        self.numericalTableWidget.setColumnCount(9)
-        self.numericalTableWidget.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(5, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(6, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(7, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.numericalTableWidget.setHorizontalHeaderItem(8, item)
-        self.verticalLayout_6.addWidget(self.numericalTableWidget)
+        self.numericalTableView = QtWidgets.QTableView(parent=self.tab)
+        self.numericalTableView.setObjectName("numericalTableView")
+        self.verticalLayout_6.addWidget(self.numericalTableView)
         self.tablesTabWidget.addTab(self.tab, "")
         self.tab_2 = QtWidgets.QWidget()
         self.tab_2.setObjectName("tab_2")
         self.verticalLayout_7 = QtWidgets.QVBoxLayout(self.tab_2)
         self.verticalLayout_7.setObjectName("verticalLayout_7")
-        self.percentTableWidget = QtWidgets.QTableWidget(parent=self.tab_2)
-        self.percentTableWidget.setObjectName("percentTableWidget")
-        self.percentTableWidget.setColumnCount(9)
-        self.percentTableWidget.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(5, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(6, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(7, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.percentTableWidget.setHorizontalHeaderItem(8, item)
-        self.verticalLayout_7.addWidget(self.percentTableWidget)
+        self.percentTableView = QtWidgets.QTableView(parent=self.tab_2)
+        self.percentTableView.setObjectName("percentTableView")
+        self.verticalLayout_7.addWidget(self.percentTableView)
         self.tablesTabWidget.addTab(self.tab_2, "")
         self.verticalLayout_4.addWidget(self.tablesTabWidget)
         self.verticalLayout_5.addLayout(self.verticalLayout_4)
@@ -201,6 +170,7 @@ class Ui_GeneratorsWindow(object):
         self.txtFilesCheckBox.setText(_translate("GeneratorsWindow", ".txt"))
         self.srtFilesCheckBox.setText(_translate("GeneratorsWindow", ".srt"))
         self.vttFilesCheckBox.setText(_translate("GeneratorsWindow", ".vtt"))
+        self.assFilesCheckBox.setText(_translate("GeneratorsWindow", ".ass/.ssa"))
         self.mdFilesCheckBox.setText(_translate("GeneratorsWindow", ".md"))
         self.loadFilesPushButton.setText(_translate("GeneratorsWindow", "Load\n"
 "Files"))
@@ -214,57 +184,7 @@ class Ui_GeneratorsWindow(object):
         self.generateReportPushButton.setText(_translate("GeneratorsWindow", "Generate Readability Report"))
         self.generateFrequencyFilePushButton.setText(_translate("GeneratorsWindow", "Generate Frequency File"))
         self.generateStudyPlanPushButton.setText(_translate("GeneratorsWindow", "Generate Study Plan"))
-        item = self.numericalTableWidget.horizontalHeaderItem(0)
-        item.setText(_translate("GeneratorsWindow", "File"))
-        item = self.numericalTableWidget.horizontalHeaderItem(1)
-        item.setText(_translate("GeneratorsWindow", "Unique\n"
-"Morphs"))
-        item = self.numericalTableWidget.horizontalHeaderItem(2)
-        item.setText(_translate("GeneratorsWindow", "Unique \n"
-"Known"))
-        item = self.numericalTableWidget.horizontalHeaderItem(3)
-        item.setText(_translate("GeneratorsWindow", "Unique\n"
-"Learning"))
-        item = self.numericalTableWidget.horizontalHeaderItem(4)
-        item.setText(_translate("GeneratorsWindow", "Unique\n"
-"Unknown"))
-        item = self.numericalTableWidget.horizontalHeaderItem(5)
-        item.setText(_translate("GeneratorsWindow", "Total\n"
-"Morphs"))
-        item = self.numericalTableWidget.horizontalHeaderItem(6)
-        item.setText(_translate("GeneratorsWindow", "Total\n"
-"Known"))
-        item = self.numericalTableWidget.horizontalHeaderItem(7)
-        item.setText(_translate("GeneratorsWindow", "Total\n"
-"Learning"))
-        item = self.numericalTableWidget.horizontalHeaderItem(8)
-        item.setText(_translate("GeneratorsWindow", "Total\n"
-"Unknown"))
+        self.generateSentencesPushButton.setText(_translate("GeneratorsWindow", "Generate i+1 Sentences"))
+        self.generateComprehensionCurvePushButton.setText(_translate("GeneratorsWindow", "Generate Comprehension Curve"))
         self.tablesTabWidget.setTabText(self.tablesTabWidget.indexOf(self.tab), _translate("GeneratorsWindow", "Numerical"))
-        item = self.percentTableWidget.horizontalHeaderItem(0)
-        item.setText(_translate("GeneratorsWindow", "File"))
-        item = self.percentTableWidget.horizontalHeaderItem(1)
-        item.setText(_translate("GeneratorsWindow", "Unique\n"
-"Morphs"))
-        item = self.percentTableWidget.horizontalHeaderItem(2)
-        item.setText(_translate("GeneratorsWindow", "Unique \n"
-"Known"))
-        item = self.percentTableWidget.horizontalHeaderItem(3)
-        item.setText(_translate("GeneratorsWindow", "Unique\n"
-"Learning"))
-        item = self.percentTableWidget.horizontalHeaderItem(4)
-        item.setText(_translate("GeneratorsWindow", "Unique\n"
-"Unknown"))
-        item = self.percentTableWidget.horizontalHeaderItem(5)
-        item.setText(_translate("GeneratorsWindow", "Total\n"
-"Morphs"))
-        item = self.percentTableWidget.horizontalHeaderItem(6)
-        item.setText(_translate("GeneratorsWindow", "Total\n"
-"Known"))
-        item = self.percentTableWidget.horizontalHeaderItem(7)
-        item.setText(_translate("GeneratorsWindow", "Total\n"
-"Learning"))
-        item = self.percentTableWidget.horizontalHeaderItem(8)
-        item.setText(_translate("GeneratorsWindow", "Total\n"
-"Unknown"))
         self.tablesTabWidget.setTabText(self.tablesTabWidget.indexOf(self.tab_2), _translate("GeneratorsWindow", "Percentage"))
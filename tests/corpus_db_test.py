@@ -0,0 +1,100 @@
+from unittest import mock
+
+import pytest
+
+from ankimorphs import corpus_db
+from ankimorphs.corpus_db import CorpusDB, CorpusFileIndexer
+from ankimorphs.morpheme import Morpheme, MorphOccurrence
+
+MORPHEMIZER = "AnkiMorphs: Language w/ Spaces"
+OTHER_MORPHEMIZER = "spaCy: en_core_web_sm"
+
+
+@pytest.fixture(name="corpus")
+def corpus_fixture(tmp_path):
+    mock_mw = mock.Mock()
+    mock_mw.pm.profileFolder.return_value = str(tmp_path)
+
+    with mock.patch.object(corpus_db, "mw", mock_mw):
+        _corpus_db = CorpusDB()
+        _corpus_db.create_all_tables()
+        try:
+            yield _corpus_db
+        finally:
+            _corpus_db.con.close()
+
+
+def _index_file(
+    path: str, lines: list[str], morphemizer_description: str = MORPHEMIZER
+) -> None:
+    lines_morphs = [
+        [Morpheme(lemma=word, inflection=word) for word in line.split()]
+        for line in lines
+    ]
+    morph_occurrences: dict[str, MorphOccurrence] = {}
+    for line_morphs in lines_morphs:
+        for morph in line_morphs:
+            key = morph.lemma + morph.inflection
+            if key in morph_occurrences:
+                morph_occurrences[key].occurrence += 1
+            else:
+                morph_occurrences[key] = MorphOccurrence(morph)
+
+    corpus_file_indexer = CorpusFileIndexer(path, morphemizer_description, "")
+    try:
+        # the lines are added in batches, just like the generators do
+        corpus_file_indexer.add_lines(lines[:1], lines_morphs[:1])
+        corpus_file_indexer.add_lines(lines[1:], lines_morphs[1:])
+        corpus_file_indexer.finish(
+            size=1, modified_time=1, morph_occurrences=morph_occurrences
+        )
+    finally:
+        corpus_file_indexer.close()
+
+
+def _get_document_frequencies(
+    corpus: CorpusDB, morphemizer_description: str
+) -> list[tuple[str, int]]:
+    return corpus.con.execute(
+        """
+            SELECT lemma, document_frequency
+            FROM Corpus_Morphs
+            WHERE morphemizer = ?
+            ORDER BY lemma
+            """,
+        (morphemizer_description,),
+    ).fetchall()
+
+
+def test_corpus_index(corpus):
+    _index_file("a.txt", ["the cat", "", "the dog the end"])
+    _index_file("b.txt", ["a cat"])
+
+    assert corpus.has_file("a.txt", MORPHEMIZER, "", 1, 1)
+    assert not corpus.has_file("a.txt", MORPHEMIZER, "", 2, 1)
+
+    file_id = corpus.get_indexed_files(MORPHEMIZER, "")["a.txt"][0]
+    assert sorted(corpus.get_file_morphs(file_id))[0][1:] == ("the", "the", 3)
+
+    # the empty line is not stored, but the line numbers are kept
+    assert corpus.con.execute(
+        "SELECT line_number, text FROM Corpus_Lines ORDER BY file_id, line_number"
+    ).fetchall() == [(0, "the cat"), (2, "the dog the end"), (0, "a cat")]
+
+    # re-indexing a file replaces the old index
+    _index_file("b.txt", ["a dog"])
+    assert _get_document_frequencies(corpus, MORPHEMIZER) == [
+        ("a", 1),
+        ("cat", 1),
+        ("dog", 2),
+        ("end", 1),
+        ("the", 1),
+    ]
+
+    # the morphs of another morphemizer are counted separately
+    _index_file("b.txt", ["a dog"], OTHER_MORPHEMIZER)
+    assert _get_document_frequencies(corpus, OTHER_MORPHEMIZER) == [
+        ("a", 1),
+        ("dog", 1),
+    ]
+    assert _get_document_frequencies(corpus, MORPHEMIZER)[2] == ("dog", 2)
@@ -23,9 +23,11 @@ from ankimorphs import (
     ankimorphs_config,
     ankimorphs_db,
     ankimorphs_globals,
+    corpus_db,
     generators_window,
     name_file_utils,
     recalc,
+    recalc_context,
     reviewing_utils,
     spacy_wrapper,
 )
@@ -202,12 +204,14 @@ def fake_environment(  # pylint:disable=too-many-locals, too-many-statements
     mock_tooltip = mock.Mock(spec=aqt.utils.tooltip)
 
     patch_recalc_mw = mock.patch.object(recalc, "mw", mock_mw)
+    patch_recalc_context_mw = mock.patch.object(recalc_context, "mw", mock_mw)
     patch_am_db_mw = mock.patch.object(ankimorphs_db, "mw", mock_mw)
     patch_config_mw = mock.patch.object(ankimorphs_config, "mw", mock_mw)
     patch_name_file_utils_mw = mock.patch.object(name_file_utils, "mw", mock_mw)
     patch_anki_data_utils_mw = mock.patch.object(anki_data_utils, "mw", mock_mw)
     patch_reviewing_mw = mock.patch.object(reviewing_utils, "mw", mock_mw)
     patch_gd_mw = mock.patch.object(generators_window, "mw", mock_mw)
+    patch_corpus_db_mw = mock.patch.object(corpus_db, "mw", mock_mw)
 
     patch_am_db = mock.patch.object(reviewing_utils, "AnkiMorphsDB", MockDB)
     patch_tooltip = mock.patch.object(reviewing_utils, "tooltip", mock_tooltip)
@@ -217,12 +221,14 @@ def fake_environment(  # pylint:disable=too-many-locals, too-many-statements
     )
 
     patch_recalc_mw.start()
+    patch_recalc_context_mw.start()
     patch_am_db_mw.start()
     patch_config_mw.start()
     patch_name_file_utils_mw.start()
     patch_anki_data_utils_mw.start()
     patch_reviewing_mw.start()
     patch_gd_mw.start()
+    patch_corpus_db_mw.start()
 
     patch_am_db.start()
     patch_tooltip.start()
@@ -241,12 +247,14 @@ def fake_environment(  # pylint:disable=too-many-locals, too-many-statements
         mock_mw.col.close()
 
         patch_recalc_mw.stop()
+        patch_recalc_context_mw.stop()
         patch_am_db_mw.stop()
         patch_config_mw.stop()
         patch_name_file_utils_mw.stop()
         patch_anki_data_utils_mw.stop()
         patch_reviewing_mw.stop()
         patch_gd_mw.stop()
+        patch_corpus_db_mw.stop()
 
         patch_am_db.stop()
         patch_tooltip.stop()
@@ -256,5 +264,8 @@ def fake_environment(  # pylint:disable=too-many-locals, too-many-statements
 
         Path.unlink(test_db_copy_path, missing_ok=True)
         Path.unlink(collection_path_duplicate, missing_ok=True)
+        # the corpus index is created by the generators
+        for corpus_db_file_name in ["corpus.db", "corpus.db-wal", "corpus.db-shm"]:
+            Path.unlink(Path(TESTS_DATA_PATH, corpus_db_file_name), missing_ok=True)
         shutil.rmtree(collection_path_original_media, ignore_errors=True)
         shutil.rmtree(collection_path_duplicate_media, ignore_errors=True)
@@ -0,0 +1,105 @@
+import json
+from unittest import mock
+
+import pytest
+
+from ankimorphs import ankimorphs_config, ankimorphs_globals, extra_field_utils
+from ankimorphs.ankimorphs_config import AnkiMorphsConfig
+from ankimorphs.ankimorphs_db import AnkiMorphsDB
+from ankimorphs.morpheme import Morpheme
+
+
+@pytest.fixture(name="am_config")
+def am_config_fixture():
+    with open(ankimorphs_config._DEFAULT_CONFIGS_PATH, encoding="utf-8") as file:
+        configs = json.load(file)
+
+    with mock.patch.object(ankimorphs_config, "_configs_from_file", configs):
+        yield AnkiMorphsConfig()
+
+
+def test_highlighted_field_is_only_updated_when_changed(am_config):
+    config_filter = mock.Mock(field="Expression")
+    note_type_field_name_dict = {
+        "Expression": (0, {}),
+        ankimorphs_globals.EXTRA_FIELD_HIGHLIGHTED: (1, {}),
+    }
+    card_id = 1
+    card_morph_map_cache = {
+        card_id: [
+            Morpheme(lemma="Haus", inflection="haus", highest_learning_interval=0),
+        ]
+    }
+    note = mock.Mock(id=10, fields=["Das Haus", ""])
+    highlight_fingerprints: dict[int, str] = {}
+
+    def update_highlighted_field() -> None:
+        extra_field_utils.update_highlighted_field(
+            am_config,
+            config_filter,
+            note_type_field_name_dict,
+            card_morph_map_cache,
+            card_id,
+            note,
+            highlight_fingerprints,
+        )
+
+    with mock.patch.object(
+        extra_field_utils.text_highlighting,
+        "get_highlighted_text",
+        wraps=extra_field_utils.text_highlighting.get_highlighted_text,
+    ) as get_highlighted_text:
+        update_highlighted_field()
+        assert get_highlighted_text.call_count == 1
+        assert note.id in highlight_fingerprints
+        highlighted_text = note.fields[1]
+
+        # nothing changed, so the note is skipped
+        update_highlighted_field()
+        assert get_highlighted_text.call_count == 1
+        assert note.fields[1] == highlighted_text
+
+        # the morph status changed
+        card_morph_map_cache[card_id][0].highest_learning_interval = 30
+        update_highlighted_field()
+        assert get_highlighted_text.call_count == 2
+        assert note.fields[1] != highlighted_text
+
+        # the highlighted field was edited by the user
+        note.fields[1] = "Das Haus"
+        update_highlighted_field()
+        assert get_highlighted_text.call_count == 3
+
+        # the config changed
+        am_config.recalc_interval_for_known = 60
+        update_highlighted_field()
+        assert get_highlighted_text.call_count == 4
+
+
+def test_stale_highlight_fingerprints_are_deleted(tmp_path):
+    am_db = AnkiMorphsDB(str(tmp_path / "ankimorphs.db"))
+    try:
+        am_db.create_all_tables()
+        am_db.insert_many_into_card_table(
+            [
+                {
+                    "card_id": 1,
+                    "note_id": 10,
+                    "note_type_id": 1,
+                    "card_type": 0,
+                    "fields": "",
+                    "tags": "",
+                }
+            ]
+        )
+        am_db.insert_many_into_highlight_fingerprint_table(
+            [
+                {"note_id": 10, "fingerprint": "a"},
+                {"note_id": 20, "fingerprint": "b"},  # the note has been deleted
+            ]
+        )
+
+        am_db.delete_stale_highlight_fingerprints()
+        assert am_db.get_highlight_fingerprints() == {10: "a"}
+    finally:
+        am_db.con.close()
@@ -0,0 +1,39 @@
+import builtins
+from unittest import mock
+
+import pytest
+
+from ankimorphs.generators_comprehension_curve import (
+    get_comprehension_curve,
+    get_morphs_needed,
+)
+
+_original_import = builtins.__import__
+
+
+def _import_without_numpy(name, *args, **kwargs):
+    if name == "numpy":
+        raise ModuleNotFoundError(name)
+    return _original_import(name, *args, **kwargs)
+
+
+@pytest.mark.parametrize("numpy_installed", [True, False])
+def test_comprehension_curve(numpy_installed):
+    with mock.patch.object(
+        builtins,
+        "__import__",
+        _original_import if numpy_installed else _import_without_numpy,
+    ):
+        # 50 known occurrences and 50 unknown occurrences spread over 4 morphs
+        curve = get_comprehension_curve(50, [20, 15, 10, 5])
+
+    assert curve == pytest.approx([50.0, 70.0, 85.0, 95.0, 100.0])
+
+    assert get_morphs_needed(curve, 50) == 0
+    assert get_morphs_needed(curve, 90) == 3
+    assert get_morphs_needed(curve, 95) == 3
+    assert get_morphs_needed(curve, 100.1) is None
+
+
+def test_empty_comprehension_curve():
+    assert get_comprehension_curve(0, []) == [0.0]
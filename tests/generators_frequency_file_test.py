@@ -0,0 +1,50 @@
+import pytest
+
+from ankimorphs.generators_frequency_file import MorphOccurrencesMerger
+from ankimorphs.morpheme import Morpheme, MorphOccurrence
+
+
+def _get_morph_occurrences(words: str) -> dict[str, MorphOccurrence]:
+    morph_occurrences: dict[str, MorphOccurrence] = {}
+    for word in words.split():
+        morph = Morpheme(lemma=word, inflection=word)
+        key = morph.lemma + morph.inflection
+        if key in morph_occurrences:
+            morph_occurrences[key].occurrence += 1
+        else:
+            morph_occurrences[key] = MorphOccurrence(morph)
+    return morph_occurrences
+
+
+@pytest.mark.parametrize(
+    "max_morphs_in_memory",
+    [1000, 2, 1],  # 2 and 1 spill the morphs to disk
+)
+def test_morph_occurrences_merger(max_morphs_in_memory):
+    files_morph_occurrences = [
+        _get_morph_occurrences("c a a b"),
+        _get_morph_occurrences("d b e"),
+        _get_morph_occurrences("e e f c"),
+    ]
+
+    with MorphOccurrencesMerger(max_morphs_in_memory) as merger:
+        # the files can be added in any order, the ties are still
+        # sorted by where the morphs were first found
+        for file_index in [2, 0, 1]:
+            merger.add(file_index, files_morph_occurrences[file_index])
+
+        sorted_morphs = [
+            (morph_occurrence.morph.lemma, morph_occurrence.occurrence)
+            for morph_occurrence in merger.get_sorted_morph_occurrences()
+        ]
+
+        assert merger.total_occurrences == 11
+
+    assert sorted_morphs == [
+        ("e", 3),
+        ("c", 2),
+        ("a", 2),
+        ("b", 2),
+        ("d", 1),
+        ("f", 1),
+    ]
@@ -0,0 +1,63 @@
+import gzip
+import tarfile
+import zipfile
+from pathlib import Path
+
+from ankimorphs import generators_input_files
+
+EXTENSIONS = (".txt", ".srt")
+
+
+def _read_input_file(input_file: Path) -> str:
+    with generators_input_files.open_input_file(input_file) as file:
+        return file.read()
+
+
+def test_compressed_and_archive_input_files(tmp_path):
+    plain_file = Path(tmp_path, "book.txt")
+    plain_file.write_text("plain", encoding="utf-8")
+
+    compressed_file = Path(tmp_path, "episode_1.srt.gz")
+    with gzip.open(compressed_file, "wt", encoding="utf-8") as file:
+        file.write("compressed")
+
+    zip_path = Path(tmp_path, "season-1.zip")
+    with zipfile.ZipFile(zip_path, "w") as zip_file:
+        zip_file.writestr("episodes/episode_2.srt", "zip member")
+        zip_file.writestr("cover.jpg", "not an input file")
+
+    tar_path = Path(tmp_path, "season-2.tar.gz")
+    tar_member = Path(tmp_path, "episode_3.txt")
+    tar_member.write_text("tar member", encoding="utf-8")
+    with tarfile.open(tar_path, "w:gz") as tar_file:
+        tar_file.add(tar_member, arcname="./episode_3.txt")
+    tar_member.unlink()
+
+    input_files: list[Path] = []
+    for file_path in sorted(tmp_path.iterdir()):
+        input_files += generators_input_files.get_input_files(file_path, EXTENSIONS)
+
+    assert input_files == [
+        plain_file,
+        compressed_file,
+        Path(zip_path, "episodes", "episode_2.srt"),
+        Path(tar_path, "episode_3.txt"),
+    ]
+
+    assert [_read_input_file(input_file) for input_file in input_files] == [
+        "plain",
+        "compressed",
+        "zip member",
+        "tar member",
+    ]
+
+    assert [
+        generators_input_files.get_file_extension(input_file)
+        for input_file in input_files
+    ] == [".txt", ".srt", ".srt", ".txt"]
+
+    # the archive members use the stat of the archive for the generators cache
+    assert (
+        generators_input_files.get_input_file_stat(input_files[2]).st_size
+        == zip_path.stat().st_size
+    )
@@ -0,0 +1,137 @@
+from pathlib import Path
+from unittest import mock
+
+from ankimorphs import generators_text_processing
+from ankimorphs.generators_processing import GeneratorsProcessor, gather_input_files
+from ankimorphs.generators_text_processing import PreprocessOptions
+from ankimorphs.morpheme import MorphOccurrence
+from ankimorphs.morphemizer import SpaceMorphemizer
+
+INPUT_FILES: dict[str, str] = {
+    "book.txt": "The cat sat on the mat.\nThe cat sat on the mat.\nA dog [barks]\n",
+    "episodes/episode_1.txt": "The dog ate the cat\n" * 3 + "[music] a bird sings\n",
+    "episodes/episode_2.txt": "Birds sing, dogs bark\n\nand cats sleep\n",
+}
+
+
+def _write_input_files(input_dir: Path) -> list[Path]:
+    for file_name, text in INPUT_FILES.items():
+        input_file = Path(input_dir, file_name)
+        input_file.parent.mkdir(parents=True, exist_ok=True)
+        input_file.write_text(text, encoding="utf-8")
+
+    return gather_input_files(input_dir, (".txt",))
+
+
+def _get_processor(
+    input_dir: Path, profile_folder: str | None = None, max_workers: int | None = None
+) -> GeneratorsProcessor:
+    return GeneratorsProcessor(
+        input_dir_root=input_dir,
+        _morphemizer=SpaceMorphemizer(),
+        nlp=None,
+        preprocess_options=PreprocessOptions(filter_square_brackets=True),
+        profile_folder=profile_folder,
+        morphemizer_cache_size_mb=10,
+        max_workers=max_workers,
+    )
+
+
+def _get_occurrences(
+    morph_occurrences_by_file: dict[Path, dict[str, MorphOccurrence]],
+) -> dict[Path, list[tuple[str, int]]]:
+    # lists, since the order of the morphs decides the ties in the outputs
+    return {
+        input_file: [
+            (key, morph_occurrence.occurrence)
+            for key, morph_occurrence in morph_occurrences.items()
+        ]
+        for input_file, morph_occurrences in morph_occurrences_by_file.items()
+    }
+
+
+def test_parallel_processing(tmp_path):
+    input_dir = Path(tmp_path, "input")
+    input_files = _write_input_files(input_dir)
+
+    processor = _get_processor(input_dir, max_workers=4)
+    # the space morphemizer would only compete for the GIL
+    assert processor._max_workers == 1
+    sequential_occurrences = _get_occurrences(
+        processor.get_morph_occurrences_by_file(input_files)
+    )
+
+    with mock.patch.object(SpaceMorphemizer, "runs_in_subprocess", True):
+        parallel_processor = _get_processor(input_dir, max_workers=4)
+        assert parallel_processor._max_workers == 4
+        parallel_occurrences = _get_occurrences(
+            parallel_processor.get_morph_occurrences_by_file(input_files)
+        )
+
+    assert parallel_occurrences == sequential_occurrences
+    assert list(parallel_occurrences) == input_files
+
+
+def test_generators_cache(tmp_path):
+    input_dir = Path(tmp_path, "input")
+    input_files = _write_input_files(input_dir)
+    profile_folder = str(tmp_path)
+
+    morph_occurrences = _get_occurrences(
+        _get_processor(input_dir, profile_folder).get_morph_occurrences_by_file(
+            input_files
+        )
+    )
+
+    with mock.patch.object(
+        SpaceMorphemizer, "get_morphemes_from_expr_batch"
+    ) as get_morphemes_from_expr_batch:
+        # every file is cached, so nothing has to be morphemized
+        cached_morph_occurrences = _get_occurrences(
+            _get_processor(input_dir, profile_folder).get_morph_occurrences_by_file(
+                input_files
+            )
+        )
+        assert get_morphemes_from_expr_batch.call_count == 0
+
+    assert cached_morph_occurrences == morph_occurrences
+
+    # only the modified file is morphemized again
+    modified_file = Path(input_dir, "book.txt")
+    modified_file.write_text("A new book\n", encoding="utf-8")
+
+    with mock.patch.object(
+        SpaceMorphemizer,
+        "get_morphemes_from_expr_batch",
+        autospec=True,
+        side_effect=SpaceMorphemizer.get_morphemes_from_expr_batch,
+    ) as get_morphemes_from_expr_batch:
+        modified_morph_occurrences = _get_occurrences(
+            _get_processor(input_dir, profile_folder).get_morph_occurrences_by_file(
+                input_files
+            )
+        )
+        assert get_morphemes_from_expr_batch.call_count == 1
+
+    assert modified_morph_occurrences[modified_file] == [
+        ("aa", 1),
+        ("newnew", 1),
+        ("bookbook", 1),
+    ]
+    del modified_morph_occurrences[modified_file]
+    del morph_occurrences[modified_file]
+    assert modified_morph_occurrences == morph_occurrences
+
+    # a new cache version invalidates all the cached files, e.g. after the parsing changed
+    with mock.patch.object(
+        generators_text_processing, "GENERATORS_CACHE_VERSION", 2
+    ), mock.patch.object(
+        SpaceMorphemizer,
+        "get_morphemes_from_expr_batch",
+        autospec=True,
+        side_effect=SpaceMorphemizer.get_morphemes_from_expr_batch,
+    ) as get_morphemes_from_expr_batch:
+        _get_processor(input_dir, profile_folder).get_morph_occurrences_by_file(
+            input_files
+        )
+        assert get_morphemes_from_expr_batch.call_count == len(input_files)
@@ -0,0 +1,99 @@
+from aqt.qt import Qt  # pylint:disable=no-name-in-module
+
+from ankimorphs.generators_report_model import (
+    FILE_NAME_COLUMN,
+    TOTAL_ROW_FILE_NAME,
+    UNIQUE_KNOWN_COLUMN,
+    UNIQUE_MORPHS_COLUMN,
+    ReadabilityReportModel,
+    ReadabilityReportProxyModel,
+)
+
+
+def _get_column(
+    proxy_model: ReadabilityReportProxyModel, column: int
+) -> list[str | None]:
+    return [
+        proxy_model.data(proxy_model.index(row, column))
+        for row in range(proxy_model.rowCount())
+    ]
+
+
+def test_readability_report_model(qtbot):  # pylint:disable=unused-argument
+    model = ReadabilityReportModel()
+    numerical_model = ReadabilityReportProxyModel(model, show_percentages=False)
+    percentage_model = ReadabilityReportProxyModel(model, show_percentages=True)
+
+    model.start_report(["a.txt", "b.txt", "c.txt"])
+    assert _get_column(numerical_model, FILE_NAME_COLUMN) == [
+        "a.txt",
+        "b.txt",
+        "c.txt",
+        TOTAL_ROW_FILE_NAME,
+    ]
+    # the files have not been processed yet
+    assert _get_column(numerical_model, UNIQUE_MORPHS_COLUMN) == [None] * 4
+
+    # the rows are filled in as the files finish, in any order
+    model.update_rows([(2, (9, 3, 3, 3, 18, 6, 6, 6))])
+    model.update_rows(
+        [
+            (0, (10, 5, 0, 5, 20, 10, 0, 10)),
+            (1, (4, 1, 1, 2, 8, 2, 2, 4)),
+            (3, (23, 9, 4, 10, 46, 18, 8, 20)),
+        ]
+    )
+
+    assert _get_column(numerical_model, UNIQUE_KNOWN_COLUMN) == ["5", "1", "3", "9"]
+    assert _get_column(percentage_model, UNIQUE_KNOWN_COLUMN) == [
+        "50.0 %",
+        "25.0 %",
+        "33.3 %",
+        "39.1 %",
+    ]
+    assert model.data(model.index(0, UNIQUE_KNOWN_COLUMN)) == "5"
+    assert (
+        model.data(
+            model.index(0, UNIQUE_KNOWN_COLUMN), Qt.ItemDataRole.TextAlignmentRole
+        )
+        == Qt.AlignmentFlag.AlignCenter
+    )
+
+    # the numbers are sorted by their values, not as text ("10" < "4")
+    numerical_model.sort(UNIQUE_MORPHS_COLUMN, Qt.SortOrder.AscendingOrder)
+    assert _get_column(numerical_model, UNIQUE_MORPHS_COLUMN) == ["4", "9", "10", "23"]
+    assert numerical_model.get_source_row(0) == 1
+
+    # the percentages are sorted by the percentages, not by the numbers
+    percentage_model.sort(UNIQUE_KNOWN_COLUMN, Qt.SortOrder.DescendingOrder)
+    assert _get_column(percentage_model, FILE_NAME_COLUMN) == [
+        "a.txt",
+        TOTAL_ROW_FILE_NAME,
+        "c.txt",
+        "b.txt",
+    ]
+
+
+def test_readability_report_streamed_rows(qtbot):
+    model = ReadabilityReportModel()
+    numerical_model = ReadabilityReportProxyModel(model, show_percentages=False)
+    model.start_report(["a.txt", "b.txt", "c.txt"])
+    numerical_model.sort(UNIQUE_MORPHS_COLUMN, Qt.SortOrder.DescendingOrder)
+
+    # the rows are updated in place, so the views keep their
+    # sorting and selection instead of being reset
+    with qtbot.assertNotEmitted(model.modelReset):
+        with qtbot.waitSignal(model.dataChanged):
+            model.update_rows([(1, (4, 1, 1, 2, 8, 2, 2, 4))])
+        assert _get_column(numerical_model, FILE_NAME_COLUMN)[0] == "b.txt"
+
+        with qtbot.waitSignal(model.dataChanged):
+            model.update_rows([(2, (9, 3, 3, 3, 18, 6, 6, 6))])
+        assert _get_column(numerical_model, FILE_NAME_COLUMN)[:2] == [
+            "c.txt",
+            "b.txt",
+        ]
+
+    # e.g. after a cancellation, the rows that were not processed stay empty
+    assert model.get_number(0, UNIQUE_MORPHS_COLUMN) is None
+    assert _get_column(numerical_model, UNIQUE_MORPHS_COLUMN) == ["9", "4", None, None]
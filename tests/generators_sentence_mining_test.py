@@ -0,0 +1,61 @@
+from ankimorphs.generators_sentence_mining import (
+    UnknownMorphsLineIndex,
+    get_lines_by_unknown_morphs,
+)
+
+# morph ids
+THE, CAT, DOG, SAT, RAN = range(5)
+
+# the more frequent morphs have a lower priority number
+MORPH_PRIORITIES = {THE: 0, CAT: 1, SAT: 2, DOG: 3, RAN: 4}
+
+
+def _get_line_index() -> UnknownMorphsLineIndex:
+    line_index = UnknownMorphsLineIndex()
+    line_index.add_line((1, 0), [THE, CAT])
+    line_index.add_line((1, 1), [THE, DOG, RAN])
+    line_index.add_line((1, 2), [THE, CAT, SAT, THE])
+    line_index.add_line((2, 0), [THE, DOG])
+    line_index.add_line((2, 1), [CAT, SAT])
+    return line_index
+
+
+def test_sentences_with_one_unknown():
+    line_index = _get_line_index()
+    line_index.set_known_morphs({THE})
+
+    assert get_lines_by_unknown_morphs(line_index, 1, MORPH_PRIORITIES) == {
+        (CAT,): [0],
+        (DOG,): [3],
+    }
+    # the most frequent unknown morphs first
+    assert list(
+        get_lines_by_unknown_morphs(line_index, 2, MORPH_PRIORITIES).items()
+    ) == [
+        ((CAT, SAT), [2, 4]),
+        ((DOG, RAN), [1]),
+    ]
+
+
+def test_learning_statuses_are_updated():
+    line_index = _get_line_index()
+    line_index.set_known_morphs({THE})
+
+    # learning a morph turns the i+2 sentences into i+1 sentences
+    line_index.set_known_morphs({THE, CAT})
+    assert get_lines_by_unknown_morphs(line_index, 1, MORPH_PRIORITIES) == {
+        (SAT,): [2, 4],
+        (DOG,): [3],
+    }
+    assert line_index.get_lines_with_unknowns(0) == [0]
+
+    # morphs can also become unknown again, e.g. after a card has been reset
+    line_index.set_known_morphs({CAT})
+    assert get_lines_by_unknown_morphs(line_index, 1, MORPH_PRIORITIES) == {
+        (THE,): [0],
+        (SAT,): [4],
+    }
+    assert get_lines_by_unknown_morphs(line_index, 2, MORPH_PRIORITIES) == {
+        (THE, SAT): [2],
+        (THE, DOG): [3],
+    }
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from ankimorphs import generators_subtitle_parsing
+
+SRT_FILE = """1
+00:00:12,727 --> 00:00:17,815
+<i>泣き声）</i>
+
+2
+00:00:18,566 --> 00:00:20,276
+{\\an8}またか…
+2
+
+"""
+
+VTT_FILE = """WEBVTT
+Kind: captions
+
+NOTE this is a comment --
+that spans two lines
+
+STYLE
+::cue { color: yellow }
+
+intro
+00:01.000 --> 00:04.000 align:left
+<v Asta>おお…　<c.yellow>よしよし</c>
+<ruby>時間<rt>じかん</rt></ruby> &amp; 場所
+"""
+
+ASS_FILE = """[Script Info]
+Title: Dialogue: not an event
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize
+Style: Default,Arial,20
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Comment: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,not shown
+Dialogue: 0,0:00:12.72,0:00:17.81,Default,Asta,0,0,0,,{\\i1}まだだ…{\\i0}\\Nまだ, まだ
+Dialogue: 0,0:00:18.56,0:00:20.27,Default,,0,0,0,,俺は\\h魔法帝に…
+"""
+
+
+@pytest.mark.parametrize(
+    "file_extension, file_content, correct_lines",
+    [
+        (".srt", SRT_FILE, ["泣き声）\n", "またか…\n", "2\n"]),
+        (".vtt", VTT_FILE, ["おお…　よしよし\n", "時間 & 場所\n"]),
+        (".ass", ASS_FILE, ["まだだ…", "まだ, まだ", "俺は 魔法帝に…"]),
+        (".SSA", ASS_FILE, ["まだだ…", "まだ, まだ", "俺は 魔法帝に…"]),
+        (".txt", SRT_FILE, SRT_FILE.splitlines(keepends=True)),
+    ],
+)
+def test_dialogue_lines(file_extension, file_content, correct_lines):
+    lines = generators_subtitle_parsing.get_dialogue_lines(
+        io.StringIO(file_content), file_extension
+    )
+    assert list(lines) == correct_lines
@@ -5,7 +5,7 @@ from pathlib import Path
 import pytest
 from csv_diff import compare, load_csv
 
-from ankimorphs import AnkiMorphsDB
+from ankimorphs import AnkiMorphsDB, generators
 from ankimorphs.generators_output_dialog import GeneratorOutputDialog, OutputOptions
 from ankimorphs.generators_window import GeneratorWindow
 
@@ -126,3 +126,40 @@ def test_study_plan_generator(  # pylint:disable=unused-argument, too-many-local
             assert len(changes) == 0
 
     os.remove(test_output_file)
+
+
+@pytest.mark.parametrize(
+    "fake_environment",
+    [("big-japanese-collection", config_big_japanese_collection)],
+    indirect=True,
+)
+def test_frequency_file_generator_cli(  # pylint:disable=unused-argument
+    fake_environment,
+):
+    # the cli should give the same output as the generators window
+    input_folder = Path(TESTS_DATA_PATH, "ja_subs")
+    test_output_file = Path(TESTS_DATA_TESTS_OUTPUTS_PATH, "test_cli_output_file.csv")
+    correct_output_file = Path(TESTS_DATA_CORRECT_OUTPUTS_PATH, "mecab_freq.csv")
+
+    exit_code = generators.main(
+        [
+            "frequency-file",
+            str(input_folder),
+            "--morphemizer",
+            "AnkiMorphs: Japanese",
+            "--output",
+            str(test_output_file),
+        ]
+    )
+    assert exit_code == 0
+
+    with open(correct_output_file, encoding="utf8") as a, open(
+        test_output_file, encoding="utf8"
+    ) as b:
+        diff: dict[str, list] = compare(load_csv(a), load_csv(b))
+        pprint.pprint(diff)
+        assert len(diff) != 0
+        for changes in diff.values():
+            assert len(changes) == 0
+
+    os.remove(test_output_file)
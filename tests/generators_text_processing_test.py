@@ -0,0 +1,82 @@
+import io
+from unittest import mock
+
+import pytest
+
+from ankimorphs import generators_text_processing
+from ankimorphs.generators_text_processing import PreprocessOptions
+from ankimorphs.morphemizer import SpaceMorphemizer
+
+PREPROCESS_OPTIONS = PreprocessOptions(filter_square_brackets=True, filter_numbers=True)
+
+TEXT = (
+    "The cat sat on the mat.\n"
+    "The cat sat on the mat.\n"
+    "[music] 2 dogs bark at the cat\n"
+    "\n"
+    "The cat sat on the mat.\n"
+    "Birds sing, dogs bark\n"
+) * 5
+
+
+def _get_reference_occurrences(text: str) -> list[tuple[str, int]]:
+    # the straightforward way: every line is read and morphemized on its own
+    morphemizer = SpaceMorphemizer()
+    occurrences: dict[str, int] = {}
+
+    for line in io.StringIO(text):
+        line = generators_text_processing.filter_line(PREPROCESS_OPTIONS, line.lower())
+        for morph in morphemizer.get_morphemes_from_expr(line):
+            key = morph.lemma + morph.inflection
+            occurrences[key] = occurrences.get(key, 0) + 1
+
+    return list(occurrences.items())
+
+
+def _get_occurrences(text: str, batch_size: int) -> list[tuple[str, int]]:
+    morph_occurrences = generators_text_processing.create_file_morph_occurrences(
+        preprocess_options=PREPROCESS_OPTIONS,
+        file=io.StringIO(text),
+        morphemizer=SpaceMorphemizer(),
+        nlp=None,
+        batch_size=batch_size,
+    )
+    return [
+        (key, morph_occurrence.occurrence)
+        for key, morph_occurrence in morph_occurrences.items()
+    ]
+
+
+@pytest.mark.parametrize(
+    "batch_size",
+    [1, 4, generators_text_processing.LINE_BATCH_SIZE],
+)
+def test_streamed_line_batches(batch_size):
+    # the batch size only changes how many lines are kept in memory at once,
+    # the morph occurrences and their order have to stay the same
+    assert _get_occurrences(TEXT, batch_size) == _get_reference_occurrences(TEXT)
+
+
+def test_repeated_lines_are_morphemized_once():
+    morphemizer = SpaceMorphemizer()
+
+    with mock.patch.object(
+        morphemizer,
+        "get_morphemes_from_expr_batch",
+        wraps=morphemizer.get_morphemes_from_expr_batch,
+    ) as get_morphemes_from_expr_batch:
+        morph_occurrences = generators_text_processing.create_file_morph_occurrences(
+            preprocess_options=PREPROCESS_OPTIONS,
+            file=io.StringIO(TEXT),
+            morphemizer=morphemizer,
+            nlp=None,
+        )
+
+    # the whole text fits in one batch, which only has four distinct lines
+    get_morphemes_from_expr_batch.assert_called_once()
+    assert len(get_morphemes_from_expr_batch.call_args.args[0]) == 4
+
+    assert [
+        (key, morph_occurrence.occurrence)
+        for key, morph_occurrence in morph_occurrences.items()
+    ] == _get_reference_occurrences(TEXT)
@@ -1,10 +1,12 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
 
-from ankimorphs import spacy_wrapper
+from ankimorphs import mecab_wrapper, spacy_wrapper
+from ankimorphs.exceptions import MecabOutputException
 from ankimorphs.morpheme import Morpheme
 from ankimorphs.morphemizer import get_morphemizer_by_description
 
@@ -51,6 +53,48 @@ def test_mecab_morpheme_generation(fake_environment):  # pylint:disable=unused-a
         assert morph in correct_morphs
 
 
+@pytest.mark.external_morphemizers
+def test_mecab_batch_morpheme_generation(  # pylint:disable=unused-argument
+    fake_environment,
+):
+    morphemizer = get_morphemizer_by_description("AnkiMorphs: Japanese")
+
+    # the batch output has to be identical to processing the sentences one by one
+    sentences = [
+        "本当に重要な任務の時しか 動かない",
+        "",
+        "お前たちの顔を見に",
+        "本当に重要な任務の時しか 動かない",
+        "珍しく時間が空いたので\nお前たちの顔を見に",
+    ]
+
+    extracted_morphs_batch = morphemizer.get_morphemes_from_expr_batch(sentences)
+    assert len(extracted_morphs_batch) == len(sentences)
+
+    for sentence, extracted_morphs in zip(sentences, extracted_morphs_batch):
+        assert extracted_morphs == morphemizer.get_morphemes_from_expr(sentence)
+
+
+@pytest.mark.external_morphemizers
+def test_mecab_concurrent_morpheme_generation(  # pylint:disable=unused-argument
+    fake_environment,
+):
+    morphemizer = get_morphemizer_by_description("AnkiMorphs: Japanese")
+
+    # every thread leases its own mecab process, so the output of
+    # the threads must not get mixed up
+    sentences = [f"{number}人の任務の時しか 動かない" for number in range(200)]
+    correct_morphs_batch = morphemizer.get_morphemes_from_expr_batch(sentences)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(
+            executor.map(morphemizer.get_morphemes_from_expr_batch, [sentences] * 8)
+        )
+
+    for extracted_morphs_batch in results:
+        assert extracted_morphs_batch == correct_morphs_batch
+
+
 @pytest.mark.external_morphemizers
 def test_jieba_morpheme_generation(fake_environment):  # pylint:disable=unused-argument
     morphemizer = get_morphemizer_by_description("AnkiMorphs: Chinese")
@@ -85,3 +129,78 @@ def test_jieba_morpheme_generation(fake_environment):  # pylint:disable=unused-a
 
     for morph in extracted_morphs:
         assert morph in correct_morphs
+
+
+@pytest.mark.external_morphemizers
+def test_jieba_batch_morpheme_generation(  # pylint:disable=unused-argument
+    fake_environment,
+):
+    morphemizer = get_morphemizer_by_description("AnkiMorphs: Chinese")
+
+    # the batch output has to be identical to processing the sentences one by one
+    sentences = [
+        "请您说得慢些好吗？",
+        "",
+        "一，二，三，跳！",
+        "请您说得慢些好吗？",
+        "他说：“你好 world 123”\r\n我们今天去北京大学看看吧。",
+    ]
+
+    extracted_morphs_batch = morphemizer.get_morphemes_from_expr_batch(sentences)
+    assert len(extracted_morphs_batch) == len(sentences)
+
+    for sentence, extracted_morphs in zip(sentences, extracted_morphs_batch):
+        assert extracted_morphs == morphemizer.get_morphemes_from_expr(sentence)
+
+
+# Echoes every expression back as one line of output, like mecab does. With the
+# "--warn" argument it also prints an extra line, like the warnings mecab prints
+# to its stderr, which is merged into stdout.
+_STAND_IN_MECAB = """
+import sys
+
+if "--warn" in sys.argv:
+    print("input-buffer overflow. The line is split.")
+    sys.stdout.flush()
+
+for line in sys.stdin:
+    sys.stdout.write(line.rstrip("\\n") + "\\r\\n" if line != "\\n" else "\\n")
+    sys.stdout.flush()
+"""
+
+
+@pytest.fixture(name="stand_in_mecab")
+def stand_in_mecab_fixture(tmp_path):
+    stand_in_mecab_path = tmp_path / "mecab.py"
+    stand_in_mecab_path.write_text(_STAND_IN_MECAB, encoding="utf-8")
+
+    with mock.patch.object(
+        mecab_wrapper, "_mecab_base_cmd", [sys.executable, str(stand_in_mecab_path)]
+    ), mock.patch.object(mecab_wrapper, "_mecab_encoding", "utf-8"):
+        yield
+        with mecab_wrapper._mecab_pool_condition:
+            idle_mecab_processes = [
+                mecab_process
+                for mecab_process, _ in mecab_wrapper._idle_mecab_processes
+            ]
+            mecab_wrapper._idle_mecab_processes.clear()
+        for mecab_process in idle_mecab_processes:
+            mecab_wrapper._shut_down_mecab_process(mecab_process)
+
+
+def test_mecab_batch_sentinel(stand_in_mecab):  # pylint:disable=unused-argument
+    expressions = [f"{number} 。" for number in range(5000)]
+    assert mecab_wrapper._interact_batch(expressions) == expressions
+
+    # the process is returned to the pool and stays in step for the next batch
+    assert len(mecab_wrapper._idle_mecab_processes) == 1
+    assert mecab_wrapper._interact_batch(expressions[:3]) == expressions[:3]
+
+
+def test_mecab_batch_out_of_step(stand_in_mecab):  # pylint:disable=unused-argument
+    with mock.patch.object(mecab_wrapper, "_mecab_args", ["--warn"]):
+        with pytest.raises(MecabOutputException):
+            mecab_wrapper._interact_batch(["1 。", "2 。"])
+
+    # the process that was out of step is shut down instead of reused
+    assert len(mecab_wrapper._idle_mecab_processes) == 0
@@ -0,0 +1,71 @@
+import json
+from unittest import mock
+
+from ankimorphs import ankimorphs_config, readability_report_utils
+from ankimorphs.ankimorphs_config import AnkiMorphsConfig
+from ankimorphs.ankimorphs_db import AnkiMorphsDB
+from ankimorphs.morpheme import Morpheme, MorphOccurrence
+
+
+def _get_morph_occurrence(lemma: str, occurrence: int) -> MorphOccurrence:
+    morph_occurrence = MorphOccurrence(Morpheme(lemma=lemma, inflection=lemma))
+    morph_occurrence.occurrence = occurrence
+    return morph_occurrence
+
+
+def test_morph_stats_from_file(tmp_path):
+    with open(ankimorphs_config._DEFAULT_CONFIGS_PATH, encoding="utf-8") as file:
+        configs = json.load(file)
+    configs["recalc_interval_for_known"] = 21
+
+    am_db = AnkiMorphsDB(str(tmp_path / "ankimorphs.db"))
+    try:
+        am_db.create_all_tables()
+        am_db.insert_many_into_morph_table(
+            [
+                {
+                    "lemma": "known",
+                    "inflection": "known",
+                    "highest_learning_interval": 30,
+                },
+                {
+                    "lemma": "learning",
+                    "inflection": "learning",
+                    "highest_learning_interval": 5,
+                },
+                {"lemma": "new", "inflection": "new", "highest_learning_interval": 0},
+            ]
+        )
+        # all the intervals are loaded once and shared by every file of the report
+        highest_learning_intervals = am_db.get_highest_learning_intervals()
+    finally:
+        am_db.con.close()
+
+    assert highest_learning_intervals == {
+        ("known", "known"): 30,
+        ("learning", "learning"): 5,
+        ("new", "new"): 0,
+    }
+
+    file_morphs = {
+        morph_occurrence.morph.lemma: morph_occurrence
+        for morph_occurrence in [
+            _get_morph_occurrence("known", 4),
+            _get_morph_occurrence("learning", 3),
+            _get_morph_occurrence("new", 2),
+            _get_morph_occurrence("not_in_collection", 1),
+        ]
+    }
+
+    with mock.patch.object(ankimorphs_config, "_configs_from_file", configs):
+        file_morphs_stats = readability_report_utils.get_morph_stats_from_file(
+            AnkiMorphsConfig(), highest_learning_intervals, file_morphs
+        )
+
+    assert file_morphs_stats.total_known == 4
+    assert file_morphs_stats.total_learning == 3
+    assert file_morphs_stats.total_unknowns == 3
+    assert {morph.lemma for morph in file_morphs_stats.unique_unknowns} == {
+        "new",
+        "not_in_collection",
+    }
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+import json
 import pprint
+import shutil
 from collections.abc import Sequence
+from pathlib import Path
 
 import pytest
 
-from ankimorphs import ankimorphs_config, ankimorphs_globals, recalc
+from ankimorphs import (
+    ankimorphs_config,
+    ankimorphs_db,
+    ankimorphs_globals,
+    recalc,
+    recalc_cli,
+    recalc_context,
+)
+from ankimorphs.ankimorphs_db import AnkiMorphsDB
 from ankimorphs.exceptions import (
     AnkiFieldNotFound,
     AnkiNoteTypeNotFound,
@@ -15,6 +26,7 @@ from ankimorphs.exceptions import (
 )
 
 from .environment_setup_for_tests import (  # pylint:disable=unused-import
+    TESTS_DATA_PATH,
     FakeEnvironment,
     config_big_japanese_collection,
     config_default_field,
@@ -33,6 +45,9 @@ from .environment_setup_for_tests import (  # pylint:disable=unused-import
 
 # these have to be lower than the others to prevent circular imports
 from anki.cards import Card  # isort: skip  # pylint:disable=wrong-import-order
+from anki.collection import (  # isort: skip  # pylint:disable=wrong-import-order
+    Collection,
+)
 from anki.models import (  # isort: skip  # pylint:disable=wrong-import-order
     ModelManager,
     NotetypeDict,
@@ -171,7 +186,7 @@ def test_recalc(  # pylint:disable=too-many-locals
     read_enabled_config_filters = ankimorphs_config.get_read_enabled_filters()
     modify_enabled_config_filters = ankimorphs_config.get_modify_enabled_filters()
 
-    recalc._recalc_background_op(
+    recalc.recalc_background_op(
         read_enabled_config_filters=read_enabled_config_filters,
         modify_enabled_config_filters=modify_enabled_config_filters,
     )
@@ -203,6 +218,84 @@ def test_recalc(  # pylint:disable=too-many-locals
         assert card_id == card.id
         assert original_card_data == new_card_data
 
+    # the toolbar stats are stored at the end of recalc
+    am_db = AnkiMorphsDB()
+    latest_stats = am_db.get_latest_stats()
+    assert latest_stats is not None
+    interval_for_known, unique_seen, all_seen, unique_known, all_known = latest_stats
+    assert interval_for_known == fake_environment.config["recalc_interval_for_known"]
+
+    for learning_interval, unique_morphs, all_morphs in [
+        (1, unique_seen, all_seen),
+        (interval_for_known, unique_known, all_known),
+    ]:
+        assert (
+            unique_morphs
+            == am_db.con.execute(
+                "SELECT COUNT(DISTINCT lemma) FROM Morphs WHERE highest_learning_interval >= ?",
+                (learning_interval,),
+            ).fetchone()[0]
+        )
+        assert (
+            all_morphs
+            == am_db.con.execute(
+                "SELECT COUNT(*) FROM Morphs WHERE highest_learning_interval >= ?",
+                (learning_interval,),
+            ).fetchone()[0]
+        )
+    am_db.con.close()
+
+
+@pytest.mark.external_morphemizers
+@pytest.mark.parametrize(
+    "fake_environment",
+    [("known-morphs-test-collection", config_known_morphs_enabled)],
+    indirect=True,
+)
+def test_recalc_cli(
+    fake_environment: FakeEnvironment, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    # the cli opens the collection file itself, so it gets its own copy
+    collection_path = Path(tmp_path, "collection.anki2")
+    shutil.copyfile(
+        Path(TESTS_DATA_PATH, "card_collections", "known-morphs-test-collection.anki2"),
+        collection_path,
+    )
+    config_path = Path(tmp_path, "config.json")
+    with open(config_path, mode="w", encoding="utf-8") as file:
+        json.dump(fake_environment.config, file)
+
+    # the configs from the file should only be used by this test
+    monkeypatch.setattr(ankimorphs_config, "_configs_from_file", None)
+
+    # the cli runs without anki, so it can't rely on 'mw' anywhere,
+    # e.g. the default configs are read from config.json instead
+    for module in (ankimorphs_config, ankimorphs_db, recalc, recalc_context):
+        monkeypatch.setattr(module, "mw", None)
+
+    exit_code = recalc_cli.main(
+        [
+            "--collection",
+            str(collection_path),
+            "--config",
+            str(config_path),
+            "--profile-folder",
+            str(TESTS_DATA_PATH),
+        ]
+    )
+    assert exit_code == 0
+
+    original_collection = fake_environment.original_collection
+    recalced_collection = Collection(str(collection_path))
+    try:
+        for card_id in original_collection.find_cards(""):
+            original_card: Card = original_collection.get_card(card_id)
+            recalced_card: Card = recalced_collection.get_card(card_id)
+            assert recalced_card.due == original_card.due
+            assert recalced_card.note().tags == original_card.note().tags
+    finally:
+        recalced_collection.close()
+
 
 @pytest.mark.should_cause_exception
 @pytest.mark.parametrize(
@@ -217,7 +310,7 @@ def test_recalc_with_wrong_note_type(  # pylint:disable=unused-argument
 ):
     read_enabled_config_filters = ankimorphs_config.get_read_enabled_filters()
     modify_enabled_config_filters = ankimorphs_config.get_modify_enabled_filters()
-    settings_error: Exception | None = recalc._check_selected_settings_for_errors(
+    settings_error: Exception | None = recalc.check_selected_settings_for_errors(
         read_enabled_config_filters, modify_enabled_config_filters
     )
     assert isinstance(settings_error, AnkiNoteTypeNotFound)
@@ -236,7 +329,7 @@ def test_recalc_with_wrong_field(  # pylint:disable=unused-argument
 ):
     read_enabled_config_filters = ankimorphs_config.get_read_enabled_filters()
     modify_enabled_config_filters = ankimorphs_config.get_modify_enabled_filters()
-    settings_error: Exception | None = recalc._check_selected_settings_for_errors(
+    settings_error: Exception | None = recalc.check_selected_settings_for_errors(
         read_enabled_config_filters, modify_enabled_config_filters
     )
     assert isinstance(settings_error, AnkiFieldNotFound)
@@ -255,7 +348,7 @@ def test_recalc_with_wrong_frequency_file(  # pylint:disable=unused-argument
 ):
     read_enabled_config_filters = ankimorphs_config.get_read_enabled_filters()
     modify_enabled_config_filters = ankimorphs_config.get_modify_enabled_filters()
-    settings_error: Exception | None = recalc._check_selected_settings_for_errors(
+    settings_error: Exception | None = recalc.check_selected_settings_for_errors(
         read_enabled_config_filters, modify_enabled_config_filters
     )
     assert isinstance(settings_error, FrequencyFileNotFoundException)
@@ -274,7 +367,7 @@ def test_recalc_with_wrong_morphemizer(  # pylint:disable=unused-argument
 ):
     read_enabled_config_filters = ankimorphs_config.get_read_enabled_filters()
     modify_enabled_config_filters = ankimorphs_config.get_modify_enabled_filters()
-    settings_error: Exception | None = recalc._check_selected_settings_for_errors(
+    settings_error: Exception | None = recalc.check_selected_settings_for_errors(
         read_enabled_config_filters, modify_enabled_config_filters
     )
     assert isinstance(settings_error, MorphemizerNotFoundException)
@@ -296,7 +389,7 @@ def test_recalc_with_default_settings(  # pylint:disable=unused-argument
 ):
     read_enabled_config_filters = ankimorphs_config.get_read_enabled_filters()
     modify_enabled_config_filters = ankimorphs_config.get_modify_enabled_filters()
-    settings_error: Exception | None = recalc._check_selected_settings_for_errors(
+    settings_error: Exception | None = recalc.check_selected_settings_for_errors(
         read_enabled_config_filters, modify_enabled_config_filters
     )
     assert isinstance(settings_error, DefaultSettingsException)
@@ -58,3 +58,124 @@ def test_custom_review(fake_environment: FakeEnvironment):
     reviewing_utils._set_card_as_known_and_skip(am_config)
     assert mock_mw.col.get_card(second_card).queue == CardQueue(-2)  # buried
     assert mock_mw.reviewer.card.id == third_card
+
+
+@pytest.mark.parametrize(
+    "fake_environment",
+    [("big-japanese-collection", config_big_japanese_collection)],
+    indirect=True,
+)
+def test_prefetched_review(fake_environment: FakeEnvironment):
+    mock_mw = fake_environment.mock_mw
+    am_config = AnkiMorphsConfig()
+
+    mock_mw.reviewer.nextCard = partial(
+        reviewing_utils._get_next_card_background,
+        collection=mock_mw.col,
+        am_config=am_config,
+        skipped_cards=SkippedCards(),
+    )
+    mock_mw.reviewer.nextCard()
+    first_card = mock_mw.reviewer.card
+
+    prefetched_cards = reviewing_utils.PrefetchedCards(
+        card_id=first_card.id,
+        undo_step=mock_mw.col.undo_status().last_step,
+        am_config=am_config,
+    )
+    reviewing_utils._prefetch_next_cards_background(
+        mock_mw.col, prefetched_cards=prefetched_cards
+    )
+    prefetched_cards.is_ready = True
+
+    # answering a card inserts its morphs into the seen morphs table (via hook)
+    mock_mw.col.sched.answerCard(first_card, ease=3)  # 'good' pressed
+    am_db = reviewing_utils.AnkiMorphsDB()
+    am_db.update_seen_morphs_today_single_card(first_card.id)
+    am_db.con.close()
+
+    assert prefetched_cards.is_valid(mock_mw.col.undo_status(), first_card)
+
+    # the prefetched decision has to be identical to the one made by the slow path
+    mock_mw.reviewer.nextCard()
+    assert mock_mw.reviewer.card.id == prefetched_cards.show_card_id
+
+    # an extra undoable step before the answer invalidates the prefetched decision
+    prefetched_cards.undo_step -= 1
+    assert not prefetched_cards.is_valid(mock_mw.col.undo_status(), first_card)
+
+
+def _get_prefetched_cards_of_answered_card(
+    fake_environment: FakeEnvironment, am_config: AnkiMorphsConfig
+) -> reviewing_utils.PrefetchedCards:
+    mock_mw = fake_environment.mock_mw
+
+    mock_mw.reviewer.nextCard = partial(
+        reviewing_utils._get_next_card_background,
+        collection=mock_mw.col,
+        am_config=am_config,
+        skipped_cards=SkippedCards(),
+    )
+    mock_mw.reviewer.nextCard()
+    first_card = mock_mw.reviewer.card
+
+    prefetched_cards = reviewing_utils.PrefetchedCards(
+        card_id=first_card.id,
+        undo_step=mock_mw.col.undo_status().last_step,
+        am_config=am_config,
+    )
+    reviewing_utils._prefetch_next_cards_background(
+        mock_mw.col, prefetched_cards=prefetched_cards
+    )
+    prefetched_cards.is_ready = True
+
+    mock_mw.col.sched.answerCard(first_card, ease=3)  # 'good' pressed
+    am_db = reviewing_utils.AnkiMorphsDB()
+    am_db.update_seen_morphs_today_single_card(first_card.id)
+    am_db.con.close()
+
+    return prefetched_cards
+
+
+@pytest.mark.parametrize(
+    "fake_environment",
+    [("big-japanese-collection", config_big_japanese_collection)],
+    indirect=True,
+)
+def test_show_prefetched_card(fake_environment: FakeEnvironment):
+    mock_mw = fake_environment.mock_mw
+    am_config = AnkiMorphsConfig()
+    prefetched_cards = _get_prefetched_cards_of_answered_card(
+        fake_environment, am_config
+    )
+
+    mock_mw.reviewer._reps = 0  # the web view is already initialized
+    reviewing_utils._prefetched_cards = prefetched_cards
+
+    assert reviewing_utils._show_prefetched_card(am_config, SkippedCards())
+    assert mock_mw.reviewer.card.id == prefetched_cards.show_card_id
+    assert reviewing_utils._prefetched_cards is None  # only used once
+
+    for skipped_card_id in prefetched_cards.skipped_cards_by_id:
+        assert mock_mw.col.get_card(skipped_card_id).queue == CardQueue(-2)  # buried
+
+
+@pytest.mark.parametrize(
+    "fake_environment",
+    [("big-japanese-collection", config_big_japanese_collection)],
+    indirect=True,
+)
+def test_prefetched_cards_discarded_after_undo(fake_environment: FakeEnvironment):
+    mock_mw = fake_environment.mock_mw
+    am_config = AnkiMorphsConfig()
+    prefetched_cards = _get_prefetched_cards_of_answered_card(
+        fake_environment, am_config
+    )
+    answered_card = mock_mw.reviewer.card
+
+    mock_mw.col.undo()  # the answer is undone, so the queue is not the same anymore
+    reviewing_utils._prefetched_cards = prefetched_cards
+
+    assert not reviewing_utils._show_prefetched_card(am_config, SkippedCards())
+    assert reviewing_utils._prefetched_cards is None
+    assert mock_mw.reviewer.card.id == answered_card.id
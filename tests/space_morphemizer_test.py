@@ -57,3 +57,31 @@ def test_english(fake_environment):  # pylint:disable=unused-argument
 
     for morph in extracted_morphs:
         assert morph in correct_morphs
+
+
+def test_cache(fake_environment):  # pylint:disable=unused-argument
+    morphemizer = get_morphemizer_by_description("AnkiMorphs: Language w/ Spaces")
+    assert morphemizer is not None
+    cache = morphemizer.cache
+    cache.clear()
+
+    sentences = ["My mother-in-law is wonderful", "Tu es quelqu'un de bien."]
+    extracted_morphs_batch = morphemizer.get_morphemes_from_expr_batch(sentences * 2)
+    assert extracted_morphs_batch[:2] == extracted_morphs_batch[2:]
+    assert len(cache) == 2
+    assert cache.misses == 2
+
+    # the cached morphs are copied, so modifying them has no effect on the cache
+    extracted_morphs = morphemizer.get_morphemes_from_expr(sentences[0])
+    assert extracted_morphs == extracted_morphs_batch[0]
+    assert cache.hits == 1
+    extracted_morphs.clear()
+    assert morphemizer.get_morphemes_from_expr(sentences[0]) != []
+
+    # only the least recently used entries are evicted when the cache is full
+    cache.set_max_size_bytes(cache.size_bytes - 1)
+    assert len(cache) == 1
+    assert cache.evictions == 1
+    assert cache.get(sentences[0]) is not None
+    assert cache.get(sentences[1]) is None
+    assert cache.get_stats().startswith("3 hits, 3 misses, 1 evictions, 1 entries")
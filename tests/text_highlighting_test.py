@@ -122,3 +122,113 @@ def test_highlighting(  # pylint:disable=unused-argument
     )
 
     assert highlighted_text == correct_result
+
+
+@pytest.mark.parametrize(
+    "fake_environment",
+    [("ignore_names_txt_collection", config_big_japanese_collection)],
+    indirect=True,
+)
+def test_highlighting_overlapping_morphs(  # pylint:disable=unused-argument
+    fake_environment: FakeEnvironment,
+):
+    am_config = AnkiMorphsConfig()
+
+    # The bigger morph "bcd" takes priority over "ab" even though "ab" is found first,
+    # and since "bcd" claims the "b", the "ab" morph is not highlighted at all.
+    input_text: str = "abcd"
+    card_morphs: list[Morpheme] = [
+        Morpheme(lemma="ab", inflection="ab", highest_learning_interval=0),
+        Morpheme(lemma="bcd", inflection="bcd", highest_learning_interval=0),
+    ]
+    correct_result: str = 'a<span morph-status="unknown">bcd</span>'
+    highlighted_text: str = text_highlighting.get_highlighted_text(
+        am_config, card_morphs, input_text
+    )
+
+    assert highlighted_text == correct_result
+
+    # A shorter morph can still be used at a position where a bigger morph
+    # starts, if the bigger one overlaps with an even bigger morph.
+    input_text = "Abcdef"
+    card_morphs = [
+        Morpheme(lemma="a", inflection="a", highest_learning_interval=0),
+        Morpheme(lemma="abc", inflection="abc", highest_learning_interval=0),
+        Morpheme(lemma="cdef", inflection="cdef", highest_learning_interval=0),
+    ]
+    correct_result = (
+        '<span morph-status="unknown">A</span>b<span morph-status="unknown">cdef</span>'
+    )
+    highlighted_text = text_highlighting.get_highlighted_text(
+        am_config, card_morphs, input_text
+    )
+
+    assert highlighted_text == correct_result
+
+
+@pytest.mark.parametrize(
+    "fake_environment",
+    [("ignore_names_txt_collection", config_big_japanese_collection)],
+    indirect=True,
+)
+def test_highlighting_long_field_matches_its_parts(  # pylint:disable=unused-argument
+    fake_environment: FakeEnvironment,
+):
+    # Long fields (e.g. full transcripts) are highlighted in a single scan of the text,
+    # this makes sure that the result of a long field is identical to highlighting
+    # each of its parts separately.
+    am_config = AnkiMorphsConfig()
+    input_text: str = (
+        "Das sind doch die Schädel von den Flüchtlingen. Keine Sorge[sorge]!"
+    )
+    card_morphs: list[Morpheme] = [
+        Morpheme(
+            lemma="Flüchtling", inflection="flüchtlingen", highest_learning_interval=0
+        ),
+        Morpheme(lemma="Schädel", inflection="schädel", highest_learning_interval=30),
+        Morpheme(lemma="Sorge", inflection="sorge", highest_learning_interval=5),
+        Morpheme(lemma="kein", inflection="keine", highest_learning_interval=0),
+        Morpheme(lemma="doch", inflection="doch", highest_learning_interval=0),
+        Morpheme(lemma="sein", inflection="sind", highest_learning_interval=0),
+        Morpheme(lemma="der", inflection="das", highest_learning_interval=0),
+        Morpheme(lemma="der", inflection="den", highest_learning_interval=0),
+        Morpheme(lemma="der", inflection="die", highest_learning_interval=0),
+        Morpheme(lemma="von", inflection="von", highest_learning_interval=0),
+    ]
+    highlighted_text: str = text_highlighting.get_highlighted_text(
+        am_config, card_morphs, input_text
+    )
+
+    repetitions = 2000
+    long_highlighted_text: str = text_highlighting.get_highlighted_text(
+        am_config, card_morphs, " ".join([input_text] * repetitions)
+    )
+
+    assert long_highlighted_text == " ".join([highlighted_text] * repetitions)
+
+
+@pytest.mark.parametrize(
+    "fake_environment",
+    [("ignore_names_txt_collection", config_big_japanese_collection)],
+    indirect=True,
+)
+def test_highlighting_ruby_characters_edge_cases(  # pylint:disable=unused-argument
+    fake_environment: FakeEnvironment,
+):
+    am_config = AnkiMorphsConfig()
+    card_morphs: list[Morpheme] = [
+        Morpheme(lemma="時間", inflection="時間", highest_learning_interval=0),
+        Morpheme(lemma="が", inflection="が", highest_learning_interval=0),
+    ]
+
+    # ruby characters at the very start of the text and multiple consecutive
+    # ruby characters must not be lost
+    input_text: str = "[a]時[じ][x]間[かん]が[b][c]"
+    correct_result: str = (
+        '[a]<span morph-status="unknown">時[じ][x]間[かん]</span><span morph-status="unknown">が[b][c]</span>'
+    )
+    highlighted_text: str = text_highlighting.get_highlighted_text(
+        am_config, card_morphs, input_text
+    )
+
+    assert highlighted_text == correct_result
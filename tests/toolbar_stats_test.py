@@ -0,0 +1,66 @@
+import json
+from unittest import mock
+
+import pytest
+
+from ankimorphs import ankimorphs_config, ankimorphs_db
+from ankimorphs.ankimorphs_db import AnkiMorphsDB
+from ankimorphs.toolbar_stats import MorphToolbarStats
+
+
+@pytest.fixture(name="configs")
+def configs_fixture(tmp_path):
+    mock_mw = mock.Mock()
+    mock_mw.pm.profileFolder.return_value = str(tmp_path)
+
+    with open(ankimorphs_config._DEFAULT_CONFIGS_PATH, encoding="utf-8") as file:
+        configs = json.load(file)
+    configs["recalc_toolbar_stats_use_known"] = True
+    configs["recalc_interval_for_known"] = 21
+
+    with mock.patch.object(ankimorphs_db, "mw", mock_mw), mock.patch.object(
+        ankimorphs_config, "_configs_from_file", configs
+    ):
+        yield configs
+
+
+def _insert_morphs(am_db: AnkiMorphsDB) -> None:
+    am_db.create_all_tables()
+    am_db.insert_many_into_morph_table(
+        [
+            {"lemma": "gehen", "inflection": "gehen", "highest_learning_interval": 30},
+            {"lemma": "gehen", "inflection": "ging", "highest_learning_interval": 25},
+            {"lemma": "Haus", "inflection": "Haus", "highest_learning_interval": 5},
+            {"lemma": "neu", "inflection": "neu", "highest_learning_interval": 0},
+        ]
+    )
+
+
+def test_toolbar_stats(configs):
+    am_db = AnkiMorphsDB()
+    _insert_morphs(am_db)
+
+    assert am_db.get_latest_stats() is None
+    am_db.update_stats(configs["recalc_interval_for_known"])
+    assert am_db.get_latest_stats() == (21, 2, 3, 1, 2)
+    am_db.con.close()
+
+    toolbar_stats = MorphToolbarStats()
+    assert toolbar_stats.unique_morphs == "U: 1"
+    assert toolbar_stats.all_morphs == "A: 2"
+
+
+def test_toolbar_stats_interval_changed(configs):
+    am_db = AnkiMorphsDB()
+    _insert_morphs(am_db)
+    am_db.update_stats(configs["recalc_interval_for_known"])
+
+    # the stats are recomputed for the new interval, but drawing
+    # the toolbar does not store them, that is done by recalc
+    configs["recalc_interval_for_known"] = 5
+    toolbar_stats = MorphToolbarStats()
+    assert toolbar_stats.unique_morphs == "U: 2"
+    assert toolbar_stats.all_morphs == "A: 3"
+
+    assert am_db.get_latest_stats() == (21, 2, 3, 1, 2)
+    am_db.con.close()